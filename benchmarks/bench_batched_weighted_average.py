@@ -0,0 +1,64 @@
+"""
+Benchmarks the per-batch latency of `BatchedMotionDetectionWeightedAverage.next_frames` against one
+`MotionDetectionWeightedAverage` per stream, for many low resolution streams.
+
+Usage:
+
+    poetry run python benchmarks/bench_batched_weighted_average.py --streams 16 --frames 200
+"""
+
+import argparse
+import functools
+import time
+
+import numpy as np
+import structlog
+from bench_weighted_average import synthetic_frames
+from py_motion_detector.models.motion_detection.batched_weighted_average import BatchedMotionDetectionWeightedAverage
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+
+
+def per_stream(models: list[MotionDetectionWeightedAverage], frames: list[np.array]) -> list:
+    return [model.next_frame(frame) for model, frame in zip(models, frames, strict=True)]
+
+
+def benchmark(process_batch, batches: list[list[np.array]]) -> dict:
+    process_batch(batches[0])  # warm up, allocates the background images
+
+    latencies = []
+    for frames in batches[1:]:
+        start = time.perf_counter()
+        process_batch(frames)
+        latencies.append(time.perf_counter() - start)
+    return {
+        "median_ms": 1000 * float(np.median(latencies)),
+        "p99_ms": 1000 * float(np.percentile(latencies, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-s", "--streams", type=int, help="Number of streams [default=16]", default=16)
+    parser.add_argument("-n", "--frames", type=int, help="Number of frames per stream [default=200]", default=200)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+    for name, (height, width) in {"120p": (120, 160), "240p": (240, 320)}.items():
+        streams = [synthetic_frames(height, width, args.frames, seed=i) for i in range(args.streams)]
+        batches = [list(frames) for frames in zip(*streams, strict=True)]
+
+        models = [MotionDetectionWeightedAverage() for _ in range(args.streams)]
+        batched = BatchedMotionDetectionWeightedAverage(args.streams)
+        results = {
+            "per stream": benchmark(functools.partial(per_stream, models), batches),
+            "batched": benchmark(batched.next_frames, batches),
+        }
+        for label, result in results.items():
+            print(
+                f"{name:>5} {args.streams} streams {label:<10} median={result['median_ms']:7.2f}ms "
+                f"p99={result['p99_ms']:7.2f}ms"
+            )
+
+
+if __name__ == '__main__':
+    main()
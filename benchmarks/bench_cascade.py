@@ -0,0 +1,69 @@
+"""
+Benchmarks `CascadeMotionDetection` against `MotionDetectionWeightedAverage` alone on `SyntheticFrameProvider` scenes
+where objects only move during a fraction of the frames (`--motion-ratio`), as in most camera feeds. Reports the rate
+at which the cheap test fires, the measured and estimated savings, and the frames with motion (according to the full
+model alone) on which the cascade returned no bounding box.
+
+Usage:
+
+    poetry run python benchmarks/bench_cascade.py --frames 500 --motion-ratio 0.1
+"""
+
+import argparse
+import time
+
+import structlog
+from py_motion_detector.input_sources.synthetic import SyntheticFrameProvider
+from py_motion_detector.models.motion_detection.cascade import CascadeMotionDetection
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+
+RESOLUTIONS = {"240p": (240, 320), "480p": (480, 640), "1080p": (1080, 1920)}
+
+
+def sparse_motion_frames(height: int, width: int, n_frames: int, motion_ratio: float, n_objects: int) -> list:
+    """A static scene with objects moving during `motion_ratio` of the frames, in bursts of 30 frames."""
+    still = SyntheticFrameProvider(height, width, n_objects=0)
+    moving = SyntheticFrameProvider(height, width, n_objects=n_objects)
+    period = max(round(30 / motion_ratio), 30)
+    return [moving.frame(i) if i % period < 30 else still.frame(i) for i in range(n_frames)]
+
+
+def run(model, frames: list) -> tuple[float, list]:
+    start = time.perf_counter()
+    bounding_boxes = [model.next_frame(frame) for frame in frames]
+    return time.perf_counter() - start, bounding_boxes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--frames", type=int, help="Number of frames per resolution [default=500]", default=500)
+    parser.add_argument(
+        "-m", "--motion-ratio", type=float, help="Fraction of the frames with motion [default=0.1]", default=0.1
+    )
+    parser.add_argument("-o", "--objects", type=int, help="Number of moving objects [default=2]", default=2)
+    parser.add_argument(
+        "-t", "--thumbnail-size", type=int, help="Longest side of the thumbnails [default=64]", default=64
+    )
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+    for name, (height, width) in RESOLUTIONS.items():
+        frames = sparse_motion_frames(height, width, args.frames, args.motion_ratio, args.objects)
+        full_sec, expected = run(MotionDetectionWeightedAverage(), frames)
+        cascade = CascadeMotionDetection(MotionDetectionWeightedAverage(), thumbnail_size=args.thumbnail_size)
+        cascade_sec, bounding_boxes = run(cascade, frames)
+
+        motion_frames = [i for i, bbs in enumerate(expected) if len(bbs) > 0]
+        missed = sum(len(bounding_boxes[i]) == 0 for i in motion_frames)
+        report = cascade.report()
+        print(
+            f"{name:>6} full model={1000 * full_sec / len(frames):6.2f}ms/frame "
+            f"cascade={1000 * cascade_sec / len(frames):6.2f}ms/frame (gate={report['gate_ms']:5.2f}ms) "
+            f"saving={1 - cascade_sec / full_sec:6.1%} (estimated {report['estimated_saving']:6.1%}) "
+            f"gate hit rate={report['gate_hit_rate']:6.1%} "
+            f"missed motion frames={missed}/{len(motion_frames)} ({missed / max(len(motion_frames), 1):.1%})"
+        )
+
+
+if __name__ == '__main__':
+    main()
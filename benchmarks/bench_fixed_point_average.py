@@ -0,0 +1,90 @@
+"""
+Benchmarks `MotionDetectionFixedPointAverage` against `MotionDetectionWeightedAverage` with the same weight: the
+latency of the running average update alone (`_motion_mask`), the latency of `next_frame`, and the agreement of the
+bounding boxes of both models on the same `SyntheticFrameProvider` scene.
+
+The gain of the fixed-point model depends on the CPU: on x86 the float32 `accumulateWeighted` of OpenCV is vectorized
+and both are close, the integer update is meant for ARM cores such as the ones of a Raspberry Pi.
+
+Usage:
+
+    poetry run python benchmarks/bench_fixed_point_average.py --frames 200
+"""
+
+import argparse
+import time
+
+import numpy as np
+import structlog
+from py_motion_detector.input_sources.synthetic import SyntheticFrameProvider
+from py_motion_detector.models.motion_detection.fixed_point_average import MotionDetectionFixedPointAverage
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+
+RESOLUTIONS = {"240p": (240, 320), "480p": (480, 640), "1080p": (1080, 1920)}
+
+
+def benchmark(model: MotionDetectionWeightedAverage, frames: list[np.array]) -> dict:
+    model.next_frame(frames[0])  # allocates the background image
+
+    mask_latencies, frame_latencies = [], []
+    for frame in frames[1:]:
+        gray = model._to_blurred_gray(frame)
+        start = time.perf_counter()
+        model._motion_mask(gray)
+        mask_latencies.append(time.perf_counter() - start)
+    for frame in frames[1:]:
+        start = time.perf_counter()
+        model.next_frame(frame)
+        frame_latencies.append(time.perf_counter() - start)
+    return {
+        "motion_mask_ms": 1000 * float(np.median(mask_latencies)),
+        "next_frame_ms": 1000 * float(np.median(frame_latencies)),
+    }
+
+
+def agreement(acc_shift: int, frames: list[np.array]) -> dict:
+    """Runs both models on the same frames and compares their bounding boxes."""
+    fixed_point = MotionDetectionFixedPointAverage(acc_shift=acc_shift)
+    floating_point = MotionDetectionWeightedAverage(acc_weight=2.0**-acc_shift)
+    same_count, ious = 0, []
+    for frame in frames:
+        bbs, expected = fixed_point.next_frame(frame), floating_point.next_frame(frame)
+        if len(bbs) == len(expected):
+            same_count += 1
+            if len(bbs) > 0:
+                ious.extend(bbs.iou(expected).max(axis=1).tolist())
+    return {
+        "same_count": same_count / len(frames),
+        "min_iou": min(ious) if ious else float("nan"),
+        "mean_iou": float(np.mean(ious)) if ious else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--frames", type=int, help="Number of frames per resolution [default=200]", default=200)
+    parser.add_argument("-o", "--objects", type=int, help="Number of moving objects [default=4]", default=4)
+    parser.add_argument("-s", "--acc-shift", type=int, help="Weight of the input image is 2**-s [default=2]", default=2)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+    for name, (height, width) in RESOLUTIONS.items():
+        frames = list(SyntheticFrameProvider(height, width, n_frames=args.frames, n_objects=args.objects).frames())
+        for model in (
+            MotionDetectionWeightedAverage(acc_weight=2.0**-args.acc_shift),
+            MotionDetectionFixedPointAverage(acc_shift=args.acc_shift),
+        ):
+            result = benchmark(model, frames)
+            print(
+                f"{name:>6} {model.name():<34} motion mask={result['motion_mask_ms']:7.3f}ms "
+                f"next frame={result['next_frame_ms']:7.2f}ms"
+            )
+        result = agreement(args.acc_shift, frames)
+        print(
+            f"{name:>6} frames with the same number of boxes={result['same_count']:.1%} "
+            f"IoU of the boxes min={result['min_iou']:.3f} mean={result['mean_iou']:.3f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Measures how many frames `TrackChangeFilterCallback` passes to the storage callback on `SyntheticFrameProvider` scenes
+where objects move slowly, as people standing or walking in front of the camera, compared with storing every frame
+with motion. Also reports the latency of `BoundingBoxTracker` per frame.
+
+Usage:
+
+    poetry run python benchmarks/bench_track_change_filter.py --frames 500 --speed 1
+"""
+
+import argparse
+import time
+
+import structlog
+from py_motion_detector.callbacks.base import MotionDetectionCallbackABC
+from py_motion_detector.callbacks.track_change_filter import TrackChangeFilterCallback
+from py_motion_detector.input_sources.synthetic import SyntheticFrameProvider
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+from py_motion_detector.post_processing.box_merger import BoundingBoxMerger
+from py_motion_detector.post_processing.tracker import BoundingBoxTracker
+
+
+class CountingCallback(MotionDetectionCallbackABC):
+    """Counts the frames with motion, which `FrameFileDumperCallback` would store."""
+
+    def __init__(self):
+        self.stored_frames = 0
+
+    def on_start(self) -> None:
+        pass
+
+    def execute(self, frame, timestamp, bounding_boxes) -> None:
+        self.stored_frames += len(bounding_boxes) > 0
+
+    def on_exit(self) -> None:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--frames", type=int, help="Number of frames [default=500]", default=500)
+    parser.add_argument("-o", "--objects", type=int, help="Number of moving objects [default=3]", default=3)
+    parser.add_argument("-s", "--speed", type=float, help="Maximum speed in pixels per frame [default=1]", default=1.0)
+    parser.add_argument(
+        "-d", "--min-displacement", type=float, help="Displacement passing a frame [default=20]", default=20.0
+    )
+    parser.add_argument(
+        "-k", "--keyframe-interval", type=int, help="Frames between two keyframes [default=100]", default=100
+    )
+    parser.add_argument(
+        "-g", "--merge-gap", type=int, help="Merge the boxes at most this many pixels apart [default=40]", default=40
+    )
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+    frames = SyntheticFrameProvider(
+        480, 640, n_frames=args.frames, n_objects=args.objects, max_speed=args.speed
+    ).frames()
+    model, tracker = MotionDetectionWeightedAverage(min_area=200), BoundingBoxTracker()
+    merger = BoundingBoxMerger(max_gap=args.merge_gap)
+    every_frame, stored = CountingCallback(), CountingCallback()
+    track_filter = TrackChangeFilterCallback(
+        stored, min_displacement=args.min_displacement, keyframe_interval=args.keyframe_interval
+    )
+
+    tracker_sec = 0.0
+    for frame in frames:
+        bounding_boxes = merger.process(frame, model.next_frame(frame))
+        start = time.perf_counter()
+        bounding_boxes = tracker.process(frame, bounding_boxes)
+        tracker_sec += time.perf_counter() - start
+        every_frame.execute(frame, None, bounding_boxes)
+        track_filter.execute(frame, None, bounding_boxes)
+
+    print(
+        f"frames with motion={every_frame.stored_frames} stored with the filter={stored.stored_frames} "
+        f"reduction={every_frame.stored_frames / max(stored.stored_frames, 1):.1f}x "
+        f"tracks={tracker._next_id} tracker={1000 * tracker_sec / args.frames:.3f}ms/frame"
+    )
+
+
+if __name__ == '__main__':
+    main()
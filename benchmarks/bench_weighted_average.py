@@ -0,0 +1,96 @@
+"""
+Benchmarks the per-frame latency and memory allocations of `MotionDetectionWeightedAverage.next_frame` against the
+previous implementation, which allocated new images at every step and kept the running average as float64.
+
+Usage:
+
+    poetry run python benchmarks/bench_weighted_average.py --frames 200
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+import structlog
+from py_motion_detector.models.bounding_box import BoundingBoxArray
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+
+
+class LegacyMotionDetectionWeightedAverage(MotionDetectionWeightedAverage):
+    """The implementation of `next_frame` before the scratch buffers were introduced, used as a baseline."""
+
+    def next_frame(self, frame: np.array) -> BoundingBoxArray:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, self._gkernel, 0)
+
+        if self._weighted_average_image is None:
+            self._weighted_average_image = gray.copy().astype("float")
+            return BoundingBoxArray()
+
+        cv2.accumulateWeighted(gray, self._weighted_average_image, self._weight)
+        frame_delta = cv2.absdiff(gray, cv2.convertScaleAbs(self._weighted_average_image))
+
+        ret, thresh = cv2.threshold(frame_delta, self.delta_threshold, 255, cv2.THRESH_BINARY)
+        thresh = cv2.dilate(thresh, None, iterations=self._dil_iter)
+
+        contours, _ = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return self.bounding_boxes_from_contours(contours)
+
+
+def synthetic_frames(height: int, width: int, n_frames: int, seed: int = 0) -> list[np.array]:
+    """A static noisy background with a bright square moving from left to right."""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 60, (height, width, 3), dtype=np.uint8)
+    size = max(height // 8, 4)
+    frames = []
+    for i in range(n_frames):
+        frame = background.copy()
+        x = (i * width // n_frames) % (width - size)
+        frame[height // 2 : height // 2 + size, x : x + size] = 220
+        frames.append(frame)
+    return frames
+
+
+def benchmark(model: MotionDetectionWeightedAverage, frames: list[np.array]) -> dict:
+    model.next_frame(frames[0])  # warm up, allocates the background image
+
+    latencies = []
+    for frame in frames[1:]:
+        start = time.perf_counter()
+        model.next_frame(frame)
+        latencies.append(time.perf_counter() - start)
+
+    # numpy reports the image buffers it allocates (including the ones returned by OpenCV) to tracemalloc
+    tracemalloc.start()
+    for frame in frames[1:]:
+        model.next_frame(frame)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": 1000 * float(np.median(latencies)),
+        "p99_ms": 1000 * float(np.percentile(latencies, 99)),
+        "peak_alloc_kb": peak / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--frames", type=int, help="Number of frames per resolution [default=200]", default=200)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+    for name, (height, width) in {"500px": (500, 500), "1080p": (1080, 1920)}.items():
+        frames = synthetic_frames(height, width, args.frames)
+        for model in (LegacyMotionDetectionWeightedAverage(), MotionDetectionWeightedAverage()):
+            result = benchmark(model, frames)
+            print(
+                f"{name:>6} {model.name():<38} median={result['median_ms']:7.2f}ms p99={result['p99_ms']:7.2f}ms "
+                f"peak allocations={result['peak_alloc_kb']:9.1f}KiB"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""
+Reproducible benchmark suite of the motion detection pipeline.
+
+Every scenario is a `SyntheticFrameProvider` scene (a resolution and a number of moving objects) run in its own
+process, so that the peak RSS of one scenario does not hide the one of the next. For every scenario the suite reports:
+
+- `end_to_end`: the `MotionDetectionApplication` driving `MotionDetectionWeightedAverage` and a callback, measured from
+  the moment a frame is yielded by the provider until the last callback returns.
+- `stages`: the latency of every step of `MotionDetectionWeightedAverage.next_frame`, as recorded by the model in
+  the `model_stage_seconds` histograms.
+- `peak_rss_mb`: the peak resident set size of the scenario's process.
+- `peak_alloc_kb` and `allocations`: the peak size and the number of the memory blocks allocated while processing the
+  frames, as reported by `tracemalloc`.
+
+Results are stored as JSON with `--save`, and compared against a previous run with `--compare`: the suite exits with
+an error if the latency of a scenario or stage regressed more than `--tolerance`.
+
+Usage:
+
+    poetry run python benchmarks/suite.py --save benchmarks/baseline.json
+    poetry run python benchmarks/suite.py --compare benchmarks/baseline.json --tolerance 0.2
+"""
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+import structlog
+from py_motion_detector.callbacks.base import MotionDetectionCallbackABC
+from py_motion_detector.input_sources.synthetic import SyntheticFrameProvider
+from py_motion_detector.instrumentation.metrics import MetricsRegistry
+from py_motion_detector.models.bounding_box import BoundingBoxes
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+from py_motion_detector.motion_detection_app import MotionDetectionApplication
+
+RESOLUTIONS = {"240p": (240, 320), "480p": (480, 640), "1080p": (1080, 1920)}
+OBJECT_COUNTS = (1, 4, 16)
+STAGES = ("preprocess", "blur", "motion_mask", "dilate", "contours", "bounding_boxes")
+
+
+class TimedFrameProvider(SyntheticFrameProvider):
+    """Records the time at which every frame is handed to the application."""
+
+    frame_start = 0.0
+
+    def frames(self):
+        for frame in super().frames():
+            self.frame_start = time.perf_counter()
+            yield frame
+
+
+class LatencyCallback(MotionDetectionCallbackABC):
+    """The last callback of the application, records the latency of every frame."""
+
+    def __init__(self, frame_provider: TimedFrameProvider):
+        self.frame_provider = frame_provider
+        self.latencies = []
+        self.motion_frames = 0
+
+    def on_start(self) -> None:
+        pass
+
+    def execute(self, frame: np.array, timestamp: datetime.datetime, bounding_boxes: BoundingBoxes) -> None:
+        self.motion_frames += len(bounding_boxes) > 0
+        self.latencies.append(time.perf_counter() - self.frame_provider.frame_start)
+
+    def on_exit(self) -> None:
+        pass
+
+
+def summarize(latencies: list[float]) -> dict:
+    latencies = np.asarray(latencies)
+    return {
+        "fps": float(len(latencies) / latencies.sum()),
+        "p50_ms": 1000 * float(np.percentile(latencies, 50)),
+        "p99_ms": 1000 * float(np.percentile(latencies, 99)),
+    }
+
+
+def end_to_end(height: int, width: int, n_objects: int, n_frames: int) -> dict:
+    frame_provider = TimedFrameProvider(height, width, n_frames=n_frames, n_objects=n_objects)
+    latency_callback = LatencyCallback(frame_provider)
+    MotionDetectionApplication(
+        frame_provider=frame_provider,
+        motion_detection_model=MotionDetectionWeightedAverage(),
+        callbacks=[latency_callback],
+    ).run()
+    result = summarize(latency_callback.latencies[1:])  # the first frame only initializes the background
+    result["motion_frames"] = latency_callback.motion_frames
+    return result
+
+
+def stages(height: int, width: int, n_objects: int, n_frames: int) -> dict:
+    """Reads the latency of every step of `MotionDetectionWeightedAverage.next_frame` from the laps the model records."""
+    # the histograms keep every lap, the first frame only goes through the preprocessing and the blur, which do the
+    # same work as for the other frames
+    registry = MetricsRegistry(window=n_frames)
+    model = MotionDetectionWeightedAverage(metrics_registry=registry)
+    for frame in SyntheticFrameProvider(height, width, n_frames=n_frames, n_objects=n_objects).frames():
+        model.next_frame(frame)
+    timings = {}
+    for stage in STAGES:
+        histogram = registry.histogram("model_stage_seconds", model=model.name(), stage=stage)
+        quantiles = histogram.quantiles((0.5, 0.99))
+        timings[stage] = {
+            "fps": histogram.count / histogram.sum,
+            "p50_ms": 1000 * quantiles[0.5],
+            "p99_ms": 1000 * quantiles[0.99],
+        }
+    return timings
+
+
+def allocations(height: int, width: int, n_objects: int, n_frames: int) -> dict:
+    frames = list(SyntheticFrameProvider(height, width, n_frames=min(n_frames, 20), n_objects=n_objects).frames())
+    model = MotionDetectionWeightedAverage()
+    model.next_frame(frames[0])
+    # numpy reports the image buffers it allocates (including the ones returned by OpenCV) to tracemalloc
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    for frame in frames[1:]:
+        model.next_frame(frame)
+    end = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    new_blocks = sum(max(stat.count_diff, 0) for stat in end.compare_to(start, "lineno"))
+    return {"peak_alloc_kb": peak / 1024, "allocations": new_blocks}
+
+
+def run_scenario(resolution: str, n_objects: int, n_frames: int) -> dict:
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+    height, width = RESOLUTIONS[resolution]
+    result = {
+        "end_to_end": end_to_end(height, width, n_objects, n_frames),
+        "stages": stages(height, width, n_objects, n_frames),
+        **allocations(height, width, n_objects, n_frames),
+    }
+    # `ru_maxrss` is in kilobytes on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_mb"] = rss / (1024**2 if sys.platform == "darwin" else 1024)
+    return result
+
+
+def run_suite(resolutions: list[str], object_counts: list[int], n_frames: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    scenarios = {}
+    for resolution in resolutions:
+        for n_objects in object_counts:
+            name = f"{resolution}_{n_objects}obj"
+            with context.Pool(1) as pool:
+                scenarios[name] = pool.apply(run_scenario, (resolution, n_objects, n_frames))
+            e2e = scenarios[name]["end_to_end"]
+            print(
+                f"{name:<12} fps={e2e['fps']:8.1f} p50={e2e['p50_ms']:7.2f}ms p99={e2e['p99_ms']:7.2f}ms "
+                f"peak rss={scenarios[name]['peak_rss_mb']:7.1f}MiB allocations={scenarios[name]['allocations']}"
+            )
+    return {
+        "metadata": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "frames": n_frames,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float = 0.05) -> list[str]:
+    """
+    Returns the latencies that are more than `tolerance` (a fraction) and more than `min_delta_ms` milliseconds slower
+    than the baseline. The absolute threshold keeps the timer noise of the fastest stages from being reported.
+    """
+    regressions = []
+    for name, scenario in results["scenarios"].items():
+        if name not in baseline["scenarios"]:
+            continue
+        reference = baseline["scenarios"][name]
+        measured = {"end_to_end": scenario["end_to_end"], **scenario["stages"]}
+        expected = {"end_to_end": reference["end_to_end"], **reference["stages"]}
+        for stage, values in measured.items():
+            if stage not in expected:  # a stage added to the model after the baseline was recorded
+                continue
+            for metric in ("p50_ms", "p99_ms"):
+                before, after = expected[stage][metric], values[metric]
+                if after > before * (1 + tolerance) and after - before > min_delta_ms:
+                    regressions.append(f"{name} {stage} {metric}: {before:.2f}ms -> {after:.2f}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--frames", type=int, help="Number of frames per scenario [default=100]", default=100)
+    parser.add_argument(
+        "-r",
+        "--resolutions",
+        nargs="+",
+        choices=list(RESOLUTIONS),
+        help="Resolutions of the scenarios [default=all]",
+        default=list(RESOLUTIONS),
+    )
+    parser.add_argument(
+        "-o",
+        "--objects",
+        nargs="+",
+        type=int,
+        help="Number of moving objects of the scenarios [default=1 4 16]",
+        default=list(OBJECT_COUNTS),
+    )
+    parser.add_argument("--save", type=Path, help="Store the results to this JSON file", default=None)
+    parser.add_argument("--compare", type=Path, help="Compare the results to this JSON baseline", default=None)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        help="Fraction by which a latency can exceed the baseline before it is reported as a regression [default=0.2]",
+        default=0.2,
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        help="Latency increase, in milliseconds, below which no regression is reported [default=0.05]",
+        default=0.05,
+    )
+    args = parser.parse_args()
+
+    results = run_suite(args.resolutions, args.objects, args.frames)
+    if args.save is not None:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+    if args.compare is not None:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance, args.min_delta)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression larger than {args.tolerance:.0%} against {args.compare}.")
+
+
+if __name__ == '__main__':
+    main()
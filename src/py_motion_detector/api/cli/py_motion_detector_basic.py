@@ -1,17 +1,31 @@
 """Main entry point of the `py_motion_detector` CLI."""
 
 import argparse
+import datetime
 import logging
 import uuid
 from pathlib import Path
 
 import structlog
 
+from py_motion_detector.callbacks.async_dispatch import BackpressurePolicy
+from py_motion_detector.callbacks.event_clip_recorder import EventClipRecorderCallback
 from py_motion_detector.callbacks.frame_file_dumper import FrameFileDumperCallback
-from py_motion_detector.common.parsers import str2time_duration, str2time_start_processing_time
+from py_motion_detector.callbacks.track_change_filter import TrackChangeFilterCallback
+from py_motion_detector.common.parsers import str2time_duration, str2time_start_processing_time, str2time_window
 from py_motion_detector.input_sources.camera import CameraFrameProvider
+from py_motion_detector.input_sources.prefetch import OverflowPolicy, PrefetchFrameProvider
+from py_motion_detector.instrumentation.prometheus import PrometheusExporter
+from py_motion_detector.models.motion_detection.cascade import CascadeMotionDetection
+from py_motion_detector.models.motion_detection.fixed_point_average import MotionDetectionFixedPointAverage
+from py_motion_detector.models.motion_detection.roi import RegionOfInterest
 from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
 from py_motion_detector.motion_detection_app import MotionDetectionApplication
+from py_motion_detector.post_processing.box_merger import MERGE_MODES, BoundingBoxMerger
+from py_motion_detector.post_processing.tracker import BoundingBoxTracker
+from py_motion_detector.scheduling.idle import AdaptiveIdleScheduler
+from py_motion_detector.storage.event_index import EVENT_INDEX_FILE_NAME
+from py_motion_detector.storage.retention import RetentionManager
 
 
 def parse_args() -> argparse.Namespace:
@@ -25,7 +39,18 @@ def parse_args() -> argparse.Namespace:
         required=True,
     )
     parser.add_argument(
-        "-r", "--resize-camera-frames", type=int, help="Resize camera captured frames [default=500]", default=500
+        "-r",
+        "--resize-camera-frames",
+        type=int,
+        help="Resize camera captured frames to a square of this size, 0 keeps the camera resolution [default=500]",
+        default=500,
+    )
+    parser.add_argument(
+        "--detection-size",
+        type=int,
+        help="Detect motion on a copy of the frames downscaled (preserving the aspect ratio) to this size, while "
+        "storing the frames at their full resolution [default=None means detect at full resolution]",
+        default=None,
     )
     parser.add_argument(
         "-m",
@@ -69,7 +94,222 @@ def parse_args() -> argparse.Namespace:
         "Format #h/m/s where # is a number and h=hours, m=minutes, s=seconds [default=24h]",
         default=None,
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "-w",
+        "--active-window",
+        type=str2time_window,
+        action="append",
+        help="Daily window of time during which motion is detected, using the format hh:mm-hh:mm, e.g. 22:00-06:00. "
+        "Can be repeated. Outside of the windows the camera is released [default=None means always on]",
+        default=None,
+    )
+    parser.add_argument(
+        "--warmup-frames",
+        type=int,
+        help="Number of frames used to initialize the background, without storing them, every time the camera is "
+        "opened [default=0]",
+        default=0,
+    )
+    parser.add_argument(
+        "--prefetch-buffer-size",
+        type=int,
+        help="Capture camera frames on a background thread into a ring buffer of this size [default=0 means disabled]",
+        default=0,
+    )
+    parser.add_argument(
+        "--prefetch-policy",
+        type=str,
+        help="What to do when the prefetch buffer is full [default=drop_oldest]",
+        choices=[p.value for p in OverflowPolicy],
+        default=OverflowPolicy.DROP_OLDEST.value,
+    )
+    parser.add_argument(
+        "--roi-file",
+        type=Path,
+        help="JSON file with the polygons of the regions where motion is detected ('include') or ignored ('exclude') "
+        "[default=None means the whole frame]",
+        default=None,
+    )
+    parser.add_argument(
+        "--idle-after",
+        type=float,
+        help="Lower the processing rate after this many seconds without motion [default=None means never]",
+        default=None,
+    )
+    parser.add_argument(
+        "--idle-fps",
+        type=float,
+        help="Maximum number of frames per second processed when idle [default=1]",
+        default=1.0,
+    )
+    parser.add_argument(
+        "--async-callbacks",
+        action='store_true',
+        help="Execute the callbacks (e.g. storing frames to disk) on worker threads [default=False]",
+        default=False,
+    )
+    parser.add_argument(
+        "--callback-backpressure",
+        type=str,
+        help="What to do when the queue of an asynchronous callback is full [default=block]",
+        choices=[p.value for p in BackpressurePolicy],
+        default=BackpressurePolicy.BLOCK.value,
+    )
+    parser.add_argument(
+        "--background-writer",
+        action='store_true',
+        help="Encode and store frames on background threads, syncing files to disk in batches [default=False]",
+        default=False,
+    )
+    parser.add_argument(
+        "--jpeg-quality", type=int, help="JPEG quality of the stored frames, from 0 to 100 [default=95]", default=95
+    )
+    parser.add_argument(
+        "--writer-queue-depth",
+        type=int,
+        help="Maximum number of frames queued by the background writer [default=32]",
+        default=32,
+    )
+    parser.add_argument(
+        "--bounding-boxes-format",
+        type=str,
+        help="Store the bounding boxes of every frame in its own JSON file or append them to a single binary log "
+        "[default=json]",
+        choices=["json", "binary"],
+        default="json",
+    )
+    parser.add_argument(
+        "--fixed-point",
+        action='store_true',
+        help="Keep the running average of the motion detection model as fixed-point integers, for CPUs where floating "
+        "point image arithmetic is slow [default=False]",
+        default=False,
+    )
+    parser.add_argument(
+        "--blob-extraction",
+        type=str,
+        help="Extract the bounding boxes from the motion mask with cv2.findContours or, faster when the mask holds "
+        "hundreds of blobs (e.g. noisy night frames), with cv2.connectedComponentsWithStats [default=contours]",
+        choices=["contours", "components"],
+        default="contours",
+    )
+    parser.add_argument(
+        "--cascade-thumbnail-size",
+        type=int,
+        help="Only run the motion detection model on the frames where a cheap test on a thumbnail of this size "
+        "detects a change [default=None means every frame]",
+        default=None,
+    )
+    parser.add_argument(
+        "--merge-iou",
+        type=float,
+        help="Merge the bounding boxes whose intersection over union is above this threshold, 0 merges all the "
+        "overlapping boxes [default=None means disabled]",
+        default=None,
+    )
+    parser.add_argument(
+        "--merge-gap",
+        type=int,
+        help="Merge the bounding boxes that are at most this many pixels apart [default=None means disabled]",
+        default=None,
+    )
+    parser.add_argument(
+        "--merge-mode",
+        type=str,
+        help="Replace every group of merged boxes by the box enclosing them or only keep its largest box "
+        "[default=merge]",
+        choices=list(MERGE_MODES),
+        default="merge",
+    )
+    parser.add_argument(
+        "--track-min-displacement",
+        type=float,
+        help="Track the bounding boxes across frames and only store a frame when a track starts or ends, or moves by "
+        "more than this many pixels [default=None means every frame with motion is stored]",
+        default=None,
+    )
+    parser.add_argument(
+        "--keyframe-interval",
+        type=int,
+        help="With --track-min-displacement, also store a frame every this many frames while a track lasts "
+        "[default=100]",
+        default=100,
+    )
+    parser.add_argument(
+        "--shard-by-hour",
+        action='store_true',
+        help="Store the frames in one sub-directory per day and hour, PATH_TO_DIR/<session>/YYYY-MM-DD/HH "
+        "[default=False]",
+        default=False,
+    )
+    parser.add_argument(
+        "--max-storage-gb",
+        type=float,
+        help="With --shard-by-hour, delete the oldest hours of frames of all the sessions of PATH_TO_DIR when they "
+        "take more than this many GiB [default=None means no limit]",
+        default=None,
+    )
+    parser.add_argument(
+        "--max-age-days",
+        type=float,
+        help="With --shard-by-hour, delete the hours of frames older than this many days [default=None means no limit]",
+        default=None,
+    )
+    parser.add_argument(
+        "--event-index",
+        action='store_true',
+        help=f"Add every stored frame to the SQLite catalogue PATH_TO_DIR/{EVENT_INDEX_FILE_NAME}, which can be queried "
+        "with py_motion_detector_events [default=False]",
+        default=False,
+    )
+    parser.add_argument(
+        "--record-clips",
+        action='store_true',
+        help="Store every motion event as a single video clip instead of one image per frame. Cannot be combined with "
+        "the options storing or filtering the frames one by one [default=False]",
+        default=False,
+    )
+    parser.add_argument(
+        "--pre-roll-frames",
+        type=int,
+        help="Number of frames before a motion event stored in its clip [default=20]",
+        default=20,
+    )
+    parser.add_argument(
+        "--post-roll-frames",
+        type=int,
+        help="Number of frames after a motion event stored in its clip [default=20]",
+        default=20,
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        help="Log a summary of the timings and frame counters every this many seconds [default=None means never]",
+        default=None,
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve the metrics in the Prometheus text format at http://127.0.0.1:PORT/metrics "
+        "[default=None means disabled]",
+        default=None,
+    )
+    args = parser.parse_args()
+    if (args.max_storage_gb is not None or args.max_age_days is not None) and not args.shard_by_hour:
+        parser.error("--max-storage-gb and --max-age-days require --shard-by-hour.")
+    if args.record_clips:
+        # these options only apply to the frames stored one by one
+        frame_options = {
+            "--background-writer": args.background_writer,
+            "--bounding-boxes-format": args.bounding_boxes_format != "json",
+            "--event-index": args.event_index,
+            "--shard-by-hour": args.shard_by_hour,
+            "--track-min-displacement": args.track_min_displacement is not None,
+        }
+        rejected = [option for option, is_set in frame_options.items() if is_set]
+        if rejected:
+            parser.error(f"{', '.join(rejected)} cannot be used with --record-clips.")
+    return args
 
 
 def main() -> None:
@@ -82,23 +322,90 @@ def main() -> None:
         logger_factory=structlog.WriteLoggerFactory(file=(args.path_to_dir / p_id).with_suffix(".log").open("wt")),
     )
 
-    callbacks = [FrameFileDumperCallback(args.path_to_dir / p_id)]
+    if args.record_clips:
+        callbacks = [
+            EventClipRecorderCallback(
+                args.path_to_dir / p_id, pre_roll_frames=args.pre_roll_frames, post_roll_frames=args.post_roll_frames
+            )
+        ]
+    else:
+        callbacks = [
+            FrameFileDumperCallback(
+                args.path_to_dir / p_id,
+                background_writer=args.background_writer,
+                jpeg_quality=args.jpeg_quality,
+                queue_depth=args.writer_queue_depth,
+                bounding_boxes_format=args.bounding_boxes_format,
+                event_index_path=args.path_to_dir / EVENT_INDEX_FILE_NAME if args.event_index else None,
+                session_id=p_id,
+                shard_by_hour=args.shard_by_hour,
+            )
+        ]
+        if args.track_min_displacement is not None:
+            callbacks = [
+                TrackChangeFilterCallback(
+                    callbacks[0], min_displacement=args.track_min_displacement, keyframe_interval=args.keyframe_interval
+                )
+            ]
 
     input_source = CameraFrameProvider(
         resize_frame=args.resize_camera_frames, video_capture_index=args.opencv_video_capture_index
     )
+    if args.prefetch_buffer_size > 0:
+        input_source = PrefetchFrameProvider(
+            input_source, buffer_size=args.prefetch_buffer_size, overflow_policy=args.prefetch_policy
+        )
+
+    model_class = MotionDetectionFixedPointAverage if args.fixed_point else MotionDetectionWeightedAverage
+    motion_detection_model = model_class(
+        min_area=args.min_area,
+        delta_threshold=args.delta_threshold,
+        detection_size=args.detection_size,
+        roi=RegionOfInterest.from_json(args.roi_file) if args.roi_file is not None else None,
+        blob_extraction=args.blob_extraction,
+    )
+    if args.cascade_thumbnail_size is not None:
+        motion_detection_model = CascadeMotionDetection(
+            motion_detection_model, thumbnail_size=args.cascade_thumbnail_size
+        )
+
+    post_processors = []
+    if args.merge_iou is not None or args.merge_gap is not None:
+        post_processors.append(
+            BoundingBoxMerger(iou_threshold=args.merge_iou, max_gap=args.merge_gap, mode=args.merge_mode)
+        )
+    if args.track_min_displacement is not None:
+        post_processors.append(BoundingBoxTracker())
 
     print(f"Starting the motion detection app: {p_id}.")
     motion_app = MotionDetectionApplication(
         frame_provider=input_source,
         from_time=args.start_processing_time,
         duration=args.processing_duration,
-        motion_detection_model=MotionDetectionWeightedAverage(
-            min_area=args.min_area, delta_threshold=args.delta_threshold
-        ),
+        active_windows=args.active_window,
+        warmup_frames=args.warmup_frames,
+        motion_detection_model=motion_detection_model,
+        post_processors=post_processors,
         callbacks=callbacks,
+        async_callbacks=args.async_callbacks,
+        callback_backpressure=args.callback_backpressure,
+        idle_scheduler=(
+            AdaptiveIdleScheduler(quiet_period_sec=args.idle_after, idle_fps=args.idle_fps)
+            if args.idle_after is not None
+            else None
+        ),
+        metrics_interval_sec=args.metrics_interval,
     )
 
+    if args.metrics_port is not None:
+        PrometheusExporter(port=args.metrics_port).start()
+    if args.max_storage_gb is not None or args.max_age_days is not None:
+        RetentionManager(
+            args.path_to_dir,
+            max_bytes=int(args.max_storage_gb * 1024**3) if args.max_storage_gb is not None else None,
+            max_age=datetime.timedelta(days=args.max_age_days) if args.max_age_days is not None else None,
+            event_index_path=args.path_to_dir / EVENT_INDEX_FILE_NAME if args.event_index else None,
+        ).start()
     motion_app.run()
 
 
@@ -3,6 +3,7 @@
 import argparse
 from pathlib import Path
 
+from py_motion_detector.common.parsers import str2timestamp_ms
 from py_motion_detector.utils.logged_data_player import play_logged_data
 
 
@@ -27,12 +28,48 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "-l", "--loop", action='store_true', help="Loop logged frames forever [default=False]", default=False
     )
+    parser.add_argument(
+        "-s",
+        "--start",
+        type=str2timestamp_ms,
+        help="Start the playback from this timestamp, in milliseconds since the epoch or as an ISO 8601 date and time "
+        "such as 2024-03-01T18:30:00 [default=None means from the first frame]",
+        default=None,
+    )
+    parser.add_argument(
+        "-x",
+        "--speed",
+        type=float,
+        help="Play the frames at the pace they were logged at, multiplied by this factor, instead of every --wait-ms "
+        "milliseconds [default=None]",
+        default=None,
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        help="Number of frames decoded ahead of the one being shown [default=8]",
+        default=8,
+    )
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        help="Maximum size in MiB of the decoded frames kept in memory for looped playback [default=256]",
+        default=256,
+    )
     return parser.parse_args()
 
 
 def main():
     args = parse_args()
-    play_logged_data(directory=args.path_to_logged_data, wait_ms=args.wait_ms, loop_forever=args.loop)
+    play_logged_data(
+        directory=args.path_to_logged_data,
+        wait_ms=args.wait_ms,
+        loop_forever=args.loop,
+        start_timestamp=args.start,
+        speed=args.speed,
+        prefetch_size=args.prefetch,
+        cache_mb=args.cache_mb,
+    )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,120 @@
+"""Entry point of the `py_motion_detector_events` CLI, querying and rebuilding the SQLite catalogue of stored frames."""
+
+import argparse
+import datetime
+import json
+import logging
+from pathlib import Path
+
+import structlog
+
+from py_motion_detector.common.parsers import str2timestamp_ms
+from py_motion_detector.storage.event_index import EVENT_INDEX_FILE_NAME, EventIndex, reindex_tree
+
+
+def parse_args() -> argparse.Namespace:
+    """Parsing the command line arguments"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-p",
+        "--path-to-dir",
+        type=Path,
+        help="Path to the directory where the frames of the motion detection sessions are stored",
+        required=True,
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        help=f"Path to the event index [default=PATH_TO_DIR/{EVENT_INDEX_FILE_NAME}]",
+        default=None,
+    )
+    parser.add_argument(
+        "-i",
+        "--log-info",
+        type=str,
+        help="Log level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        default="WARNING",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser(
+        "reindex",
+        help="Add the frames of PATH_TO_DIR and of its session sub-directories that are not in the index yet",
+    )
+
+    query = subparsers.add_parser("query", help="Print the indexed frames matching all the given conditions")
+    query.add_argument(
+        "-s",
+        "--start",
+        type=str2timestamp_ms,
+        help="Only the frames stored at or after this time, in milliseconds since the epoch or as an ISO 8601 date "
+        "and time such as 2024-03-01T02:00:00 [default=None]",
+        default=None,
+    )
+    query.add_argument(
+        "-e",
+        "--end",
+        type=str2timestamp_ms,
+        help="Only the frames stored before this time, in the same format as --start [default=None]",
+        default=None,
+    )
+    query.add_argument("--session", type=str, help="Only the frames of this session [default=None]", default=None)
+    query.add_argument(
+        "--min-boxes",
+        type=int,
+        help="Only the frames with at least this many bounding boxes [default=None]",
+        default=None,
+    )
+    query.add_argument(
+        "-a",
+        "--min-area-ratio",
+        type=float,
+        help="Only the frames with a bounding box covering at least this fraction of the frame, e.g. 0.1 [default=None]",
+        default=None,
+    )
+    query.add_argument("-n", "--limit", type=int, help="Maximum number of frames printed [default=None]", default=None)
+    query.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        help="Print a table, one JSON object per frame or the paths of the images only [default=table]",
+        choices=["table", "json", "paths"],
+        default="table",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.getLevelName(args.log_info)))
+    index_path = args.index if args.index is not None else args.path_to_dir / EVENT_INDEX_FILE_NAME
+
+    with EventIndex(index_path) as index:
+        if args.command == "reindex":
+            added = reindex_tree(index, args.path_to_dir)
+            print(f"Added {added} frames to {index_path}, which now holds {len(index)} frames.")
+            return
+
+        frames = index.query(
+            start=args.start,
+            end=args.end,
+            session=args.session,
+            min_boxes=args.min_boxes,
+            min_area_ratio=args.min_area_ratio,
+            limit=args.limit,
+        )
+    for frame in frames:
+        if args.format == "json":
+            print(json.dumps(frame.to_dict()))
+        elif args.format == "paths":
+            print(frame.path)
+        else:
+            time = datetime.datetime.fromtimestamp(frame.timestamp / 1000).isoformat(timespec="milliseconds")
+            print(
+                f"{time}  {frame.session}  boxes={frame.n_boxes:<3d} max_area={frame.max_area_ratio:6.1%}  {frame.path}"
+            )
+
+
+if __name__ == '__main__':
+    main()
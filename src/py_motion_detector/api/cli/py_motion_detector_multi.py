@@ -0,0 +1,124 @@
+"""Entry point of the `py_motion_detector_multi` CLI, running one motion detection pipeline per camera."""
+
+import argparse
+import functools
+import logging
+import os
+import uuid
+from pathlib import Path
+
+import structlog
+
+from py_motion_detector.callbacks.frame_file_dumper import FrameFileDumperCallback
+from py_motion_detector.input_sources.camera import CameraFrameProvider
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+from py_motion_detector.multi_source.supervisor import MultiSourceSupervisor, PipelineSpec
+
+
+def parse_args() -> argparse.Namespace:
+    """Parsing the command line arguments"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-p",
+        "--path-to-dir",
+        type=Path,
+        help="Path to directory to store frames, in one sub-directory per camera",
+        required=True,
+    )
+    parser.add_argument(
+        "-c",
+        "--opencv-video-capture-index",
+        type=int,
+        action="append",
+        help="Index of a camera for OpenCV, repeat the option for every camera [default=0]",
+    )
+    parser.add_argument(
+        "-r",
+        "--resize-camera-frames",
+        type=int,
+        help="Resize camera captured frames to a square of this size [default=500]",
+        default=500,
+    )
+    parser.add_argument(
+        "-m",
+        "--min-area",
+        type=int,
+        help="Motion detection with weighted average past frames, minimum area to be detected [default=5000]",
+        default=5000,
+    )
+    parser.add_argument(
+        "-t",
+        "--delta-threshold",
+        type=int,
+        help="Motion detection with weighted average past frames, threshold value for the difference between current "
+        "frame and weighted average [default=5]",
+        default=5,
+    )
+    parser.add_argument(
+        "-i",
+        "--log-info",
+        type=str,
+        help="Log level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        default="INFO",
+    )
+    parser.add_argument(
+        "--pin-cpus",
+        action='store_true',
+        help="Pin the processes of every camera to their own CPU core [default=False]",
+        default=False,
+    )
+    parser.add_argument(
+        "--max-restarts",
+        type=int,
+        help="Maximum number of times a failed camera or detection process is restarted [default=5]",
+        default=5,
+    )
+    parser.add_argument(
+        "--summary-interval",
+        type=float,
+        help="Log the metrics of all cameras every this many seconds [default=60]",
+        default=60.0,
+    )
+    return parser.parse_args()
+
+
+def _callbacks(directory: Path) -> list[FrameFileDumperCallback]:
+    """Creates the callbacks of a camera in its detection process."""
+    return [FrameFileDumperCallback(directory)]
+
+
+def main() -> None:
+    p_id = str(uuid.uuid4())
+    args = parse_args()
+    if args.resize_camera_frames <= 0:
+        raise ValueError("The frames of all cameras need to be resized to a fixed size.")
+    camera_indices = args.opencv_video_capture_index or [0]
+
+    args.path_to_dir.mkdir(parents=True, exist_ok=True)
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.getLevelName(args.log_info)),
+        logger_factory=structlog.WriteLoggerFactory(file=(args.path_to_dir / p_id).with_suffix(".log").open("wt")),
+    )
+
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    specs = [
+        PipelineSpec(
+            name=f"camera_{index}",
+            frame_provider_factory=functools.partial(CameraFrameProvider, args.resize_camera_frames, index),
+            frame_shape=(args.resize_camera_frames, args.resize_camera_frames, 3),
+            model_factory=functools.partial(
+                MotionDetectionWeightedAverage, min_area=args.min_area, delta_threshold=args.delta_threshold
+            ),
+            callbacks_factory=functools.partial(_callbacks, args.path_to_dir / p_id / f"camera_{index}"),
+            cpus={cpus[i % len(cpus)]} if args.pin_cpus else None,
+        )
+        for i, index in enumerate(camera_indices)
+    ]
+
+    print(f"Starting the motion detection app for {len(specs)} cameras: {p_id}.")
+    MultiSourceSupervisor(specs, max_restarts=args.max_restarts, summary_interval_sec=args.summary_interval).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Entry point of the `py_motion_detector_offline` CLI, detecting motion in a recorded video with a process pool."""
+
+import argparse
+import functools
+import logging
+from pathlib import Path
+
+import structlog
+
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+from py_motion_detector.offline.analysis import OfflineVideoAnalyzer, write_events
+
+
+def parse_args() -> argparse.Namespace:
+    """Parsing the command line arguments"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-v", "--video", type=Path, help="Path to the video to analyse", required=True)
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="Path to the JSON lines file where the motion events are stored [default=VIDEO.events.jsonl]",
+        default=None,
+    )
+    parser.add_argument(
+        "-b",
+        "--bounding-boxes-log",
+        type=Path,
+        help="Also store the bounding boxes of every frame with motion to this binary log [default=None]",
+        default=None,
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, help="Number of processes [default=None means one per CPU]", default=None
+    )
+    parser.add_argument(
+        "--chunk-sec", type=float, help="Duration of the chunks analysed by every task [default=300]", default=300.0
+    )
+    parser.add_argument(
+        "--warmup-sec",
+        type=float,
+        help="Duration of video processed before every chunk to initialize the background [default=5]",
+        default=5.0,
+    )
+    parser.add_argument(
+        "--max-gap-sec",
+        type=float,
+        help="Frames with motion less than this many seconds apart belong to the same event [default=2]",
+        default=2.0,
+    )
+    parser.add_argument(
+        "--stride",
+        type=int,
+        help="Analyse one frame out of this many, the other frames are not decoded [default=1]",
+        default=1,
+    )
+    parser.add_argument(
+        "--target-fps",
+        type=float,
+        help="Analyse about this many frames per second of video, overrides --stride [default=None]",
+        default=None,
+    )
+    parser.add_argument(
+        "-r",
+        "--resize-frames",
+        type=int,
+        help="Resize the frames to a square of this size [default=None means the video resolution]",
+        default=None,
+    )
+    parser.add_argument(
+        "-m",
+        "--min-area",
+        type=int,
+        help="Motion detection with weighted average past frames, minimum area to be detected [default=5000]",
+        default=5000,
+    )
+    parser.add_argument(
+        "-t",
+        "--delta-threshold",
+        type=int,
+        help="Motion detection with weighted average past frames, threshold value for the difference between current "
+        "frame and weighted average [default=5]",
+        default=5,
+    )
+    parser.add_argument(
+        "-i",
+        "--log-info",
+        type=str,
+        help="Log level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        default="INFO",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.getLevelName(args.log_info)))
+
+    analyzer = OfflineVideoAnalyzer(
+        args.video,
+        model_factory=functools.partial(
+            MotionDetectionWeightedAverage, min_area=args.min_area, delta_threshold=args.delta_threshold
+        ),
+        workers=args.workers,
+        chunk_sec=args.chunk_sec,
+        warmup_sec=args.warmup_sec,
+        max_gap_sec=args.max_gap_sec,
+        resize_frame=args.resize_frames,
+        stride=args.stride,
+        target_fps=args.target_fps,
+    )
+    events = analyzer.run(bounding_box_log_path=args.bounding_boxes_log)
+
+    output = args.output if args.output is not None else args.video.with_suffix(".events.jsonl")
+    write_events(events, output)
+    print(f"Stored {len(events)} motion events to {output}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+import collections
+import datetime
+import enum
+import threading
+
+import numpy as np
+import structlog
+
+from py_motion_detector.callbacks.base import MotionDetectionCallbackABC
+from py_motion_detector.models.bounding_box import BoundingBoxArray, BoundingBoxes
+
+logger = structlog.get_logger()
+
+
+class BackpressurePolicy(str, enum.Enum):
+    """What an `AsyncCallback` does when its queue is full."""
+
+    BLOCK = "block"
+    """Wait until the worker takes an item. No frames are lost but the detector loop may be slowed down."""
+
+    DROP = "drop"
+    """Discard the new frame."""
+
+    COALESCE = "coalesce"
+    """Discard the oldest queued frame in favour of the new one, so the callback always catches up to the newest."""
+
+
+class AsyncCallback(MotionDetectionCallbackABC):
+    """
+    Runs the `execute` method of another callback on a dedicated worker thread, using a bounded queue between the
+    detector loop and the worker. OpenCV releases the GIL for image encoding and disk I/O, so a slow callback such as
+    `FrameFileDumperCallback` no longer reduces the frame rate of the motion detection.
+
+    Exceptions raised by the wrapped callback (including the `KeyboardInterrupt` used by `FrameRendererCallback` to
+    stop the app) are re-raised on the detector thread on the next call to `execute`.
+
+    Example usage:
+
+    callbacks = [AsyncCallback(FrameFileDumperCallback(Path("/tmp/frames")), queue_size=32)]
+    """
+
+    def __init__(
+        self,
+        callback: MotionDetectionCallbackABC,
+        queue_size: int = 16,
+        backpressure: BackpressurePolicy | str = BackpressurePolicy.BLOCK,
+        drain_timeout_sec: float | None = None,
+    ):
+        """
+
+        Args:
+            callback: The callback to execute on the worker thread.
+            queue_size: Maximum number of frames waiting to be processed by the callback.
+            backpressure: What to do when the queue is full, see `BackpressurePolicy`.
+            drain_timeout_sec: Maximum number of seconds to wait for the queued frames to be processed on exit.
+                `None` waits until the queue is empty.
+        """
+        if queue_size < 1:
+            raise ValueError(f"The queue size needs to be a positive integer, not {queue_size}.")
+        self.callback = callback
+        self.queue_size = queue_size
+        self.backpressure = BackpressurePolicy(backpressure)
+        self.drain_timeout_sec = drain_timeout_sec
+
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._closing = False
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+
+        self.executed_frames = 0
+        self.dropped_frames = 0
+
+    def name(self) -> str:
+        return f"{type(self).__name__}({self.callback.name()})"
+
+    def on_start(self) -> None:
+        self.callback.on_start()
+        self._closing = False
+        self._thread = threading.Thread(target=self._worker_loop, name=self.name(), daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Dispatching '{self.callback.name()}' on a worker thread (queue size={self.queue_size}, "
+            f"backpressure={self.backpressure.value}).",
+            callback=self.name(),
+        )
+
+    @property
+    def needs_frames_without_motion(self) -> bool:
+        return self.callback.needs_frames_without_motion
+
+    def execute(self, frame: np.array, timestamp: datetime.datetime, bounding_boxes: BoundingBoxes) -> None:
+        """
+        Queues the frame for the wrapped callback. Frames and bounding boxes are copied before being queued. Frames
+        without bounding boxes are neither copied nor queued if the wrapped callback does not need them.
+        """
+        if self._error is not None:
+            raise self._error
+        if len(bounding_boxes) == 0 and not self.callback.needs_frames_without_motion:
+            return
+
+        with self._condition:
+            if len(self._queue) >= self.queue_size:
+                if self.backpressure == BackpressurePolicy.DROP:
+                    self.dropped_frames += 1
+                    return
+                if self.backpressure == BackpressurePolicy.COALESCE:
+                    self._queue.popleft()
+                    self.dropped_frames += 1
+                else:
+                    self._condition.wait_for(lambda: len(self._queue) < self.queue_size or self._error is not None)
+
+            bounding_boxes = (
+                bounding_boxes.copy() if isinstance(bounding_boxes, BoundingBoxArray) else list(bounding_boxes)
+            )
+            self._queue.append((frame.copy(), timestamp, bounding_boxes))
+            self._condition.notify_all()
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._queue) > 0 or self._closing)
+                if not self._queue:
+                    return
+                frame, timestamp, bounding_boxes = self._queue.popleft()
+                self._condition.notify_all()
+
+            try:
+                self.callback.execute(frame=frame, timestamp=timestamp, bounding_boxes=bounding_boxes)
+                self.executed_frames += 1
+            except BaseException as e:  # re-raised on the detector thread
+                logger.exception(f"Callback '{self.callback.name()}' raised: {e!r}", callback=self.name())
+                with self._condition:
+                    self._error = e
+                    self._queue.clear()
+                    self._condition.notify_all()
+                return
+
+    def on_exit(self) -> None:
+        """
+        Waits for the queued frames to be processed by the wrapped callback and then shuts it down. If the worker does
+        not finish within `drain_timeout_sec` the wrapped callback is not shut down, since the worker may still be
+        executing it.
+        """
+        logger.info(f"Draining {len(self._queue)} queued frames.", callback=self.name())
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(self.drain_timeout_sec)
+            if self._thread.is_alive():
+                logger.warning(
+                    f"Worker did not drain its queue in {self.drain_timeout_sec} seconds, '{self.callback.name()}' is "
+                    "not shut down.",
+                    callback=self.name(),
+                )
+                return
+            self._thread = None
+        logger.info(
+            f"Executed frames={self.executed_frames}, dropped frames={self.dropped_frames}.", callback=self.name()
+        )
+        self.callback.on_exit()
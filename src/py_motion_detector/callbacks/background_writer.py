@@ -0,0 +1,169 @@
+import json
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+_STOP = object()
+
+
+class BackgroundFrameWriter:
+    """
+    Encodes frames to JPEG in a small pool of worker threads and writes them (and optionally a JSON document) to disk
+    from a single writer thread. Files are written in submission order and are `fsync`ed in batches instead of one
+    by one.
+
+    Example usage:
+
+    writer = BackgroundFrameWriter(jpeg_quality=90)
+    writer.start()
+    writer.submit(Path("/tmp/frame.jpg"), frame, Path("/tmp/frame.json"), [bb.to_dict() for bb in bounding_boxes])
+    writer.close()
+    """
+
+    def __init__(self, encode_workers: int = 2, queue_depth: int = 32, jpeg_quality: int = 95, fsync_every: int = 16):
+        """
+
+        Args:
+            encode_workers: Number of threads encoding frames to JPEG.
+            queue_depth: Maximum number of frames being encoded or waiting to be written. `submit` blocks when the
+                queue is full.
+            jpeg_quality: JPEG quality, from 0 to 100.
+            fsync_every: Number of frames written between two `fsync` calls. `0` disables `fsync`.
+        """
+        self.encode_workers = encode_workers
+        self.queue_depth = queue_depth
+        self.jpeg_quality = jpeg_quality
+        self.fsync_every = fsync_every
+
+        self._encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
+        self._slots = threading.BoundedSemaphore(queue_depth)
+        self._write_queue: queue.Queue = queue.Queue()
+        self._executor: ThreadPoolExecutor | None = None
+        self._writer_thread: threading.Thread | None = None
+        self._unsynced_files: list = []
+        self._unsynced_directories: set = set()
+
+        self.written_frames = 0
+        self.failed_frames = 0
+
+    def start(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self.encode_workers, thread_name_prefix="jpeg-encoder")
+        self._writer_thread = threading.Thread(target=self._writer_loop, name="frame-writer", daemon=True)
+        self._writer_thread.start()
+
+    def submit(
+        self,
+        image_path: Path,
+        frame: np.array,
+        json_path: Path | None = None,
+        json_data: Any = None,
+        on_written: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Queues a frame to be encoded and written to `image_path`, and `json_data` to be written to `json_path`.
+        The frame must not be modified by the caller after it has been submitted. `on_written` is called on the writer
+        thread once the files have been written, and is not called if they could not be.
+        """
+        self._slots.acquire()
+        encoded = self._executor.submit(self._encode, frame)
+        self._write_queue.put((encoded, image_path, json_path, json_data, on_written))
+
+    def _encode(self, frame: np.array) -> np.array:
+        ok, buffer = cv2.imencode(".jpg", frame, self._encode_params)
+        if not ok:
+            raise RuntimeError("OpenCV failed to encode the frame to JPEG.")
+        return buffer
+
+    def _writer_loop(self):
+        while True:
+            try:
+                item = self._write_queue.get(timeout=0.5)
+            except queue.Empty:
+                self._sync()
+                continue
+            if item is _STOP:
+                self._sync()
+                return
+
+            encoded, image_path, json_path, json_data, on_written = item
+            try:
+                self._write(encoded, image_path, json_path, json_data)
+                self.written_frames += 1
+            except Exception as e:  # the writer thread keeps storing the next frames
+                self.failed_frames += 1
+                logger.exception(f"Failed to store frame '{image_path}': {e!r}")
+                on_written = None
+            finally:
+                self._slots.release()
+            if on_written is not None:
+                try:
+                    on_written()
+                except Exception as e:
+                    logger.exception(f"Callback of the stored frame '{image_path}' raised: {e!r}")
+
+            if len(self._unsynced_files) >= self.fsync_every or self._write_queue.empty():
+                self._sync()
+
+    def _write(self, encoded: Future, image_path: Path, json_path: Path | None, json_data: Any):
+        self._write_file(image_path, encoded.result().tobytes())
+        logger.debug(f"Image stored at '{image_path}'.")
+        if json_path is not None:
+            self._write_file(json_path, json.dumps(json_data, indent=4).encode())
+            logger.debug(f"Bounding boxes stored at '{json_path}'.")
+
+    def _write_file(self, path: Path, data: bytes):
+        """Writes `data` to `path`. The file is kept open until the next `_sync` if `fsync_every` is not 0."""
+        f = open(path, "wb")
+        try:
+            f.write(data)
+            f.flush()
+        except BaseException:
+            f.close()  # e.g. the disk is full, the failed frames would otherwise leak a file descriptor each
+            raise
+        if self.fsync_every > 0:
+            self._unsynced_files.append(f)
+            self._unsynced_directories.add(path.parent)
+        else:
+            f.close()
+
+    def _sync(self):
+        """Syncs and closes the written files and their directories. Failures are logged, never raised."""
+        files, directories = self._unsynced_files, self._unsynced_directories
+        self._unsynced_files = []
+        self._unsynced_directories = set()
+        for f in files:
+            try:
+                os.fsync(f.fileno())
+            except OSError as e:
+                logger.exception(f"Failed to sync '{f.name}': {e!r}")
+            finally:
+                f.close()
+        for directory in directories:
+            try:
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                logger.exception(f"Failed to sync the directory '{directory}': {e!r}")
+
+    def close(self) -> None:
+        """Waits until all submitted frames have been encoded, written and synced to disk."""
+        if self._writer_thread is None:
+            return
+        self._write_queue.put(_STOP)
+        self._writer_thread.join()
+        self._executor.shutdown(wait=True)
+        self._writer_thread = None
+        self._executor = None
+        logger.info(f"Background writer closed. Written frames={self.written_frames}, failed={self.failed_frames}.")
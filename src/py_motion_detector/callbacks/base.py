@@ -1,29 +1,34 @@
 import abc
 import datetime
-from typing import List
 
 import numpy as np
 
-from py_motion_detector.models.bounding_box import BoundingBox
+from py_motion_detector.models.bounding_box import BoundingBoxes
 
 
 class MotionDetectionCallbackABC(abc.ABC):
     """The base callback class used to respond to motion detected events."""
 
+    needs_frames_without_motion: bool = True
+    """
+    Whether `execute` does anything for the frames where no motion was detected. Wrappers such as `AsyncCallback` do
+    not pass those frames to the callbacks setting it to `False`.
+    """
+
     @abc.abstractmethod
     def on_start(self) -> None:
         """Executed when the motion detection application starts."""
 
     @abc.abstractmethod
-    def execute(self, frame: np.array, timestamp: datetime.datetime, bounding_boxes: List[BoundingBox]) -> None:
+    def execute(self, frame: np.array, timestamp: datetime.datetime, bounding_boxes: BoundingBoxes) -> None:
         """
         This method is called by the `MotionDetectionApplication` for every input frame.
 
         Args:
             frame: The current input image.
             timestamp: The current timestamp.
-            bounding_boxes: A list of bounding boxes indicating the regions where motion was detected. If no motion was
-                detected then this will be an empty list.
+            bounding_boxes: A list of bounding boxes (or a `BoundingBoxArray`) indicating the regions where motion was
+                detected. If no motion was detected then this will be empty.
         """
 
     @abc.abstractmethod
@@ -0,0 +1,150 @@
+import datetime
+import json
+from pathlib import Path
+
+import cv2
+import numpy as np
+import structlog
+
+from py_motion_detector.callbacks.base import MotionDetectionCallbackABC
+from py_motion_detector.common.plotting import plot_bounding_boxes, plot_timestamp_to_frame
+from py_motion_detector.common.ring_buffer import FrameRingBuffer
+from py_motion_detector.models.bounding_box import BoundingBoxArray, BoundingBoxes
+
+logger = structlog.get_logger()
+
+
+class EventClipRecorderCallback(MotionDetectionCallbackABC):
+    def __init__(
+        self,
+        directory_to_store: Path,
+        pre_roll_frames: int = 20,
+        post_roll_frames: int = 20,
+        fps: float = 10.0,
+        fourcc: str = "mp4v",
+        clip_extension: str = "mp4",
+        draw_bounding_boxes: bool = False,
+    ):
+        """
+        Groups consecutive motion frames into events and stores every event as a single compressed video clip, instead
+        of one image per frame. A number of frames before the first and after the last motion frame of an event are
+        also recorded, so the clip shows how the event started and ended.
+
+        For every clip `<timestamp>.<clip_extension>` an index `<timestamp>.jsonl` is written next to it, with one line
+        per frame of the clip holding its frame index, timestamp (in milliseconds) and bounding boxes.
+
+        Args:
+            directory_to_store: The path of the root directory where the clips and their indices will be stored.
+            pre_roll_frames: Number of frames before the motion started that are kept in memory and written at the
+                beginning of every clip.
+            post_roll_frames: Number of frames without motion written after the last motion frame. Motion within the
+                post-roll extends the current event.
+            fps: Frame rate of the stored clips.
+            fourcc: Four character code of the codec used by `cv2.VideoWriter`.
+            clip_extension: File extension (container) of the stored clips.
+            draw_bounding_boxes: If set to `True` the bounding boxes of the regions where motion was detected will be
+                drawn to the stored frames.
+        """
+        self.directory_to_store = directory_to_store
+        self.post_roll_frames = post_roll_frames
+        self.fps = fps
+        self.fourcc = fourcc
+        self.clip_extension = clip_extension
+        self.draw_bounding_boxes = draw_bounding_boxes
+
+        self._pre_roll = FrameRingBuffer(pre_roll_frames) if pre_roll_frames > 0 else None
+        self._video_writer: cv2.VideoWriter | None = None
+        self._index_file = None
+        self._clip_path: Path | None = None
+        self._frame_shape: tuple | None = None
+        self._frame_index = 0
+        self._frames_since_motion = 0
+
+    def on_start(self):
+        """
+        Executed when the motion detection application starts and will attempt to create the directory where the clips
+        will be stored.
+        """
+        logger.info(f"Initializing callback class '{self.name()}'.", callback=self.name())
+        self.directory_to_store.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Storing motion event clips at '{self.directory_to_store}'.", callback=self.name())
+
+    def execute(self, frame: np.array, timestamp: datetime.datetime, bounding_boxes: BoundingBoxes):
+        """
+        Args:
+            frame: The current input image.
+            timestamp: The current timestamp.
+            bounding_boxes: A list of bounding boxes indicating the regions where motion was detected.
+        """
+        frame = plot_timestamp_to_frame(frame, timestamp)
+        if self.draw_bounding_boxes:
+            frame = plot_bounding_boxes(frame, bounding_boxes)
+
+        if self._video_writer is not None and frame.shape != self._frame_shape:
+            logger.warning("The frame size changed, ending the current event.", callback=self.name())
+            self._end_event()
+
+        if self._video_writer is not None:
+            self._frames_since_motion = 0 if bounding_boxes else self._frames_since_motion + 1
+            if self._frames_since_motion > self.post_roll_frames:
+                self._end_event()
+
+        if self._video_writer is None:
+            if not bounding_boxes:
+                if self._pre_roll is not None:
+                    self._pre_roll.push(frame, metadata=(timestamp, BoundingBoxArray()))
+                return
+            self._start_event(frame, timestamp)
+
+        self._write_frame(frame, timestamp, bounding_boxes)
+
+    def _start_event(self, frame: np.array, timestamp: datetime.datetime):
+        event_timestamp = timestamp
+        if self._pre_roll is not None and len(self._pre_roll) > 0:
+            _, (event_timestamp, _) = next(iter(self._pre_roll))
+        event_id = int(datetime.datetime.timestamp(event_timestamp) * 1000)
+
+        self._clip_path = self.directory_to_store / f"{event_id}.{self.clip_extension}"
+        self._frame_shape = frame.shape
+        height, width = frame.shape[:2]
+        self._video_writer = cv2.VideoWriter(
+            str(self._clip_path), cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (width, height)
+        )
+        if not self._video_writer.isOpened():
+            self._video_writer = None
+            raise RuntimeError(f"OpenCV could not open a video writer for '{self._clip_path}' (fourcc={self.fourcc}).")
+        self._index_file = open(self._clip_path.with_suffix(".jsonl"), "w")
+        self._frame_index = 0
+        self._frames_since_motion = 0
+        logger.info(f"Motion event started, recording clip '{self._clip_path}'.", callback=self.name())
+
+        if self._pre_roll is not None:
+            for pre_roll_frame, (pre_roll_timestamp, pre_roll_bounding_boxes) in self._pre_roll:
+                if pre_roll_frame.shape == self._frame_shape:
+                    self._write_frame(pre_roll_frame, pre_roll_timestamp, pre_roll_bounding_boxes)
+            self._pre_roll.clear()
+
+    def _write_frame(self, frame: np.array, timestamp: datetime.datetime, bounding_boxes: BoundingBoxes):
+        self._video_writer.write(frame)
+        record = {
+            "frame_index": self._frame_index,
+            "timestamp": int(datetime.datetime.timestamp(timestamp) * 1000),
+            "bounding_boxes": BoundingBoxArray.from_bounding_boxes(bounding_boxes).to_dicts(),
+        }
+        self._index_file.write(json.dumps(record) + "\n")
+        self._frame_index += 1
+
+    def _end_event(self):
+        self._video_writer.release()
+        self._index_file.close()
+        logger.info(
+            f"Motion event ended, stored {self._frame_index} frames at '{self._clip_path}'.", callback=self.name()
+        )
+        self._video_writer = None
+        self._index_file = None
+        self._frame_shape = None
+
+    def on_exit(self):
+        logger.info(f"Shutting down callback class '{self.name()}'.", callback=self.name())
+        if self._video_writer is not None:
+            self._end_event()
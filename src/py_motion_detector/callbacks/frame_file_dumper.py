@@ -1,22 +1,42 @@
 import datetime
+import functools
 import json
 import os
 from pathlib import Path
-from typing import List
 
 import cv2
 import numpy as np
 import structlog
 
+from py_motion_detector.callbacks.background_writer import BackgroundFrameWriter
 from py_motion_detector.callbacks.base import MotionDetectionCallbackABC
 from py_motion_detector.common.plotting import plot_bounding_boxes, plot_timestamp_to_frame
-from py_motion_detector.models.bounding_box import BoundingBox
+from py_motion_detector.models.bounding_box import BoundingBoxArray, BoundingBoxes
+from py_motion_detector.storage.bounding_box_log import BOUNDING_BOX_LOG_FILE_NAME, BoundingBoxLogWriter
+from py_motion_detector.storage.event_index import EventIndex, max_area_ratio
+from py_motion_detector.storage.shards import shard_path
 
 logger = structlog.get_logger()
 
 
 class FrameFileDumperCallback(MotionDetectionCallbackABC):
-    def __init__(self, directory_to_store: Path, store_bounding_boxes: bool = True, draw_bounding_boxes: bool = False):
+    needs_frames_without_motion = False
+
+    def __init__(
+        self,
+        directory_to_store: Path,
+        store_bounding_boxes: bool = True,
+        draw_bounding_boxes: bool = False,
+        background_writer: bool = False,
+        jpeg_quality: int = 95,
+        encode_workers: int = 2,
+        queue_depth: int = 32,
+        fsync_every: int = 16,
+        bounding_boxes_format: str = "json",
+        event_index_path: Path | None = None,
+        session_id: str | None = None,
+        shard_by_hour: bool = False,
+    ):
         """
         The default callback used by the command line tool.
         It stores the frames where motion has been detected in a user-defined directory along with their bounding boxes.
@@ -27,10 +47,45 @@ class FrameFileDumperCallback(MotionDetectionCallbackABC):
                 stored to disk.
             draw_bounding_boxes: If set to `True` the bounding boxes of the regions where motion was detected will be
                 drawn to the current frame.
+            background_writer: If set to `True` frames are encoded to JPEG by a pool of worker threads and written to
+                disk in batches by a `BackgroundFrameWriter`, instead of synchronously in `execute`.
+            jpeg_quality: JPEG quality of the stored frames, from 0 to 100.
+            encode_workers: Number of JPEG encoding threads used by the background writer.
+            queue_depth: Maximum number of frames queued by the background writer before `execute` blocks.
+            fsync_every: Number of frames the background writer stores between two `fsync` calls. `0` disables it.
+            bounding_boxes_format: Either `"json"`, to store the bounding boxes of every frame in its own JSON file,
+                or `"binary"`, to append them to a single binary log (see `py_motion_detector.storage.bounding_box_log`).
+            event_index_path: If set, every stored frame is also added to the SQLite catalogue at this path (see
+                `py_motion_detector.storage.event_index`), which can be shared by several sessions.
+            session_id: Id of the session in the event index. Defaults to the name of `directory_to_store`.
+            shard_by_hour: If set to `True` the frames are stored in one sub-directory per day and hour,
+                `YYYY-MM-DD/HH`, each with its own binary log when `bounding_boxes_format="binary"` (see
+                `py_motion_detector.storage.shards`), so that no directory holds more than an hour of frames and old
+                frames can be deleted by a `RetentionManager`.
         """
+        if bounding_boxes_format not in ("json", "binary"):
+            raise ValueError(f"Unknown bounding boxes format '{bounding_boxes_format}', use 'json' or 'binary'.")
         self.directory_to_store = directory_to_store
         self.draw_bounding_boxes = draw_bounding_boxes
         self.store_bounding_boxes = store_bounding_boxes
+        self.jpeg_quality = jpeg_quality
+        self.bounding_boxes_format = bounding_boxes_format
+        self.event_index_path = event_index_path
+        self.session_id = session_id if session_id is not None else directory_to_store.name
+        self.shard_by_hour = shard_by_hour
+        self._shard: Path | None = None
+        self._log_writer: BoundingBoxLogWriter | None = None
+        self._event_index: EventIndex | None = None
+        self._writer = (
+            BackgroundFrameWriter(
+                encode_workers=encode_workers,
+                queue_depth=queue_depth,
+                jpeg_quality=jpeg_quality,
+                fsync_every=fsync_every,
+            )
+            if background_writer
+            else None
+        )
 
     def on_start(self):
         """
@@ -46,9 +101,18 @@ class FrameFileDumperCallback(MotionDetectionCallbackABC):
             self.directory_to_store.mkdir(parents=True, exist_ok=True)
             logger.info(f"Directory '{self.directory_to_store}' created.", callback=self.name())
         logger.info(f"Storing frames at '{self.directory_to_store}'.", callback=self.name())
+        if self._writer is not None:
+            self._writer.start()
+            logger.info("Frames will be stored by a background writer.", callback=self.name())
+        if self.store_bounding_boxes and self.bounding_boxes_format == "binary" and not self.shard_by_hour:
+            self._log_writer = BoundingBoxLogWriter(self.directory_to_store / BOUNDING_BOX_LOG_FILE_NAME).open()
+            logger.info(f"Storing bounding boxes at '{self._log_writer.path}'.", callback=self.name())
+        if self.event_index_path is not None:
+            self._event_index = EventIndex(self.event_index_path).open()
+            logger.info(f"Indexing the stored frames at '{self.event_index_path}'.", callback=self.name())
         logger.info(f"Callback class '{self.name()}' has been initialized.", callback=self.name())
 
-    def execute(self, frame: np.array, timestamp: datetime.datetime, bounding_boxes: List[BoundingBox]):
+    def execute(self, frame: np.array, timestamp: datetime.datetime, bounding_boxes: BoundingBoxes):
         """
         Args:
             frame: The image for which motion was detected.
@@ -60,7 +124,8 @@ class FrameFileDumperCallback(MotionDetectionCallbackABC):
             frame = plot_bounding_boxes(frame, bounding_boxes)
 
         if bounding_boxes:
-            object_over_frame_area = [m.area / frame.size for m in bounding_boxes]
+            bounding_boxes = BoundingBoxArray.from_bounding_boxes(bounding_boxes)
+            object_over_frame_area = (bounding_boxes.area / frame.size).tolist()
             logger.info(
                 f"Number of detected objects = {len(bounding_boxes)}. Object area / frame "
                 f"area = {object_over_frame_area}",
@@ -68,16 +133,63 @@ class FrameFileDumperCallback(MotionDetectionCallbackABC):
             )
 
             timestamp = int(datetime.datetime.timestamp(timestamp) * 1000)
-            file_name = self.directory_to_store / f"{timestamp}.jpg"
-            cv2.imwrite(str(file_name), frame)
+            directory = self._shard_directory(timestamp) if self.shard_by_hour else self.directory_to_store
+            file_name = directory / f"{timestamp}.jpg"
+            json_file_name, bboxes = None, None
+            if self._log_writer is not None:
+                self._log_writer.append(timestamp, frame_ref=timestamp, bounding_boxes=bounding_boxes)
+            elif self.store_bounding_boxes:
+                json_file_name = directory / f"{timestamp}.json"
+                bboxes = bounding_boxes.to_dicts()
+            # the frame is only indexed once its image has been stored, so that the index never points to a missing file
+            index_frame = None
+            if self._event_index is not None:
+                index_frame = functools.partial(
+                    self._event_index.add,
+                    timestamp,
+                    self.session_id,
+                    file_name,
+                    len(bounding_boxes),
+                    max_area_ratio(bounding_boxes, frame.shape[0], frame.shape[1]),
+                )
+
+            if self._writer is not None:
+                self._writer.submit(file_name, frame, json_file_name, bboxes, on_written=index_frame)
+                return
+
+            if not cv2.imwrite(str(file_name), frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality]):
+                logger.error(f"Failed to store the image '{file_name}'.", callback=self.name())
+                return
             logger.debug(f"Image stored at '{file_name}'.", callback=self.name())
 
-            if self.store_bounding_boxes:
-                bboxes = [m.to_dict() for m in bounding_boxes]
-                json_file_name = self.directory_to_store / f"{timestamp}.json"
+            if json_file_name is not None:
                 with open(json_file_name, 'w') as f:
                     json.dump(bboxes, f, indent=4)
                     logger.debug(f"Bounding boxes stored at '{json_file_name}'.", callback=self.name())
+            if index_frame is not None:
+                index_frame()
+
+    def _shard_directory(self, timestamp: int) -> Path:
+        """Returns the shard of `timestamp`, creating it and its binary log when the hour changes."""
+        shard = shard_path(self.directory_to_store, timestamp)
+        if shard != self._shard:
+            shard.mkdir(parents=True, exist_ok=True)
+            if self.store_bounding_boxes and self.bounding_boxes_format == "binary":
+                if self._log_writer is not None:
+                    self._log_writer.close()
+                self._log_writer = BoundingBoxLogWriter(shard / BOUNDING_BOX_LOG_FILE_NAME).open()
+            self._shard = shard
+            logger.info(f"Storing frames at '{shard}'.", callback=self.name())
+        return shard
 
     def on_exit(self):
         logger.info(f"Shutting down callback class '{self.name()}'.", callback=self.name())
+        if self._writer is not None:
+            self._writer.close()
+        if self._log_writer is not None:
+            self._log_writer.close()
+            self._log_writer = None
+        self._shard = None
+        if self._event_index is not None:
+            self._event_index.close()
+            self._event_index = None
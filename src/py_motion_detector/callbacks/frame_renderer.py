@@ -1,5 +1,4 @@
 import datetime
-from typing import List
 
 import cv2
 import numpy as np
@@ -7,7 +6,7 @@ import structlog
 
 from py_motion_detector.callbacks.base import MotionDetectionCallbackABC
 from py_motion_detector.common.plotting import plot_bounding_boxes, plot_timestamp_to_frame
-from py_motion_detector.models.bounding_box import BoundingBox
+from py_motion_detector.models.bounding_box import BoundingBoxes
 
 logger = structlog.get_logger()
 
@@ -22,7 +21,7 @@ class FrameRendererCallback(MotionDetectionCallbackABC):
         """
         logger.info(f"Initializing callback class '{self.name()}'.", callback=self.name())
 
-    def execute(self, frame: np.array, timestamp: datetime.datetime, bounding_boxes: List[BoundingBox]):
+    def execute(self, frame: np.array, timestamp: datetime.datetime, bounding_boxes: BoundingBoxes):
         """
         Args:
             frame: The image for which motion was detected.
@@ -0,0 +1,115 @@
+import datetime
+
+import numpy as np
+import structlog
+
+from py_motion_detector.callbacks.base import MotionDetectionCallbackABC
+from py_motion_detector.models.bounding_box import BoundingBoxes, TrackedBoundingBoxArray
+
+logger = structlog.get_logger()
+
+
+class TrackChangeFilterCallback(MotionDetectionCallbackABC):
+    """
+    Only passes a frame to another callback when the tracks of its bounding boxes changed: a track started, a track
+    ended, the box of a track moved by more than `min_displacement` pixels since the last frame passed for it, or
+    `keyframe_interval` frames went by since then. A person standing still in front of the camera is then stored a few
+    times instead of on every frame.
+
+    The bounding boxes need to be tracked, i.e. be a `TrackedBoundingBoxArray` returned by a `BoundingBoxTracker` run
+    as a post processor of the `MotionDetectionApplication`. Frames with untracked boxes are always passed.
+
+    Example usage:
+
+    app = MotionDetectionApplication(
+        frame_provider=CameraFrameProvider(),
+        post_processors=[BoundingBoxTracker()],
+        callbacks=[TrackChangeFilterCallback(FrameFileDumperCallback(Path("/tmp/frames")), min_displacement=20)],
+    )
+    """
+
+    def __init__(
+        self,
+        callback: MotionDetectionCallbackABC,
+        min_displacement: float = 20.0,
+        keyframe_interval: int | None = 100,
+        end_after_frames: int = 5,
+    ):
+        """
+
+        Args:
+            callback: The callback the changed frames are passed to.
+            min_displacement: Minimum distance, in pixels, between the center of the box of a track and its center in
+                the last frame passed for the track, for the frame to be passed again.
+            keyframe_interval: A frame is passed at least every this many frames while a track lasts, even if it did
+                not move. `None` only passes the frames where the tracks changed.
+            end_after_frames: A track ends when none of the boxes of this many consecutive frames belongs to it, so
+                that a box briefly missed by the motion detection model does not end its track and start it again.
+        """
+        self.callback = callback
+        self.min_displacement = min_displacement
+        self.keyframe_interval = keyframe_interval
+        self.end_after_frames = end_after_frames
+        # for every live track: its center in the last frame passed for it, the index of that frame, and the index of
+        # the last frame where it had a box
+        self._centers: dict[int, np.ndarray] = {}
+        self._passed: dict[int, int] = {}
+        self._seen: dict[int, int] = {}
+        self._frame_index = 0
+
+        self.passed_frames = 0
+        self.suppressed_frames = 0
+
+    def name(self) -> str:
+        return f"{type(self).__name__}({self.callback.name()})"
+
+    def on_start(self) -> None:
+        self.callback.on_start()
+
+    def _changed(self, track_ids: list[int], centers: np.ndarray) -> bool:
+        """Updates the live tracks with the boxes of the current frame and returns whether the frame is passed."""
+        changed = False
+        ended = [
+            track_id
+            for track_id, seen in self._seen.items()
+            if self._frame_index - seen >= self.end_after_frames and track_id not in track_ids
+        ]
+        for track_id in ended:
+            del self._centers[track_id], self._passed[track_id], self._seen[track_id]
+            changed = True
+        for track_id, center in zip(track_ids, centers):
+            if track_id not in self._seen:
+                changed = True
+            elif np.linalg.norm(center - self._centers[track_id]) > self.min_displacement:
+                changed = True
+            elif (
+                self.keyframe_interval is not None
+                and self._frame_index - self._passed[track_id] >= self.keyframe_interval
+            ):
+                changed = True
+            self._seen[track_id] = self._frame_index
+        if changed:
+            for track_id, center in zip(track_ids, centers):
+                self._centers[track_id] = center
+                self._passed[track_id] = self._frame_index
+        return changed
+
+    def execute(self, frame: np.array, timestamp: datetime.datetime, bounding_boxes: BoundingBoxes) -> None:
+        """Passes the frame to the wrapped callback if the tracks of `bounding_boxes` changed."""
+        self._frame_index += 1
+        if isinstance(bounding_boxes, TrackedBoundingBoxArray) and not self._changed(
+            bounding_boxes.track_ids.tolist(), bounding_boxes.centers
+        ):
+            self.suppressed_frames += 1
+            return
+
+        self.passed_frames += 1
+        self.callback.execute(frame=frame, timestamp=timestamp, bounding_boxes=bounding_boxes)
+
+    def on_exit(self) -> None:
+        total = self.passed_frames + self.suppressed_frames
+        logger.info(
+            f"Passed {self.passed_frames} of {total} frames, {self.suppressed_frames} were suppressed.",
+            callback=self.name(),
+        )
+        self.callback.on_exit()
@@ -1,6 +1,8 @@
 import datetime
 from typing import Optional
 
+from py_motion_detector.scheduling.windows import TimeWindow
+
 
 def str2time_duration(duration: str | None) -> Optional[datetime.datetime.time]:
     """
@@ -52,3 +54,38 @@ def str2time_start_processing_time(from_time: str | None) -> Optional[datetime.d
 
     from_time = datetime.datetime.strptime(from_time, '%H:%M:%S').time()
     return from_time
+
+
+def str2timestamp_ms(timestamp: str | None) -> Optional[int]:
+    """
+    Converts a string to a timestamp in milliseconds since the epoch, the way frames are named by the
+    `FrameFileDumperCallback`.
+
+    Args:
+        timestamp: Either a number of milliseconds since the epoch, or a date and time in the ISO 8601 format, e.g.
+            `2024-03-01T18:30:00`, in local time unless it specifies a time zone.
+
+    Returns:
+        The timestamp in milliseconds if `timestamp` is not `None`, otherwise `None`
+
+    Raises:
+        ValueError: If the `timestamp` format is incorrect.
+    """
+    if timestamp is None:
+        return None
+    if timestamp.isdigit():
+        return int(timestamp)
+    return int(datetime.datetime.fromisoformat(timestamp).timestamp() * 1000)
+
+
+def str2time_window(window: str) -> TimeWindow:
+    """
+    Converts a string to a daily `TimeWindow`.
+
+    Args:
+        window: A string in the `HH:MM-HH:MM` format, e.g. `22:00-06:00` for a window crossing midnight.
+
+    Raises:
+        ValueError: If the `window` format is incorrect.
+    """
+    return TimeWindow.from_string(window)
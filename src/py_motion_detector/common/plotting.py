@@ -1,27 +1,26 @@
 import datetime
-from typing import List
 
 import cv2
 import numpy as np
 
-from py_motion_detector.models.bounding_box import BoundingBox
+from py_motion_detector.models.bounding_box import BoundingBoxArray, BoundingBoxes
 
 
-def plot_bounding_boxes(image: np.array, bounding_boxes: List[BoundingBox], color=(0, 255, 0)) -> np.array:
+def plot_bounding_boxes(image: np.array, bounding_boxes: BoundingBoxes, color=(0, 255, 0)) -> np.array:
     """
     Plots bounded boxes on an image using a user-specified color.
 
     Args:
         image: An input image.
-        bounding_boxes: A list of bounding boxes that will be plotted on the image.
+        bounding_boxes: A list of bounding boxes, or a `BoundingBoxArray`, that will be plotted on the image.
         color: The color that will be used to draw the bounding boxes on the image
 
     Returns:
         Returns a new image with bounding boxes. The original `image` is not modified.
     """
     frame = image.copy()
-    for bb in bounding_boxes:
-        cv2.rectangle(frame, (bb.left, bb.top), (bb.right, bb.bottom), color, 2)
+    for top, left, bottom, right in BoundingBoxArray.from_bounding_boxes(bounding_boxes).data.tolist():
+        cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
     return frame
 
 
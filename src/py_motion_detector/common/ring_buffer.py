@@ -0,0 +1,125 @@
+from typing import Any, Iterator, Tuple
+
+import numpy as np
+
+
+class FrameRingBuffer:
+    """
+    A fixed-size ring buffer of frames backed by a single preallocated numpy array.
+
+    The slots are allocated once, on the first `push`, using the shape and dtype of that frame. Pushing a frame copies
+    it into the next free slot; when the buffer is full the oldest frame is overwritten. Every slot can also carry an
+    arbitrary metadata object (e.g. a timestamp or a list of bounding boxes).
+
+    The class is not thread-safe, callers sharing it between threads need to provide their own locking.
+
+    Example usage:
+
+    ring = FrameRingBuffer(capacity=30)
+    for frame in frames:
+        ring.push(frame, metadata=datetime.datetime.now())
+    for frame, timestamp in ring:
+        ...
+    """
+
+    def __init__(self, capacity: int):
+        """
+
+        Args:
+            capacity: Maximum number of frames the buffer can hold.
+        """
+        if capacity < 1:
+            raise ValueError(f"The capacity of the ring buffer needs to be a positive integer, not {capacity}.")
+        self.capacity = capacity
+        self._slots: np.ndarray | None = None
+        self._metadata: list[Any] = [None] * capacity
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, Any]]:
+        """Yields `(frame, metadata)` tuples from the oldest to the newest frame. Frames are views into the buffer."""
+        for i in range(self._count):
+            idx = (self._head + i) % self.capacity
+            yield self._slots[idx], self._metadata[idx]
+
+    @property
+    def full(self) -> bool:
+        return self._count == self.capacity
+
+    @property
+    def frame_shape(self) -> tuple | None:
+        return None if self._slots is None else self._slots.shape[1:]
+
+    def push(self, frame: np.ndarray, metadata: Any = None) -> bool:
+        """
+        Copies a frame into the buffer.
+
+        Args:
+            frame: The frame to store. If its shape or dtype differs from the stored frames the buffer is cleared and
+                its slots are reallocated.
+            metadata: Optional object stored along with the frame.
+
+        Returns:
+            `True` if the oldest frame had to be overwritten to make room for the new one, otherwise `False`.
+        """
+        if self._slots is None or self._slots.shape[1:] != frame.shape or self._slots.dtype != frame.dtype:
+            self._slots = np.empty((self.capacity, *frame.shape), dtype=frame.dtype)
+            self.clear()
+
+        overwritten = self.full
+        idx = (self._head + self._count) % self.capacity
+        np.copyto(self._slots[idx], frame)
+        self._metadata[idx] = metadata
+        if overwritten:
+            self._head = (self._head + 1) % self.capacity
+        else:
+            self._count += 1
+        return overwritten
+
+    def pop(self) -> Tuple[np.ndarray, Any]:
+        """
+        Removes the oldest frame from the buffer.
+
+        Returns:
+            A `(frame, metadata)` tuple where `frame` is a copy that remains valid after the slot is reused.
+
+        Raises:
+            IndexError: If the buffer is empty.
+        """
+        if self._count == 0:
+            raise IndexError("pop from an empty ring buffer")
+        idx = self._head
+        frame = self._slots[idx].copy()
+        metadata = self._metadata[idx]
+        self._metadata[idx] = None
+        self._head = (self._head + 1) % self.capacity
+        self._count -= 1
+        return frame, metadata
+
+    def pop_newest(self) -> Tuple[np.ndarray, Any]:
+        """
+        Removes the most recently pushed frame from the buffer.
+
+        Returns:
+            A `(frame, metadata)` tuple where `frame` is a copy that remains valid after the slot is reused.
+
+        Raises:
+            IndexError: If the buffer is empty.
+        """
+        if self._count == 0:
+            raise IndexError("pop from an empty ring buffer")
+        idx = (self._head + self._count - 1) % self.capacity
+        frame = self._slots[idx].copy()
+        metadata = self._metadata[idx]
+        self._metadata[idx] = None
+        self._count -= 1
+        return frame, metadata
+
+    def clear(self) -> None:
+        """Removes all frames, the preallocated slots are kept."""
+        self._metadata = [None] * self.capacity
+        self._head = 0
+        self._count = 0
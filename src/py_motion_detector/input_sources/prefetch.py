@@ -0,0 +1,157 @@
+import enum
+import threading
+from typing import Iterator
+
+import numpy as np
+import structlog
+
+from py_motion_detector.common.ring_buffer import FrameRingBuffer
+from py_motion_detector.input_sources.base import FrameProviderABC
+
+logger = structlog.get_logger()
+
+
+class OverflowPolicy(str, enum.Enum):
+    """What the capture thread does when the prefetch buffer is full."""
+
+    DROP_OLDEST = "drop_oldest"
+    """Overwrite the oldest buffered frame so that the consumer always gets the most recent frames."""
+
+    BLOCK = "block"
+    """Wait until the consumer takes a frame. No frames are dropped but capture is throttled to the consumer rate."""
+
+
+class PrefetchFrameProvider(FrameProviderABC):
+    """
+    Wraps another frame provider (e.g. `CameraFrameProvider` or `VideoFileFrameProvider`) and reads its frames on a
+    background thread into a fixed-size preallocated ring buffer. This decouples capture from the (possibly slow)
+    motion detection and callbacks, so the camera's internal buffer does not fill with stale frames.
+
+    Example usage:
+
+    with PrefetchFrameProvider(CameraFrameProvider(500), buffer_size=2) as pfp:
+        for img in pfp.frames():
+            cv2.imshow("", img)
+            cv2.waitKey(1)
+    print(pfp.dropped_frames)
+    """
+
+    def __init__(
+        self,
+        frame_provider: FrameProviderABC,
+        buffer_size: int = 2,
+        overflow_policy: OverflowPolicy | str = OverflowPolicy.DROP_OLDEST,
+        join_timeout_sec: float = 5.0,
+    ):
+        """
+
+        Args:
+            frame_provider: The frame provider to read frames from on the background thread.
+            buffer_size: Number of frames the ring buffer can hold. With `OverflowPolicy.DROP_OLDEST` a small value
+                (1 or 2) keeps the consumer on the freshest frames.
+            overflow_policy: What to do when the ring buffer is full, see `OverflowPolicy`.
+            join_timeout_sec: How long to wait for the capture thread to finish when exiting.
+        """
+        self.frame_provider = frame_provider
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.join_timeout_sec = join_timeout_sec
+
+        self._ring_buffer = FrameRingBuffer(buffer_size)
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._finished = False
+        self._release_on_finish = False
+        self._error: BaseException | None = None
+
+        self.captured_frames = 0
+        self.dropped_frames = 0
+
+    @property
+    def resize_to(self) -> int | None:
+        return self.frame_provider.resize_to
+
+    def __enter__(self):
+        self.frame_provider.__enter__()
+        self._ring_buffer.clear()
+        self._stop_event.clear()
+        self._finished = False
+        self._release_on_finish = False
+        self._error = None
+        self._thread = threading.Thread(target=self._capture_loop, name=f"{type(self).__name__}", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Started prefetching frames from '{type(self.frame_provider).__name__}' "
+            f"(buffer size={self._ring_buffer.capacity}, policy={self.overflow_policy.value})."
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(self.join_timeout_sec)
+            self._thread = None
+        with self._condition:
+            # the wrapped provider cannot be released while the capture thread may still be reading from it
+            if not self._finished:
+                logger.warning(
+                    "The prefetch capture thread did not finish in time, the frame provider will be released once it "
+                    "does."
+                )
+                self._release_on_finish = True
+                return
+        logger.info(
+            f"Stopped prefetching frames. Captured frames={self.captured_frames}, dropped frames={self.dropped_frames}."
+        )
+        self.frame_provider.__exit__(exc_type, exc_val, exc_tb)
+
+    def _capture_loop(self):
+        try:
+            for frame in self.frame_provider.frames():
+                if self._stop_event.is_set():
+                    break
+                if frame is None:
+                    continue
+                with self._condition:
+                    if self.overflow_policy == OverflowPolicy.BLOCK:
+                        self._condition.wait_for(lambda: not self._ring_buffer.full or self._stop_event.is_set())
+                        if self._stop_event.is_set():
+                            break
+                    if self._ring_buffer.push(frame):
+                        self.dropped_frames += 1
+                    self.captured_frames += 1
+                    self._condition.notify_all()
+        except BaseException as e:  # re-raised on the consumer thread
+            self._error = e
+        finally:
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+                release = self._release_on_finish
+            if release:
+                self.frame_provider.__exit__(None, None, None)
+                logger.info("Released the frame provider after the prefetch capture thread finished.")
+
+    def frames(self) -> Iterator[np.array]:
+        """
+        Yields the buffered frames in capture order. With `OverflowPolicy.DROP_OLDEST` only the most recent buffered
+        frame is yielded and the older ones are dropped, so that the consumer never processes stale frames. Each
+        yielded frame is a copy owned by the caller.
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._ring_buffer) > 0 or self._finished)
+                if len(self._ring_buffer) == 0:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                if self.overflow_policy == OverflowPolicy.DROP_OLDEST:
+                    frame, _ = self._ring_buffer.pop_newest()
+                    self.dropped_frames += len(self._ring_buffer)
+                    self._ring_buffer.clear()
+                else:
+                    frame, _ = self._ring_buffer.pop()
+                self._condition.notify_all()
+            yield frame
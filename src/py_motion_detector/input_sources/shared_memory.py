@@ -0,0 +1,79 @@
+import multiprocessing.synchronize
+from typing import Iterator
+
+import numpy as np
+import structlog
+
+from py_motion_detector.input_sources.base import FrameProviderABC
+from py_motion_detector.multi_source.shared_memory_ring import SharedMemoryFrameRing
+
+logger = structlog.get_logger()
+
+
+class SharedMemoryFrameProvider(FrameProviderABC):
+    """
+    The input source is a `SharedMemoryFrameRing` filled by another process. Always yields the most recent frame of the
+    ring, frames that were overwritten before they could be read are counted as dropped. Stops when the writer closes
+    the ring or when `stop_event` is set.
+
+    Example usage:
+
+    with SharedMemoryFrameProvider("psm_1234", (480, 640, 3)) as smfp:
+        for img in smfp.frames():
+            cv2.imshow("", img)
+            cv2.waitKey(1)
+    """
+
+    def __init__(
+        self,
+        shared_memory_name: str,
+        frame_shape: tuple,
+        n_slots: int = 4,
+        stop_event: multiprocessing.synchronize.Event | None = None,
+        poll_interval_sec: float = 0.002,
+    ):
+        """
+
+        Args:
+            shared_memory_name: Name of the shared memory block of the ring.
+            frame_shape: Shape of the frames stored in the ring.
+            n_slots: Number of slots of the ring.
+            stop_event: If set, `frames` returns when the event is set.
+            poll_interval_sec: How long to sleep while waiting for a new frame.
+        """
+        self.shared_memory_name = shared_memory_name
+        self.frame_shape = frame_shape
+        self.n_slots = n_slots
+        self.stop_event = stop_event
+        self.poll_interval_sec = poll_interval_sec
+        self.ring: SharedMemoryFrameRing | None = None
+
+        self.read_frames = 0
+        self.dropped_frames = 0
+
+    @property
+    def resize_to(self) -> int | None:
+        return None
+
+    def __enter__(self):
+        self.ring = SharedMemoryFrameRing.attach(self.shared_memory_name, self.frame_shape, self.n_slots)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.ring.close()
+        self.ring = None
+
+    def frames(self) -> Iterator[np.array]:
+        last_seq = 0
+        while self.stop_event is None or not self.stop_event.is_set():
+            seq, frame = self.ring.wait_latest(last_seq, timeout_sec=0.5, poll_interval_sec=self.poll_interval_sec)
+            if frame is None:
+                if self.ring.closed:
+                    logger.info(f"No more frames in the shared memory ring '{self.shared_memory_name}'.")
+                    return
+                continue
+            if last_seq > 0:
+                self.dropped_frames += seq - last_seq - 1
+            self.read_frames += 1
+            last_seq = seq
+            yield frame
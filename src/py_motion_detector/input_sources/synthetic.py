@@ -0,0 +1,96 @@
+from typing import Iterator, Optional
+
+import numpy as np
+
+from py_motion_detector.input_sources.base import FrameProviderABC
+from py_motion_detector.models.bounding_box import BoundingBoxArray
+
+
+class SyntheticFrameProvider(FrameProviderABC):
+    """
+    A deterministic synthetic scene, used for the benchmarks and the tests: a static textured background with sensor
+    noise, and rectangular objects moving at constant speed and bouncing off the borders of the frame. The same `seed`
+    always produces the same frames.
+
+    Example usage:
+
+    with SyntheticFrameProvider(480, 640, n_frames=100, n_objects=4) as sfp:
+        for i, img in enumerate(sfp.frames()):
+            cv2.imshow("", img)
+            cv2.waitKey(1)
+            print(sfp.object_boxes(i))
+    """
+
+    def __init__(
+        self,
+        height: int = 480,
+        width: int = 640,
+        n_frames: int = 100,
+        n_objects: int = 1,
+        object_size: int | None = None,
+        max_speed: float = 8.0,
+        noise: int = 4,
+        seed: int = 0,
+        resize_frame: Optional[int] = None,
+    ):
+        """
+
+        Args:
+            height: Height of the frames.
+            width: Width of the frames.
+            n_frames: Number of frames yielded by `frames`.
+            n_objects: Number of moving objects.
+            object_size: Side, in pixels, of the objects. Defaults to an eighth of the smallest side of the frames.
+            max_speed: Maximum speed of the objects, in pixels per frame.
+            noise: Amplitude of the sensor noise added to the background.
+            seed: Seed of the random generator of the scene.
+            resize_frame: Resize the frames to a square of this size.
+        """
+        self.height = height
+        self.width = width
+        self.n_frames = n_frames
+        self.n_objects = n_objects
+        self.object_size = object_size if object_size is not None else max(min(height, width) // 8, 2)
+        self._resize_frame = resize_frame
+
+        rng = np.random.default_rng(seed)
+        gradient = np.linspace(40, 120, width, dtype=np.float32)[None, :, None]
+        texture = rng.integers(0, 40, (height, width, 3), dtype=np.uint8)
+        background = (gradient + texture).astype(np.int16)
+        # A few noisy copies of the background are generated once and cycled through, which is much cheaper than
+        # drawing new noise for every frame
+        self._backgrounds = [
+            np.clip(background + rng.integers(-noise, noise + 1, background.shape), 0, 255).astype(np.uint8)
+            for _ in range(4)
+        ]
+
+        size = self.object_size
+        self._start = rng.uniform(0, 1, (n_objects, 2)) * (height - size, width - size)
+        self._velocity = rng.uniform(-max_speed, max_speed, (n_objects, 2))
+        self._colors = rng.integers(150, 256, (n_objects, 3), dtype=np.uint8)
+
+    @property
+    def resize_to(self) -> int:
+        return self._resize_frame
+
+    def object_boxes(self, frame_index: int) -> BoundingBoxArray:
+        """Returns the `(top, left, bottom, right)` boxes of the objects in the frame `frame_index`."""
+        size = self.object_size
+        span = np.array([self.height - size, self.width - size], dtype=np.float64)
+        position = np.mod(self._start + self._velocity * frame_index, 2 * np.maximum(span, 1))
+        position = np.where(position > span, 2 * span - position, position).astype(np.int32)
+        return BoundingBoxArray(np.concatenate([position, position + size], axis=1))
+
+    def frame(self, frame_index: int) -> np.array:
+        """Returns the frame `frame_index` at its original resolution."""
+        frame = self._backgrounds[frame_index % len(self._backgrounds)].copy()
+        for (top, left, bottom, right), color in zip(self.object_boxes(frame_index).data, self._colors, strict=True):
+            frame[top:bottom, left:right] = color
+        return frame
+
+    def frames(self) -> Iterator[np.array]:
+        for i in range(self.n_frames):
+            yield self.resize_frame(self.frame(i))
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
@@ -11,6 +11,9 @@ class VideoFileFrameProvider(FrameProviderABC):
     """
     The input source of frames is a video.
 
+    With a `stride` (or a `target_fps`) the frames that are skipped are only grabbed from the container, they are not
+    decoded, so scanning every tenth frame of a video costs a fraction of decoding all of them.
+
     Example usage:
         with VideoFileFrameProvider("PATH/TO/VIDEO.mp4") as vfp:
         for img in vfp.frames():
@@ -19,9 +22,54 @@ class VideoFileFrameProvider(FrameProviderABC):
         cv2.destroyAllWindows()
     """
 
-    def __init__(self, path_to_video_file: Path, resize_frame: int | None = None):
+    def __init__(
+        self,
+        path_to_video_file: Path,
+        resize_frame: int | None = None,
+        start_frame: int = 0,
+        end_frame: int | None = None,
+        stride: int = 1,
+        target_fps: float | None = None,
+        start_sec: float | None = None,
+        end_sec: float | None = None,
+    ):
+        """
+
+        Args:
+            path_to_video_file: Path to the video.
+            resize_frame: Resize the frames to a square of this size.
+            start_frame: Index of the first frame to yield, the video is seeked to it when the provider is entered.
+            end_frame: Index of the frame before which to stop. `None` reads the video until its end.
+            stride: Yield one frame out of `stride`, starting with the first one.
+            target_fps: If set, the stride is computed from the frame rate of the video to yield about `target_fps`
+                frames per second of video. Overrides `stride`.
+            start_sec: If set, the position in the video, in seconds, of the first frame to yield. Overrides
+                `start_frame`.
+            end_sec: If set, the position in the video, in seconds, before which to stop. Overrides `end_frame`.
+        """
+        if stride < 1:
+            raise ValueError(f"The stride needs to be a positive integer, not {stride}.")
+        if target_fps is not None and target_fps <= 0:
+            raise ValueError(f"The target frame rate needs to be positive, not {target_fps}.")
         self.path_to_video_file = path_to_video_file
         self._resize_frame = resize_frame  # TODO fix
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.stride = stride
+        self.target_fps = target_fps
+        self.start_sec = start_sec
+        self.end_sec = end_sec
+        self.frame_index = start_frame  # index in the video of the next frame to be read
+
+    @property
+    def fps(self) -> float:
+        """Frame rate of the video, as stored in its container."""
+        return self.video_capture.get(cv2.CAP_PROP_FPS)
+
+    @property
+    def frame_count(self) -> int:
+        """Number of frames of the video, as stored in its container, which may be an estimate."""
+        return int(self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
 
     @property
     def resize_to(self) -> int | None:
@@ -29,7 +77,16 @@ class VideoFileFrameProvider(FrameProviderABC):
 
     def frames(self) -> Iterator[np.array]:
         while self.video_capture.isOpened():
-            ret, frame = self.video_capture.read()
+            if self.end_frame is not None and self.frame_index >= self.end_frame:
+                return
+            # `grab` only demuxes the next frame, `retrieve` decodes it
+            if not self.video_capture.grab():
+                return
+            index = self.frame_index
+            self.frame_index += 1
+            if (index - self.start_frame) % self.stride:
+                continue
+            ret, frame = self.video_capture.retrieve()
 
             if not ret:
                 return
@@ -41,8 +98,21 @@ class VideoFileFrameProvider(FrameProviderABC):
         if not self.path_to_video_file.is_file():
             raise FileNotFoundError(f"The video file '{self.path_to_video_file}' does not exist!")
         self.video_capture = cv2.VideoCapture(str(self.path_to_video_file))
+        fps = self.fps
+        if fps > 0:
+            if self.start_sec is not None:
+                self.start_frame = round(self.start_sec * fps)
+            if self.end_sec is not None:
+                self.end_frame = round(self.end_sec * fps)
+            if self.target_fps is not None:
+                self.stride = max(round(fps / self.target_fps), 1)
+        elif self.start_sec is not None or self.end_sec is not None or self.target_fps is not None:
+            raise ValueError(f"The frame rate of the video '{self.path_to_video_file}' is unknown.")
+        if self.start_frame > 0:
+            self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame)
+        self.frame_index = self.start_frame
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        # The provider does not open any window, `cv2.destroyAllWindows` would fail with headless OpenCV builds
         self.video_capture.release()
-        cv2.destroyAllWindows()
@@ -0,0 +1 @@
+"""Low overhead timings and counters of the motion detection pipeline, and their export."""
@@ -0,0 +1,218 @@
+import array
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+"""A metric name and its sorted `(label, value)` pairs."""
+
+
+def _key(name: str, labels: dict) -> MetricKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def format_key(key: MetricKey) -> str:
+    """Formats a metric key as `name{label="value",...}`, the way Prometheus does."""
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{label}="{value}"' for label, value in labels) + "}"
+
+
+class RollingHistogram:
+    """
+    Keeps the last `window` observations of a value (e.g. a latency in seconds) to compute its quantiles, along with
+    the count and the sum of all the observations. Observing a value only writes it to a preallocated array of
+    doubles, which does not allocate, the quantiles are computed when a snapshot is taken.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self.count = 0
+        self.sum = 0.0
+        self._values = array.array("d", bytes(8 * window))
+
+    def observe(self, value: float) -> None:
+        self._values[self.count % self.window] = value
+        self.count += 1
+        self.sum += value
+
+    def quantiles(self, quantiles: tuple = QUANTILES) -> Dict[float, float]:
+        """Returns the quantiles of the observations in the window, NaN if there are none."""
+        values = self._values[: min(self.count, self.window)]
+        if len(values) == 0:
+            return {q: float("nan") for q in quantiles}
+        return dict(zip(quantiles, np.quantile(values, quantiles).tolist(), strict=True))
+
+
+class Counter:
+    """A monotonically increasing count, e.g. of processed frames."""
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class StageTimer:
+    """
+    Times consecutive stages of a loop into one `RollingHistogram` per stage.
+
+    Example usage:
+
+    timer = StageTimer(registry, "model_stage_seconds", model="MotionDetectionWeightedAverage")
+    timer.start()
+    gray = to_gray(frame)
+    timer.lap("gray")
+    mask = threshold(gray)
+    timer.lap("threshold")
+    """
+
+    def __init__(self, registry: "MetricsRegistry", name: str, **labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self._histograms: Dict[str, RollingHistogram] = {}
+        self._last = time.perf_counter()
+
+    def start(self) -> None:
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        """Records the time elapsed since the previous lap (or `start`) as the duration of `stage`."""
+        now = time.perf_counter()
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            histogram = self._histograms[stage] = self.registry.histogram(self.name, stage=stage, **self.labels)
+        histogram.observe(now - self._last)
+        self._last = now
+
+
+class MetricsRegistry:
+    """
+    Holds the histograms, counters and gauges of the running application. Components get their metrics once (e.g. in
+    their constructor) and update them directly on the hot path; the registry is only involved when the metrics are
+    created and when they are exported.
+
+    Example usage:
+
+    registry = get_registry()
+    frames = registry.counter("frames_processed_total")
+    latency = registry.histogram("callback_seconds", callback="FrameFileDumperCallback")
+    frames.inc()
+    latency.observe(0.002)
+    print(registry.to_prometheus())
+    """
+
+    def __init__(self, window: int = 1024, prefix: str = "py_motion_detector_"):
+        """
+
+        Args:
+            window: Number of observations kept by every histogram to compute its quantiles.
+            prefix: Prefix of the metric names in the Prometheus export.
+        """
+        self.window = window
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms: Dict[MetricKey, RollingHistogram] = {}
+        self._counters: Dict[MetricKey, Counter] = {}
+        self._gauges: Dict[MetricKey, Callable[[], float]] = {}
+
+    def histogram(self, name: str, **labels) -> RollingHistogram:
+        """Returns the histogram with this name and labels, creating it the first time."""
+        key = _key(name, labels)
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = RollingHistogram(self.window)
+            return self._histograms[key]
+
+    def counter(self, name: str, **labels) -> Counter:
+        """Returns the counter with this name and labels, creating it the first time."""
+        key = _key(name, labels)
+        with self._lock:
+            if key not in self._counters:
+                self._counters[key] = Counter()
+            return self._counters[key]
+
+    def gauge(self, name: str, function: Callable[[], float], **labels) -> None:
+        """Registers a function returning the current value of a gauge, e.g. the number of dropped frames."""
+        with self._lock:
+            self._gauges[_key(name, labels)] = function
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def snapshot(self) -> dict:
+        """Returns the current value of every metric, keyed by `name{label="value",...}`."""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        return {
+            "histograms": {
+                format_key(key): {"count": h.count, "sum": h.sum, "quantiles": h.quantiles()}
+                for key, h in histograms.items()
+            },
+            "counters": {format_key(key): c.value for key, c in counters.items()},
+            "gauges": {format_key(key): float(function()) for key, function in gauges.items()},
+        }
+
+    def summary(self) -> dict:
+        """A flat version of `snapshot`, with the p50 and p99 of the histograms in milliseconds, used for logging."""
+        snapshot = self.snapshot()
+        summary = {}
+        for key, histogram in snapshot["histograms"].items():
+            if histogram["count"]:
+                summary[f"{key} p50_ms"] = round(1000 * histogram["quantiles"][0.5], 3)
+                summary[f"{key} p99_ms"] = round(1000 * histogram["quantiles"][0.99], 3)
+        summary.update(snapshot["counters"])
+        summary.update(snapshot["gauges"])
+        return summary
+
+    def to_prometheus(self) -> str:
+        """Renders the metrics in the Prometheus text exposition format, histograms as summaries."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+
+        lines = []
+        typed = set()
+
+        def add_type(name: str, metric_type: str):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {metric_type}")
+
+        for (name, labels), histogram in histograms:
+            name = self.prefix + name
+            add_type(name, "summary")
+            for quantile, value in histogram.quantiles().items():
+                lines.append(f"{format_key((name, labels + (('quantile', str(quantile)),)))} {value}")
+            lines.append(f"{format_key((name + '_sum', labels))} {histogram.sum}")
+            lines.append(f"{format_key((name + '_count', labels))} {histogram.count}")
+        for (name, labels), counter in counters:
+            name = self.prefix + name
+            add_type(name, "counter")
+            lines.append(f"{format_key((name, labels))} {counter.value}")
+        for (name, labels), function in gauges:
+            name = self.prefix + name
+            add_type(name, "gauge")
+            lines.append(f"{format_key((name, labels))} {float(function())}")
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Returns the registry shared by all the components of the application."""
+    return _registry
@@ -0,0 +1,78 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import structlog
+
+from py_motion_detector.instrumentation.metrics import MetricsRegistry, get_registry
+
+logger = structlog.get_logger()
+
+
+class PrometheusExporter:
+    """
+    Serves the metrics of a `MetricsRegistry` in the Prometheus text format at `http://host:port/metrics`, from a
+    daemon thread.
+
+    Example usage:
+
+    with PrometheusExporter(port=9100):
+        motion_app.run()
+    """
+
+    def __init__(self, registry: MetricsRegistry | None = None, host: str = "127.0.0.1", port: int = 9100):
+        """
+
+        Args:
+            registry: The registry to export. Defaults to the registry shared by the application.
+            host: Address to listen on, only the local host by default.
+            port: Port to listen on, 0 picks a free port.
+        """
+        self.registry = registry if registry is not None else get_registry()
+        self.host = host
+        self.port = port
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def _handler(self):
+        registry = self.registry
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return MetricsHandler
+
+    def start(self) -> None:
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="prometheus-exporter", daemon=True)
+        self._thread.start()
+        logger.info(f"Serving the metrics at http://{self.host}:{self.port}/metrics.")
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -1,4 +1,7 @@
 from dataclasses import asdict, dataclass
+from typing import Iterable, Iterator, List, Union
+
+import numpy as np
 
 
 @dataclass
@@ -28,3 +31,192 @@ class BoundingBox:
     @classmethod
     def from_dict(cls, dict_json):
         return cls(**dict_json)
+
+
+class BoundingBoxArray:
+    """
+    A collection of bounding boxes backed by a single `(N, 4)` int32 numpy array, whose columns are the `top`, `left`,
+    `bottom` and `right` points of the boxes.
+
+    It offers vectorized versions of the `BoundingBox` properties and can be used wherever a list of bounding boxes is
+    expected: it iterates and indexes as `BoundingBox` objects, is falsy when empty and compares equal to a list of the
+    same bounding boxes.
+
+    Example usage:
+
+    bbs = BoundingBoxArray.from_xywh(np.array([[10, 20, 30, 40]]))
+    large_bbs = bbs[bbs.area > 1000]
+    for bb in large_bbs:
+        print(bb.top, bb.left)
+    """
+
+    def __init__(self, data: np.ndarray | None = None):
+        """
+
+        Args:
+            data: An `(N, 4)` array with the `top`, `left`, `bottom` and `right` points of the boxes. It is converted
+                to int32 if needed. `None` creates an empty array.
+        """
+        self.data = (
+            np.zeros((0, 4), dtype=np.int32) if data is None else np.asarray(data, dtype=np.int32).reshape(-1, 4)
+        )
+
+    @classmethod
+    def from_bounding_boxes(cls, bounding_boxes: Iterable[BoundingBox]) -> "BoundingBoxArray":
+        if isinstance(bounding_boxes, BoundingBoxArray):
+            return bounding_boxes
+        return cls(np.array([(bb.top, bb.left, bb.bottom, bb.right) for bb in bounding_boxes], dtype=np.int32))
+
+    @classmethod
+    def from_xywh(cls, xywh: np.ndarray) -> "BoundingBoxArray":
+        """Creates the boxes from an `(N, 4)` array of `(x, y, width, height)` rows, as returned by `cv2.boundingRect`."""
+        xywh = np.asarray(xywh).reshape(-1, 4)
+        data = np.empty((len(xywh), 4), dtype=np.int32)
+        data[:, 0] = xywh[:, 1]
+        data[:, 1] = xywh[:, 0]
+        data[:, 2] = xywh[:, 1] + xywh[:, 3]
+        data[:, 3] = xywh[:, 0] + xywh[:, 2]
+        return cls(data)
+
+    @classmethod
+    def from_dicts(cls, dicts: List[dict]) -> "BoundingBoxArray":
+        return cls(np.array([(d["top"], d["left"], d["bottom"], d["right"]) for d in dicts], dtype=np.int32))
+
+    def to_dicts(self) -> List[dict]:
+        """The equivalent of `[bb.to_dict() for bb in bounding_boxes]`."""
+        return [{"top": t, "left": le, "bottom": b, "right": r} for t, le, b, r in self.data.tolist()]
+
+    def to_list(self) -> List[BoundingBox]:
+        return [BoundingBox(*row) for row in self.data.tolist()]
+
+    def copy(self) -> "BoundingBoxArray":
+        return type(self)(self.data.copy())
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __bool__(self) -> bool:
+        return len(self.data) > 0
+
+    def __iter__(self) -> Iterator[BoundingBox]:
+        return iter(self.to_list())
+
+    def __getitem__(self, item) -> Union[BoundingBox, "BoundingBoxArray"]:
+        """An integer returns a `BoundingBox`, a slice, a boolean mask or an array of indices a `BoundingBoxArray`."""
+        if isinstance(item, (int, np.integer)):
+            return BoundingBox(*self.data[item].tolist())
+        return type(self)(self.data[item])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BoundingBoxArray):
+            return np.array_equal(self.data, other.data)
+        if isinstance(other, (list, tuple)) and all(isinstance(bb, BoundingBox) for bb in other):
+            return np.array_equal(self.data, BoundingBoxArray.from_bounding_boxes(other).data)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_list()})"
+
+    @property
+    def top(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def left(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    @property
+    def bottom(self) -> np.ndarray:
+        return self.data[:, 2]
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.data[:, 3]
+
+    @property
+    def area(self) -> np.ndarray:
+        return self.height * self.width
+
+    @property
+    def width(self) -> np.ndarray:
+        return self.right - self.left
+
+    @property
+    def height(self) -> np.ndarray:
+        return self.bottom - self.top
+
+    @property
+    def centers(self) -> np.ndarray:
+        """An `(N, 2)` float array with the `(y, x)` centers of the boxes."""
+        return np.stack([(self.top + self.bottom) / 2, (self.left + self.right) / 2], axis=1)
+
+    def translate(self, top: int, left: int) -> "BoundingBoxArray":
+        """Returns the boxes moved down by `top` and right by `left` pixels."""
+        return type(self)(self.data + np.array([top, left, top, left], dtype=np.int32))
+
+    def filter(self, mask: np.ndarray) -> "BoundingBoxArray":
+        """Returns the boxes for which the boolean `mask` is `True`, e.g. `bbs.filter(bbs.area >= min_area)`."""
+        return type(self)(self.data[np.asarray(mask, dtype=bool)])
+
+    def iou(self, other: "BoundingBoxArray") -> np.ndarray:
+        """
+        Computes the intersection over union of every box of this array with every box of `other`.
+
+        Returns:
+            An `(N, M)` float array where `N = len(self)` and `M = len(other)`.
+        """
+        other = BoundingBoxArray.from_bounding_boxes(other)
+        a = self.data[:, None, :].astype(np.int64)
+        b = other.data[None, :, :].astype(np.int64)
+        height = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+        width = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+        intersection = height * width
+        union = self.area.astype(np.int64)[:, None] + other.area.astype(np.int64)[None, :] - intersection
+        return np.divide(intersection, union, out=np.zeros(intersection.shape), where=union > 0)
+
+
+class TrackedBoundingBoxArray(BoundingBoxArray):
+    """
+    A `BoundingBoxArray` with the id of the track of every box, as returned by `BoundingBoxTracker`. Ids are
+    persistent across frames: a box gets the id of the box it continues in the previous frames. Indexing, filtering,
+    copying and translating the boxes keeps their ids.
+    """
+
+    def __init__(self, data: np.ndarray | None = None, track_ids: np.ndarray | None = None):
+        """
+
+        Args:
+            data: See `BoundingBoxArray`.
+            track_ids: An `(N,)` array with the track id of every box. `None` sets all of them to -1 (untracked).
+        """
+        super().__init__(data)
+        self.track_ids = (
+            np.full(len(self.data), -1, dtype=np.int64)
+            if track_ids is None
+            else np.asarray(track_ids, dtype=np.int64).reshape(-1)
+        )
+        if len(self.track_ids) != len(self.data):
+            raise ValueError(f"Got {len(self.track_ids)} track ids for {len(self.data)} bounding boxes.")
+
+    def copy(self) -> "TrackedBoundingBoxArray":
+        return type(self)(self.data.copy(), self.track_ids.copy())
+
+    def __getitem__(self, item) -> Union[BoundingBox, "TrackedBoundingBoxArray"]:
+        if isinstance(item, (int, np.integer)):
+            return super().__getitem__(item)
+        return type(self)(self.data[item], self.track_ids[item])
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_list()}, track_ids={self.track_ids.tolist()})"
+
+    def translate(self, top: int, left: int) -> "TrackedBoundingBoxArray":
+        return type(self)(super().translate(top, left).data, self.track_ids)
+
+    def filter(self, mask: np.ndarray) -> "TrackedBoundingBoxArray":
+        return self[np.asarray(mask, dtype=bool)]
+
+
+BoundingBoxes = Union[List[BoundingBox], BoundingBoxArray]
+"""Type of the bounding boxes returned by the motion detection models: a list of `BoundingBox` or a `BoundingBoxArray`."""
@@ -1,16 +1,15 @@
 import abc
-from typing import List
 
 import numpy as np
 
-from py_motion_detector.models.bounding_box import BoundingBox
+from py_motion_detector.models.bounding_box import BoundingBoxes
 
 
 class MotionDetectionModelABC(abc.ABC):
     """The base class all motion detection algorithms need to implement."""
 
     @abc.abstractmethod
-    def next_frame(self, frame: np.asarray) -> List[BoundingBox]:
+    def next_frame(self, frame: np.asarray) -> BoundingBoxes:
         """
         Used to detect motion.
 
@@ -18,8 +17,8 @@ class MotionDetectionModelABC(abc.ABC):
             frame: Current input image as a numpy array.
 
         Returns:
-            A list of bounding box objects if a motion has been detected.
-                If no motion detected then it returns an empty list.
+            A list of bounding box objects, or a `BoundingBoxArray`, if a motion has been detected.
+                If no motion detected then it returns an empty list (or an empty `BoundingBoxArray`).
         """
 
     @classmethod
@@ -0,0 +1,156 @@
+from typing import List
+
+import cv2
+import numpy as np
+import structlog
+
+from py_motion_detector.models.bounding_box import BoundingBoxArray
+
+logger = structlog.get_logger()
+
+
+class BatchedMotionDetectionWeightedAverage:
+    """
+    The `MotionDetectionWeightedAverage` algorithm applied to a batch of same-shape frames, one per stream, in a single
+    call per processing step instead of one call per stream.
+
+    The frames are copied into a tall image where every stream is surrounded by `pad` rows: before blurring they hold
+    the reflection of the stream's border rows (OpenCV's default border), and before dilating they are set to zero, so
+    that no stream affects its neighbours and the bounding boxes are the same as the ones of one
+    `MotionDetectionWeightedAverage` per stream. The running averages of all streams are stored in one float32 array.
+
+    Example usage:
+
+    model = BatchedMotionDetectionWeightedAverage(n_streams=len(cameras))
+    while True:
+        frames = [camera.read()[1] for camera in cameras]
+        for camera, bounding_boxes in zip(cameras, model.next_frames(frames)):
+            ...
+    """
+
+    def __init__(
+        self,
+        n_streams: int,
+        min_area: int = 1000,
+        delta_threshold: int = 10,
+        g_kernel: tuple[int, int] = (21, 21),
+        acc_weight: float = 0.3,
+        dil_iters: int = 10,
+    ):
+        """
+
+        Args:
+            n_streams: Number of frames passed to every call of `next_frames`.
+            min_area: Used as a threshold to get the bounding boxes from the image contours. Any value below this area
+                will not produce a bounding box.
+            delta_threshold: Used as a threshold value for OpenCV's `cv2.threshold` function.
+            g_kernel: Size of the gaussian kernel used to blur the input image to remove noise.
+            acc_weight: Weight of the input image. It regulates the update speed (how fast the accumulator “forgets”
+                earlier images).
+            dil_iters: Number of iterations to run the OpenCV's dilate function before extracting the bounding boxes.
+        """
+        if n_streams < 1:
+            raise ValueError(f"The number of streams needs to be a positive integer, not {n_streams}.")
+        self.n_streams = n_streams
+        self.min_area = min_area
+        self.delta_threshold = delta_threshold
+
+        self._gkernel = g_kernel
+        self._weight = acc_weight
+        self._dil_iter = dil_iters
+        # Rows between the streams: enough for the blur kernel on each side, and for the dilation between two streams
+        self.pad = max(g_kernel[1] // 2, (dil_iters + 1) // 2)
+
+        self._weighted_average_image = None
+        self._frame_shape = None
+        logger.info(f"Motion detection model '{self.name()}' has been initialized.", n_streams=n_streams)
+
+    @classmethod
+    def name(cls) -> str:
+        return cls.__name__
+
+    def _allocate_buffers(self, frame_shape: tuple):
+        """Allocates the tall images reused by every call to `next_frames`, once per frame shape."""
+        if self._frame_shape == frame_shape:
+            return
+        height, width = frame_shape[:2]
+        if self.pad >= height:
+            raise ValueError(f"The frames need to be more than {self.pad} pixels high, not {height}.")
+        if self._frame_shape is not None:
+            logger.info(f"{self.name()}: The frame shape changed to {frame_shape}, restarting the background images.")
+        self._frame_shape = frame_shape
+        self._weighted_average_image = None
+
+        pad = self.pad
+        self._block = height + 2 * pad
+        tall_shape = (self.n_streams * self._block, width)
+        self._frames = np.zeros(tall_shape + frame_shape[2:], dtype=np.uint8)
+        self._gray = np.empty(tall_shape, dtype=np.uint8)
+        self._blurred = np.empty(tall_shape, dtype=np.uint8)
+        self._background = np.empty(tall_shape, dtype=np.uint8)
+        self._delta = np.empty(tall_shape, dtype=np.uint8)
+        self._thresh = np.empty(tall_shape, dtype=np.uint8)
+
+        # Row indices of the padding, and of the rows reflected into it (`BORDER_REFLECT_101`)
+        starts = np.arange(self.n_streams)[:, None] * self._block + pad
+        offsets = np.arange(1, pad + 1)
+        self._pad_rows = np.concatenate([starts - offsets, starts + height - 1 + offsets], axis=1).ravel()
+        self._reflected_rows = np.concatenate([starts + offsets, starts + height - 1 - offsets], axis=1).ravel()
+
+    def stream_views(self, frame_shape: tuple) -> List[np.array]:
+        """
+        Returns the views of the tall image holding the frame of every stream. Frames written directly into them, e.g.
+        with `cv2.VideoCapture.read(image=view)`, are not copied by `next_frames`.
+        """
+        self._allocate_buffers(frame_shape)
+        pad, height = self.pad, frame_shape[0]
+        return [self._frames[i * self._block + pad : i * self._block + pad + height] for i in range(self.n_streams)]
+
+    def next_frames(self, frames: List[np.array]) -> List[BoundingBoxArray]:
+        """
+        Used to detect motion in every stream.
+
+        Args:
+            frames: The current frame of every stream, all of the same shape.
+
+        Returns:
+            The bounding boxes of every stream, in the order of `frames`.
+        """
+        if len(frames) != self.n_streams:
+            raise ValueError(f"Expected {self.n_streams} frames, got {len(frames)}.")
+        for view, frame in zip(self.stream_views(frames[0].shape), frames, strict=True):
+            if not np.may_share_memory(view, frame):
+                np.copyto(view, frame)
+
+        gray = self._to_blurred_gray()
+        if self._weighted_average_image is None:
+            logger.info(f"{self.name()}: Starting background images.")
+            self._weighted_average_image = gray.astype(np.float32)
+            return [BoundingBoxArray() for _ in range(self.n_streams)]
+
+        cv2.accumulateWeighted(gray, self._weighted_average_image, self._weight)
+        cv2.convertScaleAbs(self._weighted_average_image, dst=self._background)
+        cv2.absdiff(gray, self._background, dst=self._delta)
+        cv2.threshold(self._delta, self.delta_threshold, 255, cv2.THRESH_BINARY, dst=self._thresh)
+        self._thresh[self._pad_rows] = 0
+        cv2.dilate(self._thresh, None, dst=self._thresh, iterations=self._dil_iter)
+        self._thresh[self._pad_rows] = 0  # separates the contours of neighbouring streams
+
+        contours, _ = cv2.findContours(self._thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return self._split_bounding_boxes(contours)
+
+    def _to_blurred_gray(self) -> np.array:
+        if self._frames.ndim == 2:
+            np.copyto(self._gray, self._frames)
+        else:
+            cv2.cvtColor(self._frames, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        self._gray[self._pad_rows] = self._gray[self._reflected_rows]
+        return cv2.GaussianBlur(self._gray, self._gkernel, 0, dst=self._blurred)
+
+    def _split_bounding_boxes(self, cv2_contours) -> List[BoundingBoxArray]:
+        xywh = np.array(
+            [cv2.boundingRect(c) for c in cv2_contours if cv2.contourArea(c) >= self.min_area], dtype=np.int32
+        ).reshape(-1, 4)
+        streams = xywh[:, 1] // self._block
+        xywh[:, 1] -= streams * self._block + self.pad
+        return [BoundingBoxArray.from_xywh(xywh[streams == i]) for i in range(self.n_streams)]
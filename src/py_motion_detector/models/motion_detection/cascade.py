@@ -0,0 +1,160 @@
+import time
+
+import cv2
+import numpy as np
+import structlog
+
+from py_motion_detector.instrumentation.metrics import MetricsRegistry, get_registry
+from py_motion_detector.models.bounding_box import BoundingBoxArray, BoundingBoxes
+from py_motion_detector.models.motion_detection.base import MotionDetectionModelABC
+from py_motion_detector.models.motion_detection.resolution import DetectionResolution
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+
+logger = structlog.get_logger()
+
+
+class CascadeMotionDetection(MotionDetectionModelABC):
+    """
+    Runs a cheap motion test on a grey thumbnail of every frame, and the full motion detection model only on the frames
+    where the test fires. The test compares the thumbnail with a running average of the previous thumbnails and fires
+    when more than `min_changed_ratio` of its pixels differ by more than `pixel_threshold` grey levels.
+
+    The full model also runs for `hold_frames` frames after the test last fired, so that it sees the end of the motion,
+    and at least once every `max_skipped_frames` frames, so that its background keeps up with slow lighting changes.
+
+    Example usage:
+
+    model = CascadeMotionDetection(MotionDetectionWeightedAverage(min_area=500), thumbnail_size=64)
+    for frame in frames:
+        bounding_boxes = model.next_frame(frame)
+    print(model.report())
+    """
+
+    def __init__(
+        self,
+        model: MotionDetectionModelABC | None = None,
+        thumbnail_size: int = 64,
+        pixel_threshold: float = 4.0,
+        min_changed_ratio: float = 0.0,
+        acc_weight: float = 0.3,
+        hold_frames: int = 5,
+        max_skipped_frames: int = 50,
+        metrics_registry: MetricsRegistry | None = None,
+    ):
+        """
+
+        Args:
+            model: The full motion detection model. Defaults to a `MotionDetectionWeightedAverage`.
+            thumbnail_size: Length, in pixels, of the longest side of the thumbnails. A moving object needs to cover
+                a significant part of a thumbnail pixel for the test to fire, so the thumbnails should not be much
+                smaller than the frame size divided by the side of the smallest object to detect.
+            pixel_threshold: Minimum difference, in grey levels, between a thumbnail pixel and its running average for
+                the pixel to count as changed. Lower than the threshold of the full model, since the thumbnail averages
+                the pixels of small objects with their background.
+            min_changed_ratio: The test fires when more than this fraction of the thumbnail pixels changed. The default
+                fires as soon as one pixel changed.
+            acc_weight: Weight of the current thumbnail in the running average.
+            hold_frames: Number of frames the full model keeps running after the test last fired.
+            max_skipped_frames: Maximum number of consecutive frames not passed to the full model.
+            metrics_registry: Where the duration of the test, the frame counters of the cascade, its gate hit rate and
+                its estimated saving (see `report`) are recorded. Defaults to the registry shared by the application.
+        """
+        self.model = model if model is not None else MotionDetectionWeightedAverage()
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_ratio = min_changed_ratio
+        self.acc_weight = acc_weight
+        self.hold_frames = hold_frames
+        self.max_skipped_frames = max_skipped_frames
+        self._thumbnail = DetectionResolution(thumbnail_size)
+        self._average: np.ndarray | None = None
+        self._gray_uint8: np.ndarray | None = None
+        self._gray: np.ndarray | None = None
+        self._delta: np.ndarray | None = None
+        self._hold = 0
+        self._skipped = 0
+
+        self.frames = 0
+        self.gate_hits = 0
+        self.full_model_frames = 0
+        self.gate_seconds = 0.0
+        self.full_model_seconds = 0.0
+
+        registry = metrics_registry if metrics_registry is not None else get_registry()
+        self._gate_histogram = registry.histogram("model_stage_seconds", model=self.name(), stage="gate")
+        self._skipped_counter = registry.counter("cascade_skipped_frames_total", model=self.name())
+        self._full_counter = registry.counter("cascade_full_model_frames_total", model=self.name())
+        # the savings of the cascade are exported along with the metrics of the app, not only by `report`
+        registry.gauge("cascade_gate_hit_rate", lambda: self.gate_hit_rate, model=self.name())
+        registry.gauge("cascade_estimated_saving", lambda: self.report()["estimated_saving"], model=self.name())
+        logger.info(f"Motion detection model '{self.name()}' has been initialized with '{self.model.name()}'.")
+
+    def _gate(self, frame: np.array) -> bool:
+        """Updates the running average of the thumbnails and returns whether the thumbnail of `frame` changed."""
+        thumbnail = self._thumbnail.downscale(frame)
+        if self._gray is None or self._gray.shape != thumbnail.shape[:2]:
+            self._gray_uint8 = np.empty(thumbnail.shape[:2], dtype=np.uint8)
+            self._gray = np.empty(thumbnail.shape[:2], dtype=np.float32)
+            self._delta = np.empty(thumbnail.shape[:2], dtype=np.float32)
+            self._average = None
+        if thumbnail.ndim == 2:
+            np.copyto(self._gray, thumbnail)
+        else:
+            cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY, dst=self._gray_uint8)
+            np.copyto(self._gray, self._gray_uint8)
+
+        if self._average is None:
+            self._average = self._gray.copy()
+            return True
+        cv2.absdiff(self._gray, self._average, dst=self._delta)
+        cv2.accumulateWeighted(self._gray, self._average, self.acc_weight)
+        cv2.threshold(self._delta, self.pixel_threshold, 1, cv2.THRESH_BINARY, dst=self._delta)
+        changed = cv2.countNonZero(self._delta)
+        return changed > self.min_changed_ratio * self._delta.size
+
+    def next_frame(self, frame: np.array) -> BoundingBoxes:
+        self.frames += 1
+        start = time.perf_counter()
+        fired = self._gate(frame)
+        gate_end = time.perf_counter()
+        self.gate_seconds += gate_end - start
+        self._gate_histogram.observe(gate_end - start)
+
+        if fired:
+            self.gate_hits += 1
+            self._hold = self.hold_frames
+        elif self._hold > 0:
+            self._hold -= 1
+        elif self._skipped < self.max_skipped_frames:
+            self._skipped += 1
+            self._skipped_counter.inc()
+            return BoundingBoxArray()
+
+        self._skipped = 0
+        bounding_boxes = self.model.next_frame(frame)
+        self.full_model_seconds += time.perf_counter() - gate_end
+        self.full_model_frames += 1
+        self._full_counter.inc()
+        return bounding_boxes
+
+    @property
+    def gate_hit_rate(self) -> float:
+        """The fraction of the frames on which the test fired."""
+        return self.gate_hits / self.frames if self.frames else 0.0
+
+    def report(self) -> dict:
+        """
+        Returns the frame counts of the cascade and its estimated savings: the time the full model would have taken on
+        the skipped frames, at its mean latency, minus the time spent in the test, as a fraction of the time the full
+        model alone would have taken.
+        """
+        full_model_sec = self.full_model_seconds / self.full_model_frames if self.full_model_frames else 0.0
+        without_cascade = self.frames * full_model_sec
+        with_cascade = self.gate_seconds + self.full_model_seconds
+        return {
+            "frames": self.frames,
+            "gate_hit_rate": self.gate_hit_rate,
+            "full_model_rate": self.full_model_frames / self.frames if self.frames else 0.0,
+            "gate_ms": 1000 * self.gate_seconds / self.frames if self.frames else 0.0,
+            "full_model_ms": 1000 * full_model_sec,
+            "estimated_saving": 1 - with_cascade / without_cascade if without_cascade else 0.0,
+        }
@@ -0,0 +1,89 @@
+import numpy as np
+
+from py_motion_detector.instrumentation.metrics import MetricsRegistry
+from py_motion_detector.models.motion_detection.roi import RegionOfInterest
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+
+FRACTION_BITS = 8
+"""Number of fractional bits of the fixed-point running average: a uint16 holds a uint8 pixel value times 256."""
+
+
+class MotionDetectionFixedPointAverage(MotionDetectionWeightedAverage):
+    """
+    A variant of `MotionDetectionWeightedAverage` keeping the running average as uint16 fixed-point numbers with 8
+    fractional bits, updated with integer shifts only, for CPUs where floating-point image arithmetic is slow (e.g. the
+    ARM cores of a Raspberry Pi). The weight of the input image is `2 ** -acc_shift` instead of an arbitrary
+    `acc_weight`, and the update is
+
+        average += ((gray << 8) >> acc_shift) - (average >> acc_shift)
+
+    which truncates instead of rounding, keeping the average at most `(2 ** acc_shift - 1) / 256` grey levels above the
+    float32 one. The background images of both models, rounded to uint8, therefore differ by at most one grey level,
+    and with `acc_weight=0.25` they return the same bounding boxes except where the difference to the background is
+    within one grey level of `delta_threshold`: there the box edges may move by a few pixels.
+    """
+
+    def __init__(
+        self,
+        min_area: int = 1000,
+        delta_threshold: int = 10,
+        g_kernel: tuple[int, int] = (21, 21),
+        acc_shift: int = 2,
+        dil_iters: int = 10,
+        detection_size: int | None = None,
+        roi: RegionOfInterest | None = None,
+        metrics_registry: MetricsRegistry | None = None,
+        blob_extraction: str = "contours",
+    ):
+        """
+
+        Args:
+            min_area: See `MotionDetectionWeightedAverage`.
+            delta_threshold: See `MotionDetectionWeightedAverage`.
+            g_kernel: See `MotionDetectionWeightedAverage`.
+            acc_shift: The weight of the input image is `2 ** -acc_shift`, from 0 (only the last frame) to 7. The
+                default of 2 is a weight of 0.25.
+            dil_iters: See `MotionDetectionWeightedAverage`.
+            detection_size: See `MotionDetectionWeightedAverage`.
+            roi: See `MotionDetectionWeightedAverage`.
+            metrics_registry: See `MotionDetectionWeightedAverage`.
+            blob_extraction: See `MotionDetectionWeightedAverage`.
+        """
+        if not 0 <= acc_shift < FRACTION_BITS:
+            # with 8 shifts the rounding offset added to the average could overflow the uint16
+            raise ValueError(f"The accumulator shift needs to be between 0 and {FRACTION_BITS - 1}, not {acc_shift}.")
+        super().__init__(
+            min_area=min_area,
+            delta_threshold=delta_threshold,
+            g_kernel=g_kernel,
+            acc_weight=2.0**-acc_shift,
+            dil_iters=dil_iters,
+            detection_size=detection_size,
+            roi=roi,
+            metrics_registry=metrics_registry,
+            blob_extraction=blob_extraction,
+        )
+        self.acc_shift = acc_shift
+
+    def _allocate_buffers(self, shape: tuple[int, int]):
+        if self._buffers_shape == shape:
+            return
+        super()._allocate_buffers(shape)
+        self._scratch = np.empty(shape, dtype=np.uint16)
+
+    def _start_background(self, gray: np.array):
+        self._weighted_average_image = np.left_shift(gray, FRACTION_BITS, dtype=np.uint16)
+
+    def _motion_mask(self, gray: np.array) -> np.array:
+        """Updates the fixed-point running average with `gray` and returns the binary mask of the changed pixels."""
+        average, scratch = self._weighted_average_image, self._scratch
+        # average - average / 2**s never underflows, and adding gray * 256 / 2**s stays below 65280 + 2**s
+        np.right_shift(average, self.acc_shift, out=scratch)
+        np.subtract(average, scratch, out=average)
+        # an integer multiplication by a power of 2 is a shift, numpy widens the uint8 image faster this way
+        np.multiply(gray, 1 << (FRACTION_BITS - self.acc_shift), out=scratch, dtype=np.uint16)
+        np.add(average, scratch, out=average)
+        # round to the nearest grey level, as `convertScaleAbs` does
+        np.add(average, 1 << (FRACTION_BITS - 1), out=scratch)
+        np.right_shift(scratch, FRACTION_BITS, out=self._background, casting="unsafe")
+        return self._threshold_delta(gray)
@@ -0,0 +1,75 @@
+import cv2
+import numpy as np
+
+from py_motion_detector.models.bounding_box import BoundingBoxArray
+
+
+class DetectionResolution:
+    """
+    Downscales frames, preserving their aspect ratio, so that motion detection runs on a small copy of the frame, and
+    maps the bounding boxes found on the small copy back to the coordinates of the full resolution frame.
+
+    Example usage:
+
+    resolution = DetectionResolution(max_size=320)
+    small_frame = resolution.downscale(frame)
+    bounding_boxes = resolution.to_full_resolution(model_bounding_boxes)
+    """
+
+    def __init__(self, max_size: int | None = None):
+        """
+
+        Args:
+            max_size: Maximum length, in pixels, of the longest side of the frames used for detection. Frames that are
+                already smaller are not resized. `None` disables downscaling.
+        """
+        self.max_size = max_size
+        self._full_shape: tuple | None = None
+        self._small_shape: tuple[int, int] | None = None
+        self._buffer: np.ndarray | None = None
+
+    @property
+    def scale_y(self) -> float:
+        return 1.0 if self._small_shape is None else self._full_shape[0] / self._small_shape[0]
+
+    @property
+    def scale_x(self) -> float:
+        return 1.0 if self._small_shape is None else self._full_shape[1] / self._small_shape[1]
+
+    @property
+    def area_scale(self) -> float:
+        """How many full resolution pixels one detection resolution pixel covers."""
+        return self.scale_y * self.scale_x
+
+    def downscale(self, frame: np.array) -> np.array:
+        """
+        Returns:
+            The frame resized to the detection resolution, written to a buffer that is reused by the next call, or the
+            frame itself if it does not need to be resized.
+        """
+        if frame.shape != self._full_shape:
+            self._full_shape = frame.shape
+            height, width = frame.shape[:2]
+            scale = 1.0 if self.max_size is None else self.max_size / max(height, width)
+            if scale < 1.0:
+                self._small_shape = (max(round(height * scale), 1), max(round(width * scale), 1))
+                self._buffer = np.empty(self._small_shape + frame.shape[2:], dtype=frame.dtype)
+            else:
+                self._small_shape = None
+                self._buffer = None
+
+        if self._small_shape is None:
+            return frame
+        return cv2.resize(frame, self._small_shape[::-1], dst=self._buffer, interpolation=cv2.INTER_AREA)
+
+    def to_full_resolution(self, bounding_boxes: BoundingBoxArray) -> BoundingBoxArray:
+        """Maps bounding boxes from the detection resolution to the resolution of the last downscaled frame."""
+        if self._small_shape is None or not bounding_boxes:
+            return bounding_boxes
+        scale = np.array([self.scale_y, self.scale_x, self.scale_y, self.scale_x])
+        data = bounding_boxes.data * scale
+        data[:, :2] = np.floor(data[:, :2])
+        data[:, 2:] = np.ceil(data[:, 2:])
+        data[:, 0::2] = np.clip(data[:, 0::2], 0, self._full_shape[0])
+        data[:, 1::2] = np.clip(data[:, 1::2], 0, self._full_shape[1])
+        return BoundingBoxArray(data)
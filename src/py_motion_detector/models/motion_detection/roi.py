@@ -0,0 +1,138 @@
+import json
+from pathlib import Path
+from typing import List, Sequence
+
+import cv2
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+Polygon = Sequence[Sequence[float]]
+"""A polygon as a sequence of `(x, y)` points."""
+
+
+class RegionOfInterest:
+    """
+    Polygon regions of a camera's field of view where motion should (or should not) be detected.
+
+    Motion detection models crop the frames to the bounding rectangle of the `include` polygons before any heavy
+    processing, and ignore the motion of the pixels outside the `include` polygons or inside the `exclude` polygons.
+
+    Example usage:
+
+    roi = RegionOfInterest(
+        include=[[(0, 200), (300, 200), (300, 500), (0, 500)]],  # the driveway
+        exclude=[[(250, 200), (300, 200), (300, 250)]],  # a tree
+    )
+    model = MotionDetectionWeightedAverage(roi=roi)
+    """
+
+    def __init__(
+        self, include: List[Polygon] | None = None, exclude: List[Polygon] | None = None, normalized: bool = False
+    ):
+        """
+
+        Args:
+            include: Polygons where motion is detected. `None` or an empty list means the whole frame.
+            exclude: Polygons where motion is ignored, even if they overlap with an `include` polygon.
+            normalized: If set to `True` the coordinates of the points are fractions of the frame width (x) and height
+                (y), so that the same regions can be used at any resolution. Otherwise they are pixels.
+        """
+        self.include = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in include or []]
+        self.exclude = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in exclude or []]
+        self.normalized = normalized
+
+        self._frame_shape: tuple | None = None
+        self._rect: tuple[int, int, int, int] | None = None
+        self._full_mask: np.ndarray | None = None
+        self._masks: dict = {}
+
+    @classmethod
+    def from_dict(cls, dict_json: dict) -> "RegionOfInterest":
+        return cls(
+            include=dict_json.get("include"),
+            exclude=dict_json.get("exclude"),
+            normalized=dict_json.get("normalized", False),
+        )
+
+    @classmethod
+    def from_json(cls, path: Path) -> "RegionOfInterest":
+        """
+        Loads the regions from a JSON file such as:
+        `{"include": [[[0, 200], [300, 200], [300, 500]]], "exclude": [], "normalized": false}`
+        """
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def _to_pixels(self, polygon: np.ndarray, frame_shape: tuple) -> np.ndarray:
+        if self.normalized:
+            polygon = polygon * (frame_shape[1], frame_shape[0])
+        return np.round(polygon).astype(np.int32)
+
+    def _prepare(self, frame_shape: tuple):
+        if frame_shape == self._frame_shape:
+            return
+        self._frame_shape = frame_shape
+        self._masks = {}
+        height, width = frame_shape[:2]
+        include = [self._to_pixels(p, frame_shape) for p in self.include]
+        exclude = [self._to_pixels(p, frame_shape) for p in self.exclude]
+
+        if include:
+            points = np.concatenate(include)
+            left, top = np.clip(points.min(axis=0), 0, (width, height))
+            right, bottom = np.clip(points.max(axis=0) + 1, 0, (width, height))
+        else:
+            top, left, bottom, right = 0, 0, height, width
+        self._rect = (int(top), int(left), int(bottom), int(right))
+        if bottom <= top or right <= left:
+            logger.warning(
+                f"The regions of interest are outside of the {width}x{height} frames, no motion is detected."
+            )
+
+        if not include and not exclude:
+            self._full_mask = None
+            return
+        mask = np.zeros((height, width), dtype=np.uint8)
+        if include:
+            cv2.fillPoly(mask, include, 255)
+        else:
+            mask[:] = 255
+        if exclude:
+            cv2.fillPoly(mask, exclude, 0)
+        self._full_mask = mask[top:bottom, left:right]
+
+    def crop_rect(self, frame_shape: tuple) -> tuple[int, int, int, int]:
+        """Returns the `(top, left, bottom, right)` bounding rectangle of the regions of interest."""
+        self._prepare(frame_shape)
+        return self._rect
+
+    def is_empty(self, frame_shape: tuple) -> bool:
+        """Whether the `include` polygons are entirely outside of the frames, in which case no motion is detected."""
+        top, left, bottom, right = self.crop_rect(frame_shape)
+        return bottom <= top or right <= left
+
+    def crop(self, frame: np.array) -> np.array:
+        """Returns a view of `frame` cropped to the bounding rectangle of the regions of interest."""
+        top, left, bottom, right = self.crop_rect(frame.shape)
+        return frame[top:bottom, left:right]
+
+    def mask(self, frame_shape: tuple, shape: tuple[int, int]) -> np.ndarray | None:
+        """
+        Returns the mask of the cropped regions of interest (255 where motion is detected, 0 elsewhere) resized to
+        `shape`, or `None` if motion is detected everywhere.
+
+        Args:
+            frame_shape: The shape of the full frames.
+            shape: The `(height, width)` of the mask, e.g. the shape of the cropped frame after it was downscaled.
+        """
+        self._prepare(frame_shape)
+        if self._full_mask is None:
+            return None
+        if shape not in self._masks:
+            if shape == self._full_mask.shape:
+                self._masks[shape] = np.ascontiguousarray(self._full_mask)
+            else:
+                self._masks[shape] = cv2.resize(self._full_mask, shape[::-1], interpolation=cv2.INTER_NEAREST)
+        return self._masks[shape]
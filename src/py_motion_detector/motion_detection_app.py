@@ -1,14 +1,21 @@
 import datetime
 import sys
 import time
-from typing import List
+import warnings
+from typing import Callable, List
 
+import numpy as np
 import structlog
 
+from py_motion_detector.callbacks.async_dispatch import AsyncCallback, BackpressurePolicy
 from py_motion_detector.callbacks.base import MotionDetectionCallbackABC
 from py_motion_detector.input_sources.base import FrameProviderABC
+from py_motion_detector.instrumentation.metrics import MetricsRegistry, get_registry
 from py_motion_detector.models.motion_detection.base import MotionDetectionModelABC
 from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+from py_motion_detector.post_processing.base import BoundingBoxPostProcessorABC
+from py_motion_detector.scheduling.idle import AdaptiveIdleScheduler
+from py_motion_detector.scheduling.windows import ActiveWindowSchedule, TimeWindow
 
 logger = structlog.get_logger()
 
@@ -39,27 +46,115 @@ class MotionDetectionApplication:
         duration: datetime.time | None = None,
         motion_detection_model: MotionDetectionModelABC | None = None,
         callbacks: List[MotionDetectionCallbackABC] | None = None,
-        sleep_sec: int = 10,
+        sleep_sec: int | None = None,
+        async_callbacks: bool = False,
+        callback_queue_size: int = 16,
+        callback_backpressure: BackpressurePolicy | str = BackpressurePolicy.BLOCK,
+        idle_scheduler: AdaptiveIdleScheduler | None = None,
+        metrics_registry: MetricsRegistry | None = None,
+        metrics_interval_sec: float | None = None,
+        active_windows: List[TimeWindow] | None = None,
+        warmup_frames: int = 0,
+        clock: Callable[[], datetime.datetime] = datetime.datetime.now,
+        post_processors: List[BoundingBoxPostProcessorABC] | None = None,
     ):
         """
 
         Args:
             frame_provider: An object that can be used to provide input frames.
-            from_time: From what time to start detecting motion.
-            duration: Until what time to run the motion detection app.
+            from_time: From what time to start detecting motion, every day.
+            duration: For how long to detect motion after `from_time`. The window may cross midnight.
             motion_detection_model: An object that implements a motion detection algorithm.
             callbacks: List of callbacks that are called at the beginning, and when an object is detected by the
                 motion detection algorithm
-            sleep_sec: How many seconds to sleep if outside of the `from_time` and `duration`. TODO
+            sleep_sec: Deprecated and ignored, a `DeprecationWarning` is raised if it is set. Outside of the active
+                windows the app sleeps until the next window starts.
+            async_callbacks: If set to `True` every callback is wrapped in an `AsyncCallback` and executed on its own
+                worker thread, so that the detection loop never waits on the callbacks' I/O.
+            callback_queue_size: Maximum number of frames queued per callback when `async_callbacks` is `True`.
+            callback_backpressure: What to do when the queue of a callback is full when `async_callbacks` is `True`.
+            idle_scheduler: If set, lowers the rate at which frames are processed when no motion has been detected for
+                a while. Skipped frames are not passed to the motion detection model or the callbacks.
+            metrics_registry: Where the time spent waiting for frames and in every callback, and the frame counters,
+                are recorded. Defaults to the registry shared by the application.
+            metrics_interval_sec: If set, a summary of the metrics is logged every `metrics_interval_sec` seconds.
+            active_windows: Daily windows of time during which motion is detected, in addition to the one defined by
+                `from_time` and `duration`. Outside of all the windows the frame provider is closed (e.g. the camera is
+                released) and the app sleeps until the next window starts. `None` detects motion all the time.
+            warmup_frames: Number of frames passed to the motion detection model only, without calling the callbacks,
+                every time the frame provider is opened, to let the camera exposure and the model background settle.
+            clock: Function returning the current local time, used by the tests.
+            post_processors: Stages run in order on the bounding boxes returned by the motion detection model, before
+                they are counted and passed to the callbacks, e.g. a `BoundingBoxMerger`.
         """
+        if sleep_sec is not None:
+            warnings.warn(
+                "sleep_sec is deprecated and ignored, the app sleeps until the next active window starts.",
+                DeprecationWarning,
+                stacklevel=2,
+            )
         self.from_time = from_time
         self.duration = duration
         self.frame_provider = frame_provider
         self.motion_detection_model = (
             motion_detection_model if motion_detection_model is not None else MotionDetectionWeightedAverage()
         )
+        self.post_processors = post_processors if post_processors is not None else []
         self.callbacks = callbacks if callbacks is not None else []
-        self.sleep_sec = sleep_sec
+        if async_callbacks:
+            self.callbacks = [
+                (
+                    callback
+                    if isinstance(callback, AsyncCallback)
+                    else AsyncCallback(callback, queue_size=callback_queue_size, backpressure=callback_backpressure)
+                )
+                for callback in self.callbacks
+            ]
+        self.active_windows = active_windows
+        self.warmup_frames = warmup_frames
+        self._clock = clock
+        self._schedule: ActiveWindowSchedule | None = None
+        self._schedule_key = None
+        self.idle_scheduler = idle_scheduler
+        self.metrics_registry = metrics_registry if metrics_registry is not None else get_registry()
+        self.metrics_interval_sec = metrics_interval_sec
+        self._setup_metrics()
+
+    def _setup_metrics(self):
+        """Gets the metrics updated for every frame once, so that the main loop does not look them up."""
+        registry = self.metrics_registry
+        self._capture_seconds = registry.histogram("capture_seconds")
+        self._post_processor_seconds = [
+            registry.histogram("post_processor_seconds", post_processor=p.name()) for p in self.post_processors
+        ]
+        self._callback_seconds = [registry.histogram("callback_seconds", callback=c.name()) for c in self.callbacks]
+        self._frames_captured = registry.counter("frames_captured_total")
+        self._frames_processed = registry.counter("frames_processed_total")
+        self._frames_skipped = registry.counter("frames_skipped_total")
+        self._frames_warmup = registry.counter("frames_warmup_total")
+        self._frames_with_motion = registry.counter("frames_with_motion_total")
+        self._bounding_boxes_detected = registry.counter("bounding_boxes_total")
+        # Input sources and callbacks that can drop frames (e.g. `PrefetchFrameProvider` and `AsyncCallback`) count them
+        sources = [(type(self.frame_provider).__name__, self.frame_provider)]
+        sources += [(callback.name(), callback) for callback in self.callbacks]
+        for name, source in sources:
+            if hasattr(source, "dropped_frames"):
+                registry.gauge("frames_dropped", lambda source=source: source.dropped_frames, source=name)
+        if self.idle_scheduler is not None:
+            scheduler = self.idle_scheduler
+            # 0 while every frame is processed
+            registry.gauge("idle_scheduler_fps", lambda: scheduler.current_fps or 0.0)
+            registry.gauge("idle_scheduler_idle", lambda: scheduler.is_idle)
+            registry.gauge("idle_scheduler_transitions", lambda: scheduler.transitions)
+        self._last_metrics_log_time = time.monotonic()
+
+    def _log_metrics(self, force: bool = False):
+        if self.metrics_interval_sec is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_metrics_log_time >= self.metrics_interval_sec:
+            self._last_metrics_log_time = now
+            logger.info("Motion detection metrics.", **self.metrics_registry.summary())
 
     def run(self):
         """The main entry point of the app."""
@@ -75,6 +170,7 @@ class MotionDetectionApplication:
             sys.exit(1)
         finally:
             self._shutdown_callbacks()
+            self._log_metrics(force=True)
 
     def _setup_callbacks(self):
         """This method is called before the main application runs to set up all callback classes"""
@@ -82,37 +178,103 @@ class MotionDetectionApplication:
         _ = [callback.on_start() for callback in self.callbacks]
 
     def _shutdown_callbacks(self):
-        """This method is called when the main application closes to shut down all callback classes"""
+        """
+        This method is called when the main application closes to shut down all callback classes. Callbacks are shut
+        down in order, asynchronous callbacks first process all of their queued frames.
+        """
         logger.info("Shutting down the Callback Classes.")
         _ = [callback.on_exit() for callback in self.callbacks]
 
     def _run(self):
         logger.info("Starting Motion Detection App")
 
-        with self.frame_provider as frame_prv:
-            for frame in frame_prv.frames():
+        while self._sleep_until_active():
+            with self.frame_provider as frame_prv:
+                if self._run_active_window(frame_prv):
+                    return
 
-                if self._should_process_based_on_time() is not True:
-                    logger.info(
-                        f"Skipping processing frames because current time not between {self.from_time} "
-                        f"and duration {self.duration}. Sleeping for {self.sleep_sec} seconds"
-                    )
-                    time.sleep(self.sleep_sec)
-                    continue
+    def _run_active_window(self, frame_prv: FrameProviderABC) -> bool:
+        """
+        Processes the frames of an open frame provider until the end of the active window.
 
-                motion_detected_bounding_boxes = self.motion_detection_model.next_frame(frame)
+        Returns:
+            `True` if the frame provider has no more frames, `False` if the active window ended.
+        """
+        warmup_frames = self.warmup_frames
+        capture_start = time.perf_counter()
+        for frame in frame_prv.frames():
+            self._capture_seconds.observe(time.perf_counter() - capture_start)
+            self._frames_captured.inc()
+            if not self._should_process_based_on_time():
+                logger.info(f"Leaving the active window, closing '{type(self.frame_provider).__name__}'.")
+                return False
+            if warmup_frames > 0:
+                self.motion_detection_model.next_frame(frame)
+                self._frames_warmup.inc()
+                warmup_frames -= 1
+            else:
+                self._process_frame(frame)
+            self._log_metrics()
+            capture_start = time.perf_counter()
+        return True
 
-                timestamp = datetime.datetime.now()
-                for callback in self.callbacks:
-                    callback.execute(frame=frame, timestamp=timestamp, bounding_boxes=motion_detected_bounding_boxes)
+    def _sleep_until_active(self) -> bool:
+        """
+        Sleeps until the start of the next active window, if the current time is outside of all of them.
 
-    def _should_process_based_on_time(self) -> bool:
-        if self.from_time is None or self.duration is None:
-            return True
+        Returns:
+            `False` if no window is ever active, e.g. because of a zero `duration`.
+        """
+        schedule = self._active_schedule()
+        while schedule is not None and not schedule.is_active():
+            boundary = schedule.next_boundary()
+            if boundary is None:
+                logger.warning("None of the active windows has a positive duration, exiting.")
+                return False
+            logger.info(f"Outside of the active windows, sleeping until {boundary.isoformat(timespec='seconds')}.")
+            self._log_metrics(force=True)
+            time.sleep(max((boundary - self._clock()).total_seconds(), 0.0))
+        return True
 
-        current_time = datetime.datetime.now()
-        from_datetime = datetime.datetime.combine(current_time.date(), self.from_time)
-        until = from_datetime + datetime.timedelta(
-            hours=self.duration.hour, minutes=self.duration.minute, seconds=self.duration.second
-        )
-        return True if from_datetime <= current_time < until else False
+    def _process_frame(self, frame: np.array):
+        if self.idle_scheduler is not None and not self.idle_scheduler.should_process():
+            self._frames_skipped.inc()
+            return
+
+        motion_detected_bounding_boxes = self.motion_detection_model.next_frame(frame)
+        for post_processor, post_processor_seconds in zip(
+            self.post_processors, self._post_processor_seconds, strict=True
+        ):
+            start = time.perf_counter()
+            motion_detected_bounding_boxes = post_processor.process(frame, motion_detected_bounding_boxes)
+            post_processor_seconds.observe(time.perf_counter() - start)
+        self._frames_processed.inc()
+        if len(motion_detected_bounding_boxes) > 0:
+            self._frames_with_motion.inc()
+            self._bounding_boxes_detected.inc(len(motion_detected_bounding_boxes))
+        if self.idle_scheduler is not None:
+            self.idle_scheduler.update(motion_detected=len(motion_detected_bounding_boxes) > 0)
+
+        timestamp = self._clock()
+        for callback, callback_seconds in zip(self.callbacks, self._callback_seconds, strict=True):
+            start = time.perf_counter()
+            callback.execute(frame=frame, timestamp=timestamp, bounding_boxes=motion_detected_bounding_boxes)
+            callback_seconds.observe(time.perf_counter() - start)
+
+    def _active_schedule(self) -> ActiveWindowSchedule | None:
+        """
+        Returns the schedule of the active windows, `None` if motion is detected all the time. The schedule is only
+        rebuilt when `from_time`, `duration` or `active_windows` change.
+        """
+        key = (self.from_time, self.duration, self.active_windows)
+        if key != self._schedule_key:
+            windows = list(self.active_windows) if self.active_windows is not None else []
+            if self.from_time is not None and self.duration is not None:
+                windows.append(TimeWindow.from_time_and_duration(self.from_time, self.duration))
+            self._schedule = ActiveWindowSchedule(windows, clock=self._clock) if windows else None
+            self._schedule_key = key
+        return self._schedule
+
+    def _should_process_based_on_time(self) -> bool:
+        schedule = self._active_schedule()
+        return schedule is None or schedule.is_active()
@@ -0,0 +1 @@
+"""Running several motion detection pipelines, one per input source, in separate processes."""
@@ -0,0 +1,140 @@
+import math
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+_HEADER_FIELDS = 2  # write sequence number and closed flag
+_READ_ATTEMPTS = 64
+
+
+class SharedMemoryFrameRing:
+    """
+    A ring buffer of fixed-shape uint8 frames in a `multiprocessing.shared_memory` block, used to pass frames from a
+    capture process to a detection process without pickling them.
+
+    There is a single writer and a single reader. The writer never waits: it overwrites the oldest slot. The reader
+    always reads the most recent frame and detects, through per-slot sequence numbers, frames that were skipped or
+    overwritten while they were being copied.
+
+    Example usage:
+
+    ring = SharedMemoryFrameRing.create((480, 640, 3), n_slots=4)  # in the supervisor
+    writer = SharedMemoryFrameRing.attach(ring.name, (480, 640, 3), n_slots=4)  # in the capture process
+    writer.write(frame)
+    reader = SharedMemoryFrameRing.attach(ring.name, (480, 640, 3), n_slots=4)  # in the detection process
+    seq, frame = reader.read_latest(last_seq=0)
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, frame_shape: tuple, n_slots: int, owner: bool):
+        self._shm = shm
+        self.frame_shape = tuple(frame_shape)
+        self.n_slots = n_slots
+        self.owner = owner
+
+        self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        self._slot_seqs = np.ndarray((n_slots,), dtype=np.int64, buffer=shm.buf, offset=self._header.nbytes)
+        offset = self._header.nbytes + self._slot_seqs.nbytes
+        self._frames = np.ndarray((n_slots, *self.frame_shape), dtype=np.uint8, buffer=shm.buf, offset=offset)
+
+    @staticmethod
+    def size_in_bytes(frame_shape: tuple, n_slots: int) -> int:
+        return 8 * (_HEADER_FIELDS + n_slots) + n_slots * math.prod(frame_shape)
+
+    @classmethod
+    def create(cls, frame_shape: tuple, n_slots: int = 4, name: str | None = None) -> "SharedMemoryFrameRing":
+        """
+        Creates a new shared memory block. The creator is responsible for calling `unlink`.
+
+        Raises:
+            ValueError: If `n_slots` is lower than 2. With a single slot the writer overwrites the frame the reader is
+                copying, and a writer killed in the middle of a write leaves no readable frame.
+        """
+        if n_slots < 2:
+            raise ValueError(f"The ring needs at least 2 slots, not {n_slots}.")
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls.size_in_bytes(frame_shape, n_slots))
+        ring = cls(shm, frame_shape, n_slots, owner=True)
+        ring._header[:] = 0
+        ring._slot_seqs[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, frame_shape: tuple, n_slots: int = 4) -> "SharedMemoryFrameRing":
+        """Attaches to a shared memory block created by another process."""
+        shm = shared_memory.SharedMemory(name=name)
+        # Only the creator owns the block, otherwise the resource tracker of this process would unlink it on exit.
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return cls(shm, frame_shape, n_slots, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def write_seq(self) -> int:
+        """Sequence number of the last written frame, starting at 1."""
+        return int(self._header[0])
+
+    @property
+    def closed(self) -> bool:
+        """Whether the writer has no more frames to write."""
+        return bool(self._header[1])
+
+    @closed.setter
+    def closed(self, value: bool):
+        self._header[1] = int(value)
+
+    def write(self, frame: np.array) -> int:
+        """Copies a frame into the next slot and returns its sequence number."""
+        seq = self.write_seq + 1
+        slot = seq % self.n_slots
+        self._slot_seqs[slot] = -1  # the slot is being written
+        np.copyto(self._frames[slot], frame)
+        self._slot_seqs[slot] = seq
+        self._header[0] = seq
+        return seq
+
+    def read_latest(self, last_seq: int = 0) -> tuple[int, np.ndarray | None]:
+        """
+        Copies the most recent frame out of the ring.
+
+        Args:
+            last_seq: The sequence number of the last frame read by the caller.
+
+        Returns:
+            A `(seq, frame)` tuple. `frame` is `None` if no frame newer than `last_seq` has been written, or if the
+            most recent frame could not be read without being overwritten after a few attempts. The number of frames
+            the reader skipped is `seq - last_seq - 1`.
+        """
+        for _ in range(_READ_ATTEMPTS):
+            seq = self.write_seq
+            if seq <= last_seq:
+                return last_seq, None
+            slot = seq % self.n_slots
+            if self._slot_seqs[slot] != seq:
+                continue  # the writer already started overwriting the slot, read the newer frame
+            frame = self._frames[slot].copy()
+            if self._slot_seqs[slot] == seq:
+                return seq, frame
+        # e.g. the writer died while overwriting the slot, `wait_latest` polls again until its timeout
+        return last_seq, None
+
+    def wait_latest(self, last_seq: int, timeout_sec: float, poll_interval_sec: float = 0.002):
+        """Like `read_latest` but polls for up to `timeout_sec` seconds until a new frame is available."""
+        deadline = time.monotonic() + timeout_sec
+        while True:
+            seq, frame = self.read_latest(last_seq)
+            if frame is not None or self.closed or time.monotonic() >= deadline:
+                return seq, frame
+            time.sleep(poll_interval_sec)
+
+    def close(self) -> None:
+        self._header = self._slot_seqs = self._frames = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        if self.owner:
+            self._shm.unlink()
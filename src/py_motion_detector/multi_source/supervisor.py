@@ -0,0 +1,375 @@
+import dataclasses
+import datetime
+import multiprocessing
+import multiprocessing.synchronize
+import os
+import queue
+import time
+from typing import Callable, List
+
+import cv2
+import numpy as np
+import structlog
+
+from py_motion_detector.callbacks.base import MotionDetectionCallbackABC
+from py_motion_detector.input_sources.base import FrameProviderABC
+from py_motion_detector.input_sources.shared_memory import SharedMemoryFrameProvider
+from py_motion_detector.models.bounding_box import BoundingBoxes
+from py_motion_detector.models.motion_detection.base import MotionDetectionModelABC
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+from py_motion_detector.motion_detection_app import MotionDetectionApplication
+from py_motion_detector.multi_source.shared_memory_ring import SharedMemoryFrameRing
+
+logger = structlog.get_logger()
+
+CAPTURE = "capture"
+PIPELINE = "pipeline"
+
+
+@dataclasses.dataclass
+class PipelineSpec:
+    """
+    Describes the pipeline of one input source. The factories are called in the worker processes, so they need to be
+    picklable, e.g. classes or `functools.partial` objects, not lambdas.
+    """
+
+    name: str
+    """Unique name of the source, added to its logs and metrics."""
+
+    frame_provider_factory: Callable[[], FrameProviderABC]
+    """Creates the frame provider of the source, e.g. `functools.partial(CameraFrameProvider, 500, 1)`."""
+
+    frame_shape: tuple
+    """Shape of the frames passed to the detection process. Captured frames of another shape are resized."""
+
+    model_factory: Callable[[], MotionDetectionModelABC] = MotionDetectionWeightedAverage
+    """Creates the motion detection model of the source."""
+
+    callbacks_factory: Callable[[], List[MotionDetectionCallbackABC]] | None = None
+    """Creates the callbacks of the source."""
+
+    n_slots: int = 4
+    """Number of frames, at least 2, in the shared memory ring between the capture and the detection process."""
+
+    cpus: set[int] | None = None
+    """CPU cores the processes of the source are pinned to. `None` lets the operating system decide."""
+
+    app_kwargs: dict = dataclasses.field(default_factory=dict)
+    """Extra keyword arguments of the `MotionDetectionApplication`, e.g. `async_callbacks`."""
+
+
+class _QueueLogRenderer:
+    """The last structlog processor of the worker processes, sends the log events to the supervisor."""
+
+    def __init__(self, log_queue: multiprocessing.Queue, source: str, role: str):
+        self.log_queue = log_queue
+        self.source = source
+        self.role = role
+
+    def __call__(self, _logger, _method_name, event_dict: dict):
+        event_dict = {
+            key: value if isinstance(value, (str, int, float, bool, type(None))) else repr(value)
+            for key, value in event_dict.items()
+        }
+        event_dict.update(source=self.source, worker=self.role, pid=os.getpid())
+        self.log_queue.put(("log", event_dict))
+        raise structlog.DropEvent
+
+
+def _configure_worker(log_queue: multiprocessing.Queue, spec: PipelineSpec, role: str) -> None:
+    structlog.configure(
+        processors=[
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.format_exc_info,
+            _QueueLogRenderer(log_queue, spec.name, role),
+        ]
+    )
+    if spec.cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, spec.cpus)
+
+
+def _capture_worker(
+    spec: PipelineSpec, shm_name: str, stop_event: multiprocessing.synchronize.Event, log_queue: multiprocessing.Queue
+) -> None:
+    """Reads the frames of a source and writes them to its shared memory ring."""
+    _configure_worker(log_queue, spec, CAPTURE)
+    ring = SharedMemoryFrameRing.attach(shm_name, spec.frame_shape, spec.n_slots)
+    try:
+        with spec.frame_provider_factory() as frame_provider:
+            for frame in frame_provider.frames():
+                if stop_event.is_set():
+                    break
+                if frame is None:
+                    raise RuntimeError(f"The source '{spec.name}' did not return a frame.")
+                if frame.shape != ring.frame_shape:
+                    frame = cv2.resize(frame, (ring.frame_shape[1], ring.frame_shape[0]))
+                ring.write(frame)
+        # Only a source that ran out of frames closes the ring, after a crash the capture process is restarted and the
+        # detection process keeps waiting for frames.
+        ring.closed = True
+        logger.info(f"The source '{spec.name}' has no more frames.")
+    finally:
+        ring.close()
+
+
+class _MetricsReporterCallback(MotionDetectionCallbackABC):
+    """Periodically sends the metrics of a detection process to the supervisor."""
+
+    def __init__(
+        self,
+        log_queue: multiprocessing.Queue,
+        source: str,
+        frame_provider: SharedMemoryFrameProvider,
+        report_interval_sec: float,
+    ):
+        self.log_queue = log_queue
+        self.source = source
+        self.frame_provider = frame_provider
+        self.report_interval_sec = report_interval_sec
+        self.processed_frames = 0
+        self.motion_frames = 0
+        self._start_time = time.monotonic()
+        self._last_report_time = self._start_time
+
+    def on_start(self) -> None:
+        self._start_time = self._last_report_time = time.monotonic()
+
+    def execute(self, frame: np.array, timestamp: datetime.datetime, bounding_boxes: BoundingBoxes) -> None:
+        self.processed_frames += 1
+        self.motion_frames += len(bounding_boxes) > 0
+        if time.monotonic() - self._last_report_time >= self.report_interval_sec:
+            self._report()
+
+    def on_exit(self) -> None:
+        self._report()
+
+    def _report(self):
+        now = time.monotonic()
+        self._last_report_time = now
+        metrics = {
+            "processed_frames": self.processed_frames,
+            "motion_frames": self.motion_frames,
+            "dropped_frames": self.frame_provider.dropped_frames,
+            "fps": self.processed_frames / max(now - self._start_time, 1e-9),
+        }
+        self.log_queue.put(("metrics", (self.source, metrics)))
+
+
+def _pipeline_worker(
+    spec: PipelineSpec,
+    shm_name: str,
+    stop_event: multiprocessing.synchronize.Event,
+    log_queue: multiprocessing.Queue,
+    report_interval_sec: float,
+) -> None:
+    """Runs a `MotionDetectionApplication` on the frames of the shared memory ring of a source."""
+    _configure_worker(log_queue, spec, PIPELINE)
+    frame_provider = SharedMemoryFrameProvider(shm_name, spec.frame_shape, spec.n_slots, stop_event=stop_event)
+    callbacks = spec.callbacks_factory() if spec.callbacks_factory is not None else []
+    callbacks.append(_MetricsReporterCallback(log_queue, spec.name, frame_provider, report_interval_sec))
+    motion_app = MotionDetectionApplication(
+        frame_provider=frame_provider,
+        motion_detection_model=spec.model_factory(),
+        callbacks=callbacks,
+        **spec.app_kwargs,
+    )
+    motion_app.run()
+
+
+@dataclasses.dataclass
+class _Worker:
+    role: str
+    spec: PipelineSpec
+    process: multiprocessing.Process | None = None
+    restarts: int = 0
+    restart_at: float | None = None
+    finished: bool = False
+
+    @property
+    def name(self) -> str:
+        return f"{self.spec.name}/{self.role}"
+
+
+class MultiSourceSupervisor:
+    """
+    Runs one motion detection pipeline per input source. Every source has a capture process, which writes the frames
+    to a `SharedMemoryFrameRing`, and a detection process, which runs a `MotionDetectionApplication` on the most recent
+    frame of the ring, so the sources are processed on separate cores without pickling any frame.
+
+    Workers that exit with an error are restarted, waiting `restart_backoff_sec` seconds (doubled after every restart)
+    before restarting them. The logs of all workers are re-emitted by the supervisor process with the `source` they
+    come from, and the metrics of all sources are aggregated by `metrics`.
+
+    Example usage:
+
+    supervisor = MultiSourceSupervisor(
+        [
+            PipelineSpec("front", functools.partial(CameraFrameProvider, 500, 0), frame_shape=(500, 500, 3)),
+            PipelineSpec("back", functools.partial(CameraFrameProvider, 500, 1), frame_shape=(500, 500, 3)),
+        ]
+    )
+    supervisor.run()
+    """
+
+    def __init__(
+        self,
+        specs: List[PipelineSpec],
+        max_restarts: int | None = 5,
+        restart_backoff_sec: float = 1.0,
+        max_backoff_sec: float = 60.0,
+        summary_interval_sec: float = 60.0,
+        report_interval_sec: float = 5.0,
+        start_method: str = "spawn",
+    ):
+        """
+
+        Args:
+            specs: The pipelines to run, one per input source.
+            max_restarts: Maximum number of times a worker is restarted. `None` restarts it forever.
+            restart_backoff_sec: Number of seconds to wait before the first restart of a worker.
+            max_backoff_sec: Maximum number of seconds to wait before restarting a worker.
+            summary_interval_sec: How often the aggregated metrics are logged.
+            report_interval_sec: How often the detection processes send their metrics to the supervisor.
+            start_method: The `multiprocessing` start method of the workers.
+        """
+        names = [spec.name for spec in specs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"The names of the sources need to be unique: {names}.")
+        self.specs = specs
+        self.max_restarts = max_restarts
+        self.restart_backoff_sec = restart_backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+        self.summary_interval_sec = summary_interval_sec
+        self.report_interval_sec = report_interval_sec
+
+        self._context = multiprocessing.get_context(start_method)
+        self._stop_event = self._context.Event()
+        self._log_queue = self._context.Queue()
+        self._rings: dict[str, SharedMemoryFrameRing] = {}
+        self._workers: List[_Worker] = []
+        self._metrics: dict[str, dict] = {spec.name: {} for spec in specs}
+
+    def _start_worker(self, worker: _Worker) -> None:
+        shm_name = self._rings[worker.spec.name].name
+        if worker.role == CAPTURE:
+            target, args = _capture_worker, (worker.spec, shm_name, self._stop_event, self._log_queue)
+        else:
+            target = _pipeline_worker
+            args = (worker.spec, shm_name, self._stop_event, self._log_queue, self.report_interval_sec)
+        worker.process = self._context.Process(target=target, args=args, name=worker.name, daemon=True)
+        worker.process.start()
+        worker.restart_at = None
+        logger.info(f"Started the {worker.role} process of '{worker.spec.name}'.", pid=worker.process.pid)
+
+    def start(self) -> None:
+        """Creates the shared memory rings and starts the worker processes."""
+        self._stop_event.clear()
+        for spec in self.specs:
+            self._rings[spec.name] = SharedMemoryFrameRing.create(spec.frame_shape, n_slots=spec.n_slots)
+            for role in (PIPELINE, CAPTURE):
+                worker = _Worker(role, spec)
+                self._workers.append(worker)
+                self._start_worker(worker)
+
+    def _monitor_workers(self) -> None:
+        now = time.monotonic()
+        for worker in self._workers:
+            if worker.finished:
+                continue
+            if worker.restart_at is not None:
+                if now >= worker.restart_at and not self._stop_event.is_set():
+                    self._start_worker(worker)
+                continue
+            if worker.process.is_alive():
+                continue
+
+            exit_code = worker.process.exitcode
+            if exit_code == 0 or self._stop_event.is_set():
+                worker.finished = True
+                logger.info(f"The {worker.role} process of '{worker.spec.name}' exited.", exit_code=exit_code)
+            elif self.max_restarts is not None and worker.restarts >= self.max_restarts:
+                worker.finished = True
+                logger.error(
+                    f"The {worker.role} process of '{worker.spec.name}' failed {worker.restarts + 1} times, "
+                    f"not restarting it.",
+                    exit_code=exit_code,
+                )
+            else:
+                backoff = min(self.restart_backoff_sec * 2**worker.restarts, self.max_backoff_sec)
+                worker.restarts += 1
+                worker.restart_at = now + backoff
+                logger.warning(
+                    f"The {worker.role} process of '{worker.spec.name}' failed, restarting it in {backoff} seconds.",
+                    exit_code=exit_code,
+                    restarts=worker.restarts,
+                )
+
+    def _drain_queue(self, timeout_sec: float = 0.0) -> None:
+        """Re-emits the logs of the workers and stores their metrics."""
+        deadline = time.monotonic() + timeout_sec
+        while True:
+            try:
+                kind, payload = self._log_queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+            except queue.Empty:
+                return
+            if kind == "metrics":
+                source, metrics = payload
+                self._metrics[source] = metrics
+            else:
+                level = payload.pop("level", "info")
+                event = payload.pop("event", "")
+                getattr(logger, level, logger.info)(event, **payload)
+
+    def metrics(self) -> dict:
+        """Returns the last metrics of every source, their totals, and the number of restarts of the workers."""
+        total = {"processed_frames": 0, "motion_frames": 0, "dropped_frames": 0, "fps": 0.0}
+        for metrics in self._metrics.values():
+            for key in total:
+                total[key] += metrics.get(key, 0)
+        return {
+            "sources": {name: dict(metrics) for name, metrics in self._metrics.items()},
+            "total": total,
+            "restarts": {worker.name: worker.restarts for worker in self._workers},
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return any(not worker.finished for worker in self._workers)
+
+    def run(self, poll_interval_sec: float = 0.1) -> None:
+        """Starts the workers, and supervises them until they all finish or the supervisor is interrupted."""
+        self.start()
+        last_summary_time = time.monotonic()
+        try:
+            while self.is_running:
+                self._drain_queue(timeout_sec=poll_interval_sec)
+                self._monitor_workers()
+                if time.monotonic() - last_summary_time >= self.summary_interval_sec:
+                    last_summary_time = time.monotonic()
+                    logger.info("Motion detection metrics of all sources.", **self.metrics())
+        except KeyboardInterrupt:
+            logger.info("Exiting the Multi Source Supervisor")
+        finally:
+            self.stop()
+
+    def stop(self, timeout_sec: float = 10.0) -> None:
+        """Stops the workers, waiting up to `timeout_sec` seconds for each of them, and releases the rings."""
+        self._stop_event.set()
+        # The queue is drained while waiting, a worker does not exit until its queued logs have been received.
+        deadline = time.monotonic() + timeout_sec
+        processes = [worker.process for worker in self._workers if worker.process is not None]
+        while any(process.is_alive() for process in processes) and time.monotonic() < deadline:
+            self._drain_queue(timeout_sec=0.05)
+        for worker in self._workers:
+            if worker.process is not None and worker.process.is_alive():
+                logger.warning(f"The {worker.role} process of '{worker.spec.name}' did not exit, terminating it.")
+                worker.process.terminate()
+                worker.process.join()
+            worker.finished = True
+        self._drain_queue()
+        for ring in self._rings.values():
+            ring.close()
+            ring.unlink()
+        self._rings = {}
+        logger.info("Motion detection metrics of all sources.", **self.metrics())
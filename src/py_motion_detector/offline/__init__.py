@@ -0,0 +1 @@
+"""Analysis of recorded videos, outside of the real-time `MotionDetectionApplication`."""
@@ -0,0 +1,246 @@
+import concurrent.futures
+import dataclasses
+import json
+import multiprocessing
+import os
+from pathlib import Path
+from typing import Callable, Iterable, List, Tuple
+
+import numpy as np
+import structlog
+
+from py_motion_detector.input_sources.video_file import VideoFileFrameProvider
+from py_motion_detector.models.bounding_box import BoundingBoxArray
+from py_motion_detector.models.motion_detection.base import MotionDetectionModelABC
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+from py_motion_detector.storage.bounding_box_log import BoundingBoxLogWriter
+
+logger = structlog.get_logger()
+
+FrameDetections = List[Tuple[int, np.ndarray]]
+"""The `(frame_index, (N, 4) top/left/bottom/right array)` of every frame of a chunk where motion was detected."""
+
+
+@dataclasses.dataclass(frozen=True)
+class VideoChunk:
+    """
+    The frames `[start_frame, end_frame)` of a video, analysed after `warmup_frames` frames of warm-up. Only one frame
+    out of `stride` is decoded and analysed.
+    """
+
+    start_frame: int
+    end_frame: int | None
+    warmup_frames: int
+    stride: int = 1
+
+
+@dataclasses.dataclass
+class MotionEvent:
+    """Consecutive frames with motion, allowing for short gaps, in a recorded video."""
+
+    start_frame: int
+    end_frame: int
+    """Index of the last frame with motion of the event."""
+    start_sec: float
+    end_sec: float
+    n_frames: int
+    """Number of frames of the event where motion was detected."""
+    max_bounding_boxes: int
+    bounding_box: tuple[int, int, int, int]
+    """The `(top, left, bottom, right)` box enclosing all the bounding boxes of the event."""
+
+    def to_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+
+def analyze_chunk(
+    path_to_video_file: Path,
+    chunk: VideoChunk,
+    model_factory: Callable[[], MotionDetectionModelABC] = MotionDetectionWeightedAverage,
+    resize_frame: int | None = None,
+) -> FrameDetections:
+    """
+    Runs a new motion detection model on a chunk of a video. The video is seeked `chunk.warmup_frames` frames before
+    the chunk, so that the background of the model has converged when the chunk starts; motion detected during the
+    warm-up is not reported.
+    """
+    model = model_factory()
+    start = max(chunk.start_frame - chunk.warmup_frames, 0)
+    frame_provider = VideoFileFrameProvider(
+        path_to_video_file,
+        resize_frame=resize_frame,
+        start_frame=start,
+        end_frame=chunk.end_frame,
+        stride=chunk.stride,
+    )
+    detections = []
+    with frame_provider as vfp:
+        for frame in vfp.frames():
+            frame_index = vfp.frame_index - 1
+            bounding_boxes = model.next_frame(frame)
+            if frame_index >= chunk.start_frame and len(bounding_boxes) > 0:
+                if not isinstance(bounding_boxes, BoundingBoxArray):
+                    bounding_boxes = BoundingBoxArray.from_bounding_boxes(bounding_boxes)
+                detections.append((frame_index, bounding_boxes.data))
+    return detections
+
+
+def _configure_worker() -> None:
+    """Only errors are logged by the workers, the progress is logged by the `OfflineVideoAnalyzer`."""
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+
+
+def split_into_chunks(frame_count: int, chunk_frames: int, warmup_frames: int, stride: int = 1) -> List[VideoChunk]:
+    """
+    Splits the frames of a video into chunks. The last chunk reads the video until its end. The chunks and warm-ups
+    are rounded up to a multiple of `stride`, so that the same frames are analysed as when the video is read at once.
+    """
+    chunk_frames = -(-chunk_frames // stride) * stride
+    warmup_frames = -(-warmup_frames // stride) * stride
+    starts = list(range(0, max(frame_count, 1), chunk_frames))
+    ends = starts[1:] + [None]
+    return [
+        VideoChunk(start, end, warmup_frames if start > 0 else 0, stride)
+        for start, end in zip(starts, ends, strict=True)
+    ]
+
+
+def merge_events(detections: Iterable[Tuple[int, np.ndarray]], fps: float, max_gap_frames: int) -> List[MotionEvent]:
+    """Groups the frames with motion, in frame order, into events separated by more than `max_gap_frames` frames."""
+    events = []
+    current = None
+    for frame_index, boxes in detections:
+        enclosing = (*boxes[:, :2].min(axis=0).tolist(), *boxes[:, 2:].max(axis=0).tolist())
+        if current is not None and frame_index - current.end_frame <= max_gap_frames + 1:
+            current.end_frame = frame_index
+            current.end_sec = frame_index / fps
+            current.n_frames += 1
+            current.max_bounding_boxes = max(current.max_bounding_boxes, len(boxes))
+            current.bounding_box = (
+                min(current.bounding_box[0], enclosing[0]),
+                min(current.bounding_box[1], enclosing[1]),
+                max(current.bounding_box[2], enclosing[2]),
+                max(current.bounding_box[3], enclosing[3]),
+            )
+            continue
+        current = MotionEvent(
+            start_frame=frame_index,
+            end_frame=frame_index,
+            start_sec=frame_index / fps,
+            end_sec=frame_index / fps,
+            n_frames=1,
+            max_bounding_boxes=len(boxes),
+            bounding_box=enclosing,
+        )
+        events.append(current)
+    return events
+
+
+class OfflineVideoAnalyzer:
+    """
+    Detects motion in a recorded video with a pool of processes. The video is split into chunks of `chunk_sec`
+    seconds which are analysed in parallel, every worker seeking `warmup_sec` seconds before its chunk so that the
+    running-average background converges before the chunk starts. The detections of all chunks are merged, in order,
+    into a list of motion events and optionally into a binary bounding box log.
+
+    Example usage:
+
+    analyzer = OfflineVideoAnalyzer(Path("recording.mp4"), workers=8)
+    for event in analyzer.run():
+        print(event.start_sec, event.end_sec)
+    """
+
+    def __init__(
+        self,
+        path_to_video_file: Path,
+        model_factory: Callable[[], MotionDetectionModelABC] = MotionDetectionWeightedAverage,
+        workers: int | None = None,
+        chunk_sec: float = 300.0,
+        warmup_sec: float = 5.0,
+        max_gap_sec: float = 2.0,
+        resize_frame: int | None = None,
+        stride: int = 1,
+        target_fps: float | None = None,
+    ):
+        """
+
+        Args:
+            path_to_video_file: The video to analyse.
+            model_factory: Creates the motion detection model of every chunk. Needs to be picklable, e.g. a class or
+                a `functools.partial` object.
+            workers: Number of processes. Defaults to the number of CPUs.
+            chunk_sec: Duration of the chunks of the video analysed by every task.
+            warmup_sec: Duration of the video processed before every chunk to initialize the background.
+            max_gap_sec: Frames with motion less than `max_gap_sec` seconds apart belong to the same event.
+            resize_frame: Resize the frames to a square of this size.
+            stride: Analyse one frame out of `stride`, the other frames are not decoded.
+            target_fps: If set, the stride is computed from the frame rate of the video to analyse about `target_fps`
+                frames per second of video. Overrides `stride`.
+        """
+        self.path_to_video_file = path_to_video_file
+        self.model_factory = model_factory
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.chunk_sec = chunk_sec
+        self.warmup_sec = warmup_sec
+        self.max_gap_sec = max_gap_sec
+        self.resize_frame = resize_frame
+        self.stride = stride
+        self.target_fps = target_fps
+
+        self.fps: float | None = None
+        self.detections: FrameDetections = []
+
+    def run(self, bounding_box_log_path: Path | None = None) -> List[MotionEvent]:
+        """
+        Analyses the video.
+
+        Args:
+            bounding_box_log_path: If set, the bounding boxes of every frame with motion are written to a binary log,
+                with the position of the frame in the video (in milliseconds) as timestamp and its index as frame
+                reference.
+
+        Returns:
+            The motion events of the video, in order.
+        """
+        with VideoFileFrameProvider(self.path_to_video_file) as vfp:
+            self.fps = vfp.fps or 25.0
+            frame_count = vfp.frame_count
+        if self.target_fps is not None:
+            self.stride = max(round(self.fps / self.target_fps), 1)
+        chunks = split_into_chunks(
+            frame_count, max(round(self.chunk_sec * self.fps), 1), round(self.warmup_sec * self.fps), self.stride
+        )
+        logger.info(
+            f"Analysing '{self.path_to_video_file}' ({frame_count} frames at {self.fps} fps, one frame out of "
+            f"{self.stride}) in {len(chunks)} chunks with {self.workers} workers."
+        )
+
+        with concurrent.futures.ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_configure_worker
+        ) as executor:
+            futures = [
+                executor.submit(analyze_chunk, self.path_to_video_file, chunk, self.model_factory, self.resize_frame)
+                for chunk in chunks
+            ]
+            self.detections = []
+            for chunk, future in zip(chunks, futures, strict=True):
+                self.detections.extend(future.result())
+                logger.debug(f"Analysed the frames {chunk.start_frame} to {chunk.end_frame}.")
+
+        if bounding_box_log_path is not None:
+            with BoundingBoxLogWriter(bounding_box_log_path) as writer:
+                for frame_index, boxes in self.detections:
+                    writer.append(round(1000 * frame_index / self.fps), frame_index, BoundingBoxArray(boxes))
+
+        # consecutive analysed frames are `stride` frames apart, they always belong to the same event
+        max_gap_frames = max(round(self.max_gap_sec * self.fps), self.stride - 1)
+        events = merge_events(self.detections, self.fps, max_gap_frames)
+        logger.info(f"Found {len(events)} motion events in {len(self.detections)} frames.")
+        return events
+
+
+def write_events(events: List[MotionEvent], path: Path) -> None:
+    """Writes the events to a JSON lines file, one event per line."""
+    with open(path, "w") as f:
+        for event in events:
+            f.write(json.dumps(event.to_dict()) + "\n")
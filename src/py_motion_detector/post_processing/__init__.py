@@ -0,0 +1 @@
+"""Stages processing the bounding boxes of the motion detection model before they are passed to the callbacks."""
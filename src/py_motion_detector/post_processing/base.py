@@ -0,0 +1,27 @@
+import abc
+
+import numpy as np
+
+from py_motion_detector.models.bounding_box import BoundingBoxes
+
+
+class BoundingBoxPostProcessorABC(abc.ABC):
+    """
+    The base class of the stages run by the `MotionDetectionApplication` on the bounding boxes returned by the motion
+    detection model, in order, before they are passed to the callbacks.
+    """
+
+    @abc.abstractmethod
+    def process(self, frame: np.array, bounding_boxes: BoundingBoxes) -> BoundingBoxes:
+        """
+        Args:
+            frame: The current input image.
+            bounding_boxes: The bounding boxes returned by the motion detection model or by the previous stage.
+
+        Returns:
+            The bounding boxes passed to the next stage, or to the callbacks after the last stage.
+        """
+
+    @classmethod
+    def name(cls) -> str:
+        return cls.__name__
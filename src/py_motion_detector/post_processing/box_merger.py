@@ -0,0 +1,124 @@
+import numpy as np
+import structlog
+
+from py_motion_detector.models.bounding_box import BoundingBoxArray, BoundingBoxes
+from py_motion_detector.post_processing.base import BoundingBoxPostProcessorABC
+
+logger = structlog.get_logger()
+
+MERGE_MODES = ("merge", "suppress")
+
+
+def box_gaps(bounding_boxes: BoundingBoxArray) -> np.ndarray:
+    """
+    Computes the distance, in pixels, between every pair of boxes: the largest of their vertical and horizontal gaps,
+    0 for boxes that touch or overlap.
+
+    Returns:
+        An `(N, N)` int64 array where `N = len(bounding_boxes)`.
+    """
+    data = bounding_boxes.data.astype(np.int64)
+    a, b = data[:, None, :], data[None, :, :]
+    vertical = np.maximum(a[..., 0], b[..., 0]) - np.minimum(a[..., 2], b[..., 2])
+    horizontal = np.maximum(a[..., 1], b[..., 1]) - np.minimum(a[..., 3], b[..., 3])
+    return np.clip(np.maximum(vertical, horizontal), 0, None)
+
+
+def connected_groups(adjacency: np.ndarray) -> np.ndarray:
+    """
+    Labels the connected components of the graph of the boxes, by propagating the smallest index of every component
+    along the edges and following the labels of the labels, which converges in a few iterations on the graphs of the
+    boxes of a frame.
+
+    Args:
+        adjacency: An `(N, N)` symmetric boolean array, `True` where two boxes belong to the same group.
+
+    Returns:
+        An `(N,)` int array with the group of every box, numbered from 0 in the order of their first box.
+    """
+    n = len(adjacency)
+    labels = np.arange(n)
+    while True:
+        neighbours = np.where(adjacency, labels[None, :], n).min(axis=1)
+        updated = np.minimum(labels, neighbours)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+    return np.unique(labels, return_inverse=True)[1].reshape(-1)
+
+
+class BoundingBoxMerger(BoundingBoxPostProcessorABC):
+    """
+    Groups the bounding boxes that overlap by more than `iou_threshold`, or that are at most `max_gap` pixels apart, and
+    replaces every group by its enclosing box (`mode="merge"`) or by its largest box (`mode="suppress"`). A moving
+    person often comes out of the motion detection model as several boxes (head, torso, legs) that flicker from one
+    frame to the next: the callbacks get a single, stable box instead.
+
+    Boxes are grouped transitively: A and C are merged if both are close to B. Merged boxes can overlap boxes that none
+    of their parts overlapped, so the grouping is repeated on the merged boxes until their number stops decreasing.
+
+    Example usage:
+
+    app = MotionDetectionApplication(
+        frame_provider=CameraFrameProvider(),
+        post_processors=[BoundingBoxMerger(iou_threshold=0.1, max_gap=20)],
+        callbacks=[ObjectPlotterCallback()],
+    )
+    """
+
+    def __init__(self, iou_threshold: float | None = 0.0, max_gap: int | None = None, mode: str = "merge"):
+        """
+
+        Args:
+            iou_threshold: Boxes whose intersection over union is above this value are grouped. The default groups all
+                the boxes that overlap. `None` only groups boxes by distance.
+            max_gap: Boxes at most this number of pixels apart, horizontally and vertically, are grouped. 0 groups the
+                boxes that touch or overlap. `None` only groups boxes by intersection over union.
+            mode: `"merge"` replaces every group by the smallest box containing all of its boxes, `"suppress"` keeps
+                the largest box of every group and drops the others.
+        """
+        if iou_threshold is None and max_gap is None:
+            raise ValueError("At least one of the IoU threshold and the maximum gap needs to be set.")
+        if mode not in MERGE_MODES:
+            raise ValueError(f"The merge mode needs to be one of {MERGE_MODES}, not '{mode}'.")
+        self.iou_threshold = iou_threshold
+        self.max_gap = max_gap
+        self.mode = mode
+        logger.info(
+            f"Post processor '{self.name()}' has been initialized with iou_threshold={iou_threshold}, "
+            f"max_gap={max_gap} and mode='{mode}'."
+        )
+
+    def _adjacency(self, bounding_boxes: BoundingBoxArray) -> np.ndarray:
+        adjacency = np.zeros((len(bounding_boxes), len(bounding_boxes)), dtype=bool)
+        if self.iou_threshold is not None:
+            adjacency |= bounding_boxes.iou(bounding_boxes) > self.iou_threshold
+        if self.max_gap is not None:
+            adjacency |= box_gaps(bounding_boxes) <= self.max_gap
+        return adjacency
+
+    def _merge_groups(self, bounding_boxes: BoundingBoxArray, groups: np.ndarray) -> BoundingBoxArray:
+        n_groups = groups.max() + 1
+        if self.mode == "suppress":
+            # sort by decreasing area, the first box of every group in that order is its largest
+            order = np.argsort(-bounding_boxes.area.astype(np.int64), kind="stable")
+            _, first = np.unique(groups[order], return_index=True)
+            return bounding_boxes[np.sort(order[first])]
+        data = np.empty((n_groups, 4), dtype=np.int32)
+        data[:, :2] = np.iinfo(np.int32).max
+        data[:, 2:] = np.iinfo(np.int32).min
+        np.minimum.at(data[:, 0], groups, bounding_boxes.top)
+        np.minimum.at(data[:, 1], groups, bounding_boxes.left)
+        np.maximum.at(data[:, 2], groups, bounding_boxes.bottom)
+        np.maximum.at(data[:, 3], groups, bounding_boxes.right)
+        return BoundingBoxArray(data)
+
+    def process(self, frame: np.array, bounding_boxes: BoundingBoxes) -> BoundingBoxArray:
+        bounding_boxes = BoundingBoxArray.from_bounding_boxes(bounding_boxes)
+        while len(bounding_boxes) > 1:
+            groups = connected_groups(self._adjacency(bounding_boxes))
+            if groups.max() + 1 == len(bounding_boxes):
+                break
+            bounding_boxes = self._merge_groups(bounding_boxes, groups)
+        return bounding_boxes
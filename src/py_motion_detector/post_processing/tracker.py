@@ -0,0 +1,109 @@
+import numpy as np
+import structlog
+
+from py_motion_detector.models.bounding_box import BoundingBoxArray, BoundingBoxes, TrackedBoundingBoxArray
+from py_motion_detector.post_processing.base import BoundingBoxPostProcessorABC
+
+logger = structlog.get_logger()
+
+
+def greedy_matches(costs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Matches the rows and the columns of `costs` by increasing cost, every row and every column at most once. Pairs
+    with an infinite cost are never matched.
+
+    Returns:
+        The indices of the matched rows and of their columns.
+    """
+    rows, cols = np.nonzero(np.isfinite(costs))
+    order = np.argsort(costs[rows, cols], kind="stable")
+    used_rows, used_cols, matched_rows, matched_cols = set(), set(), [], []
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        matched_rows.append(row)
+        matched_cols.append(col)
+    return np.array(matched_rows, dtype=np.intp), np.array(matched_cols, dtype=np.intp)
+
+
+class BoundingBoxTracker(BoundingBoxPostProcessorABC):
+    """
+    Assigns persistent ids to the bounding boxes across frames and returns them as a `TrackedBoundingBoxArray`.
+
+    Every box of the current frame is matched with at most one track, the box of a track being its box in the last
+    frame it was matched. A box and a track can be matched if their intersection over union is above `iou_threshold`
+    or if their centers are at most `max_distance` pixels apart, which keeps the track of small or fast objects whose
+    boxes do not overlap from one frame to the next. Pairs are matched by decreasing IoU then increasing distance, and
+    unmatched boxes start new tracks. A track that has not been matched for more than `max_missed_frames` frames ends.
+
+    Callbacks can use the ids, e.g. `TrackChangeFilterCallback` only stores the frames where a track starts, ends or
+    moves.
+
+    Example usage:
+
+    tracker = BoundingBoxTracker(iou_threshold=0.2, max_distance=50)
+    for frame in frames:
+        bounding_boxes = tracker.process(frame, model.next_frame(frame))
+        print(bounding_boxes.track_ids)
+    """
+
+    def __init__(self, iou_threshold: float = 0.2, max_distance: float = 50.0, max_missed_frames: int = 5):
+        """
+
+        Args:
+            iou_threshold: Minimum intersection over union of a box with the last box of a track to continue it.
+            max_distance: Maximum distance, in pixels, between the center of a box and the center of the last box of
+                a track to continue it, whatever their IoU.
+            max_missed_frames: Number of consecutive frames a track is kept without a matching box, so that an object
+                briefly missed by the motion detection model keeps its id.
+        """
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_missed_frames = max_missed_frames
+        self._boxes = BoundingBoxArray()
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._missed = np.zeros(0, dtype=np.int64)
+        self._next_id = 0
+        logger.info(
+            f"Post processor '{self.name()}' has been initialized with iou_threshold={iou_threshold}, "
+            f"max_distance={max_distance} and max_missed_frames={max_missed_frames}."
+        )
+
+    @property
+    def active_track_ids(self) -> np.ndarray:
+        """The ids of the tracks that have not ended, including the ones missed in the last frames."""
+        return self._ids.copy()
+
+    def _costs(self, bounding_boxes: BoundingBoxArray) -> np.ndarray:
+        """
+        Returns an `(N tracks, M boxes)` array ordering the pairs by decreasing IoU then increasing distance, `inf`
+        for the pairs that cannot be matched.
+        """
+        iou = self._boxes.iou(bounding_boxes)
+        distance = np.linalg.norm(self._boxes.centers[:, None, :] - bounding_boxes.centers[None, :, :], axis=2)
+        allowed = (iou > self.iou_threshold) | (distance <= self.max_distance)
+        # the IoU is at most 1: pairs that overlap always come before the ones only matched by distance
+        costs = np.where(iou > 0, -iou, distance + 1)
+        return np.where(allowed, costs, np.inf)
+
+    def process(self, frame: np.array, bounding_boxes: BoundingBoxes) -> TrackedBoundingBoxArray:
+        bounding_boxes = BoundingBoxArray.from_bounding_boxes(bounding_boxes)
+        track_ids = np.full(len(bounding_boxes), -1, dtype=np.int64)
+        rows, cols = greedy_matches(self._costs(bounding_boxes))
+        track_ids[cols] = self._ids[rows]
+
+        new = track_ids < 0
+        track_ids[new] = np.arange(self._next_id, self._next_id + new.sum())
+        self._next_id += int(new.sum())
+
+        # the unmatched tracks are kept with their last box until they have been missed too many times
+        unmatched = np.ones(len(self._ids), dtype=bool)
+        unmatched[rows] = False
+        missed = self._missed[unmatched] + 1
+        kept = missed <= self.max_missed_frames
+        self._boxes = BoundingBoxArray(np.concatenate([bounding_boxes.data, self._boxes.data[unmatched][kept]]))
+        self._ids = np.concatenate([track_ids, self._ids[unmatched][kept]])
+        self._missed = np.concatenate([np.zeros(len(bounding_boxes), dtype=np.int64), missed[kept]])
+        return TrackedBoundingBoxArray(bounding_boxes.data, track_ids)
@@ -0,0 +1 @@
+"""Schedulers deciding when the `MotionDetectionApplication` processes frames."""
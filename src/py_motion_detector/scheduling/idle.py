@@ -0,0 +1,95 @@
+import time
+from typing import Callable
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+class AdaptiveIdleScheduler:
+    """
+    Lowers the rate at which frames are processed when no motion has been detected for a while, and goes back to the
+    full rate as soon as motion is detected. Frames that are not processed are skipped by the
+    `MotionDetectionApplication`, so neither the motion detection model nor the callbacks run for them.
+
+    Example usage:
+
+    scheduler = AdaptiveIdleScheduler(quiet_period_sec=60, idle_fps=1)
+    for frame in frames:
+        if not scheduler.should_process():
+            continue
+        bounding_boxes = model.next_frame(frame)
+        scheduler.update(motion_detected=len(bounding_boxes) > 0)
+    """
+
+    def __init__(
+        self,
+        quiet_period_sec: float = 30.0,
+        idle_fps: float = 1.0,
+        active_fps: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+
+        Args:
+            quiet_period_sec: Number of seconds without motion after which the processing rate is lowered.
+            idle_fps: Maximum number of frames per second processed while idle.
+            active_fps: Maximum number of frames per second processed while active. `None` processes every frame.
+            clock: Function returning the current time in seconds, used by the tests.
+        """
+        self.quiet_period_sec = quiet_period_sec
+        self.idle_fps = idle_fps
+        self.active_fps = active_fps
+        self._clock = clock
+
+        self.is_idle = False
+        self.transitions = 0
+        self.processed_frames = 0
+        self.skipped_frames = 0
+        self._last_motion_time = clock()
+        self._last_processed_time: float | None = None
+
+    @property
+    def current_fps(self) -> float | None:
+        """The maximum processing rate currently in use, `None` meaning every frame is processed."""
+        return self.idle_fps if self.is_idle else self.active_fps
+
+    def should_process(self) -> bool:
+        """Returns whether the current frame should be processed, given the current processing rate."""
+        now = self._clock()
+        fps = self.current_fps
+        if fps is not None and self._last_processed_time is not None and now - self._last_processed_time < 1 / fps:
+            self.skipped_frames += 1
+            return False
+        self._last_processed_time = now
+        self.processed_frames += 1
+        return True
+
+    def update(self, motion_detected: bool) -> None:
+        """Updates the state of the scheduler with the result of the motion detection on the last processed frame."""
+        now = self._clock()
+        if motion_detected:
+            self._last_motion_time = now
+            if self.is_idle:
+                self._transition(idle=False)
+        elif not self.is_idle and now - self._last_motion_time >= self.quiet_period_sec:
+            self._transition(idle=True)
+
+    def _transition(self, idle: bool):
+        self.is_idle = idle
+        self.transitions += 1
+        if idle:
+            msg = f"No motion for {self.quiet_period_sec} seconds, processing at most {self.idle_fps} fps."
+        else:
+            rate = "every frame" if self.active_fps is None else f"at most {self.active_fps} fps"
+            msg = f"Motion detected, processing {rate}."
+        logger.info(msg, idle=idle, current_fps=self.current_fps, transitions=self.transitions)
+
+    def metrics(self) -> dict:
+        return {
+            "idle": self.is_idle,
+            "current_fps": self.current_fps,
+            "transitions": self.transitions,
+            "processed_frames": self.processed_frames,
+            "skipped_frames": self.skipped_frames,
+        }
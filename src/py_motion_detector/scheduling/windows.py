@@ -0,0 +1,126 @@
+import dataclasses
+import datetime
+from typing import Callable, List, Tuple
+
+_DAY = datetime.timedelta(days=1)
+
+
+@dataclasses.dataclass(frozen=True)
+class TimeWindow:
+    """
+    A daily window of time, starting at `start` (local time) and lasting `duration`. Windows ending after midnight,
+    e.g. from 22:00 for 8 hours, continue on the next day.
+    """
+
+    start: datetime.time
+    duration: datetime.timedelta
+
+    @classmethod
+    def from_time_and_duration(cls, from_time: datetime.time, duration: datetime.time) -> "TimeWindow":
+        """Creates a window from the `from_time` and `duration` arguments of the `MotionDetectionApplication`."""
+        return cls(
+            from_time,
+            datetime.timedelta(hours=duration.hour, minutes=duration.minute, seconds=duration.second),
+        )
+
+    @classmethod
+    def from_string(cls, window: str) -> "TimeWindow":
+        """
+        Creates a window from a string in the `HH:MM-HH:MM` or `HH:MM:SS-HH:MM:SS` format. The window crosses midnight
+        if it ends before it starts, e.g. `22:00-06:00`.
+
+        Raises:
+            ValueError: If the `window` format is incorrect.
+        """
+        try:
+            start, end = (datetime.time.fromisoformat(t.strip()) for t in window.split("-"))
+        except ValueError as e:
+            raise ValueError(f"Please use the HH:MM-HH:MM format for time windows instead of '{window}'.") from e
+        day = datetime.date.min
+        duration = datetime.datetime.combine(day, end) - datetime.datetime.combine(day, start)
+        return cls(start, duration if duration > datetime.timedelta(0) else duration + _DAY)
+
+    def interval(self, day: datetime.date) -> Tuple[datetime.datetime, datetime.datetime]:
+        """Returns the `[start, end)` datetimes of the window starting on `day`."""
+        start = datetime.datetime.combine(day, self.start)
+        return start, start + self.duration
+
+
+class ActiveWindowSchedule:
+    """
+    Tells whether the current time is within one of several daily `TimeWindow`s, and when that changes next.
+
+    The next boundary (the end of the current window, or the start of the next one) is computed once, so that checking
+    the schedule for every frame only reads the clock. Overlapping and adjacent windows are merged, and a window of 24
+    hours or more is always active.
+
+    Example usage:
+
+    schedule = ActiveWindowSchedule([TimeWindow.from_string("06:00-09:00"), TimeWindow.from_string("22:00-02:00")])
+    if not schedule.is_active():
+        time.sleep(schedule.seconds_until_boundary())
+    """
+
+    def __init__(self, windows: List[TimeWindow], clock: Callable[[], datetime.datetime] = datetime.datetime.now):
+        """
+
+        Args:
+            windows: The daily windows during which the schedule is active.
+            clock: Function returning the current local time, used by the tests.
+        """
+        self.windows = windows
+        self._clock = clock
+        self.always_active = any(w.duration >= _DAY for w in windows)
+        self._active = False
+        self._boundary: datetime.datetime | None = None
+        self._updated_at: datetime.datetime | None = None
+
+    def _merged_intervals(self, now: datetime.datetime) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+        """The intervals of the windows starting from the day before `now` until the day after, merged."""
+        intervals = sorted(
+            window.interval(now.date() + datetime.timedelta(days=offset))
+            for window in self.windows
+            for offset in (-1, 0, 1)
+            if window.duration > datetime.timedelta(0)
+        )
+        merged = []
+        for start, end in intervals:
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def _update(self, now: datetime.datetime) -> None:
+        self._active, self._boundary, self._updated_at = False, None, now
+        for start, end in self._merged_intervals(now):
+            if start <= now < end:
+                self._active, self._boundary = True, end
+                return
+            if now < start:
+                self._boundary = start
+                return
+
+    def is_active(self, now: datetime.datetime | None = None) -> bool:
+        """Returns whether `now` (defaults to the current time) is within one of the windows."""
+        if self.always_active:
+            return True
+        now = now if now is not None else self._clock()
+        if self._boundary is None or not self._updated_at <= now < self._boundary:
+            # the boundary is reached, or the clock was set back
+            self._update(now)
+        return self._active
+
+    def next_boundary(self, now: datetime.datetime | None = None) -> datetime.datetime | None:
+        """
+        Returns the end of the current window if `now` is within one, otherwise the start of the next window. `None`
+        if the schedule never changes, i.e. it is always active or has no windows.
+        """
+        self.is_active(now)
+        return None if self.always_active else self._boundary
+
+    def seconds_until_boundary(self, now: datetime.datetime | None = None) -> float | None:
+        """Returns the number of seconds until `next_boundary`, `None` if the schedule never changes."""
+        now = now if now is not None else self._clock()
+        boundary = self.next_boundary(now)
+        return None if boundary is None else max((boundary - now).total_seconds(), 0.0)
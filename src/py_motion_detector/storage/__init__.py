@@ -0,0 +1 @@
+"""Storage formats used to log motion detection data to disk."""
@@ -0,0 +1,243 @@
+"""
+An append-only binary log of bounding boxes.
+
+The log is made of two files:
+
+* The data file (`*.bbl`) holds one fixed-width record per bounding box: the timestamp of the frame in milliseconds,
+  a reference to the frame (e.g. the name of its image file or its index in a video clip) and the `top`, `left`,
+  `bottom` and `right` coordinates of the box as int32.
+* The index file (`*.bbl.idx`) holds one fixed-width record per frame: its timestamp, its frame reference, the
+  position of its first bounding box in the data file and its number of bounding boxes.
+
+Both files start with an 8 byte magic header and are memory-mapped by the reader, so loading a log is a single `mmap`
+no matter how many frames it holds. Frames are expected to be appended in timestamp order, which allows the reader to
+seek by timestamp with a binary search.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from py_motion_detector.models.bounding_box import BoundingBoxArray, BoundingBoxes
+
+BOUNDING_BOX_LOG_FILE_NAME = "bounding_boxes.bbl"
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("timestamp", "<i8"),
+        ("frame_ref", "<i8"),
+        ("top", "<i4"),
+        ("left", "<i4"),
+        ("bottom", "<i4"),
+        ("right", "<i4"),
+    ]
+)
+INDEX_DTYPE = np.dtype([("timestamp", "<i8"), ("frame_ref", "<i8"), ("first_record", "<i8"), ("n_records", "<i8")])
+
+_DATA_MAGIC = b"PMDBBL01"
+_INDEX_MAGIC = b"PMDIDX01"
+_HEADER_SIZE = 8
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+def _open_for_append(path: Path, magic: bytes, dtype: np.dtype):
+    """
+    Opens a log file for appending. A partial record left by a writer killed in the middle of a write is truncated, so
+    that the next records are aligned.
+    """
+    f = open(path, "ab")
+    size = f.tell()
+    if size < _HEADER_SIZE:
+        f.truncate(0)
+        f.write(magic)
+        return f
+    whole_size = size - (size - _HEADER_SIZE) % dtype.itemsize
+    if whole_size != size:
+        f.truncate(whole_size)
+        f.seek(whole_size)
+    return f
+
+
+class BoundingBoxLogWriter:
+    """
+    Appends the bounding boxes of frames to a binary log.
+
+    Example usage:
+
+    with BoundingBoxLogWriter(Path("/tmp/frames/bounding_boxes.bbl")) as writer:
+        writer.append(timestamp_ms, frame_ref=timestamp_ms, bounding_boxes=bounding_boxes)
+    """
+
+    def __init__(self, path: Path):
+        """
+
+        Args:
+            path: Path to the data file. The index file is stored next to it with an additional `.idx` suffix. If the
+                files already exist new frames are appended to them.
+        """
+        self.path = path
+        self._data_file = None
+        self._index_file = None
+        self._n_records = 0
+
+    def open(self) -> "BoundingBoxLogWriter":
+        self._data_file = _open_for_append(self.path, _DATA_MAGIC, RECORD_DTYPE)
+        self._index_file = _open_for_append(_index_path(self.path), _INDEX_MAGIC, INDEX_DTYPE)
+        self._n_records = (self._data_file.tell() - _HEADER_SIZE) // RECORD_DTYPE.itemsize
+        return self
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def append(self, timestamp: int, frame_ref: int, bounding_boxes: BoundingBoxes) -> None:
+        """
+        Appends the bounding boxes of a frame to the log and flushes it, so that a crash loses at most this frame.
+
+        Args:
+            timestamp: Timestamp of the frame in milliseconds.
+            frame_ref: Integer reference to the frame, e.g. the name of its image file or its index in a video clip.
+            bounding_boxes: The bounding boxes of the frame. Frames without bounding boxes are added to the index only.
+        """
+        boxes = BoundingBoxArray.from_bounding_boxes(bounding_boxes)
+        records = np.empty(len(boxes), dtype=RECORD_DTYPE)
+        records["timestamp"] = timestamp
+        records["frame_ref"] = frame_ref
+        for i, field in enumerate(("top", "left", "bottom", "right")):
+            records[field] = boxes.data[:, i]
+
+        index = np.array([(timestamp, frame_ref, self._n_records, len(records))], dtype=INDEX_DTYPE)
+        self._data_file.write(records.tobytes())
+        self._index_file.write(index.tobytes())
+        self._n_records += len(records)
+        self.flush()
+
+    def flush(self) -> None:
+        self._data_file.flush()
+        self._index_file.flush()
+
+    def close(self) -> None:
+        if self._data_file is None:
+            return
+        self._data_file.close()
+        self._index_file.close()
+        self._data_file = None
+        self._index_file = None
+
+
+class BoundingBoxLogReader:
+    """
+    Memory-maps a binary bounding box log written by `BoundingBoxLogWriter`.
+
+    If the index file is missing or inconsistent with the data file (e.g. the writer was killed before flushing) the
+    index is rebuilt from the data file. In that case frames without bounding boxes cannot be recovered.
+
+    Example usage:
+
+    reader = BoundingBoxLogReader(Path("/tmp/frames/bounding_boxes.bbl"))
+    for timestamp, frame_ref, boxes in reader.between(start_ms, end_ms):
+        ...
+    """
+
+    def __init__(self, path: Path):
+        """
+
+        Args:
+            path: Path to the data file.
+
+        Raises:
+            ValueError: If the file is not a bounding box log.
+        """
+        self.path = path
+        self.records = self._memmap(path, _DATA_MAGIC, RECORD_DTYPE)
+        index_path = _index_path(path)
+        self.index = self._memmap(index_path, _INDEX_MAGIC, INDEX_DTYPE) if index_path.is_file() else None
+        if not self._is_index_valid():
+            self.index = self._build_index(self.records)
+        # (N, 4) int32 view of the top, left, bottom and right fields of the records, which cannot be built on the
+        # empty buffer of a log without bounding boxes (e.g. of a session without motion)
+        if len(self.records) == 0:
+            self._boxes = np.empty((0, 4), dtype="<i4")
+        else:
+            self._boxes = np.ndarray(
+                shape=(len(self.records), 4),
+                dtype="<i4",
+                buffer=self.records,
+                offset=RECORD_DTYPE.fields["top"][1],
+                strides=(RECORD_DTYPE.itemsize, 4),
+            )
+
+    @staticmethod
+    def _memmap(path: Path, magic: bytes, dtype: np.dtype) -> np.ndarray:
+        with open(path, "rb") as f:
+            if f.read(_HEADER_SIZE) != magic:
+                raise ValueError(f"'{path}' is not a bounding box log file.")
+        n = (os.path.getsize(path) - _HEADER_SIZE) // dtype.itemsize
+        if n == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", offset=_HEADER_SIZE, shape=(n,))
+
+    def _is_index_valid(self) -> bool:
+        if self.index is None:
+            return False
+        if len(self.index) == 0:
+            return len(self.records) == 0
+        last = self.index[-1]
+        return int(last["first_record"] + last["n_records"]) == len(self.records)
+
+    @staticmethod
+    def _build_index(records: np.ndarray) -> np.ndarray:
+        keys = np.stack([records["timestamp"], records["frame_ref"]], axis=1)
+        starts = np.flatnonzero(np.any(np.diff(keys, axis=0, prepend=keys[:1] - 1) != 0, axis=1))
+        index = np.empty(len(starts), dtype=INDEX_DTYPE)
+        index["timestamp"] = records["timestamp"][starts]
+        index["frame_ref"] = records["frame_ref"][starts]
+        index["first_record"] = starts
+        index["n_records"] = np.diff(starts, append=len(records))
+        return index
+
+    def __len__(self) -> int:
+        """Number of frames in the log."""
+        return len(self.index)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """The timestamps of all frames in milliseconds."""
+        return self.index["timestamp"]
+
+    def frame(self, i: int) -> Tuple[int, int, BoundingBoxArray]:
+        """
+        Returns:
+            The `(timestamp, frame_ref, bounding_boxes)` of the i-th frame in the log.
+        """
+        entry = self.index[i]
+        first, n = int(entry["first_record"]), int(entry["n_records"])
+        boxes = self._boxes[first : first + n]
+        return int(entry["timestamp"]), int(entry["frame_ref"]), BoundingBoxArray(boxes)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, BoundingBoxArray]]:
+        for i in range(len(self)):
+            yield self.frame(i)
+
+    def seek(self, timestamp: int) -> int:
+        """Returns the position of the first frame with a timestamp greater than or equal to `timestamp`."""
+        return int(np.searchsorted(self.timestamps, timestamp, side="left"))
+
+    def between(self, start: int, end: int) -> Iterator[Tuple[int, int, BoundingBoxArray]]:
+        """Yields the frames with `start <= timestamp < end`, timestamps in milliseconds."""
+        for i in range(self.seek(start), self.seek(end)):
+            yield self.frame(i)
+
+    def bounding_boxes_at(self, timestamp: int) -> BoundingBoxArray:
+        """Returns the bounding boxes of the frame with this exact timestamp, or an empty array if there is none."""
+        i = self.seek(timestamp)
+        if i < len(self) and self.timestamps[i] == timestamp:
+            return self.frame(i)[2]
+        return BoundingBoxArray()
@@ -0,0 +1,321 @@
+"""
+A SQLite catalogue of the frames stored by `FrameFileDumperCallback`.
+
+Every stored frame is a row of the `frames` table holding its timestamp in milliseconds, the id of the session that
+stored it, its number of bounding boxes, the area of its largest bounding box as a fraction of the frame area and the
+path of its image, relative to the directory of the catalogue. The table is indexed by timestamp and by session, so
+that questions such as "all the frames between 02:00 and 03:00 with a box larger than 10% of the frame" are answered
+without listing or parsing the stored files.
+
+Directories stored without a catalogue (or by an older version) can be added to it with `reindex_directory`, which
+only reads the frames that are not indexed yet.
+"""
+
+import dataclasses
+import json
+import os
+import sqlite3
+import struct
+from pathlib import Path
+from typing import List, Tuple
+
+import cv2
+import structlog
+
+from py_motion_detector.models.bounding_box import BoundingBoxArray, BoundingBoxes
+from py_motion_detector.storage.bounding_box_log import BOUNDING_BOX_LOG_FILE_NAME, BoundingBoxLogReader
+from py_motion_detector.storage.shards import iter_shards
+
+logger = structlog.get_logger()
+
+EVENT_INDEX_FILE_NAME = "events.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frames (
+    path TEXT PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    session TEXT NOT NULL,
+    n_boxes INTEGER NOT NULL,
+    max_area_ratio REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS frames_timestamp ON frames (timestamp);
+CREATE INDEX IF NOT EXISTS frames_session_timestamp ON frames (session, timestamp);
+"""
+
+# start of frame markers of the baseline, progressive and lossless JPEG encodings, all holding the image size
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+@dataclasses.dataclass(frozen=True)
+class IndexedFrame:
+    """A frame of the catalogue."""
+
+    timestamp: int
+    session: str
+    n_boxes: int
+    max_area_ratio: float
+    path: Path
+
+    def to_dict(self) -> dict:
+        return {**dataclasses.asdict(self), "path": str(self.path)}
+
+
+def max_area_ratio(bounding_boxes: BoundingBoxes, frame_height: int, frame_width: int) -> float:
+    """Returns the area of the largest bounding box divided by the area of the frame, 0 if there are no boxes."""
+    if not bounding_boxes:
+        return 0.0
+    boxes = BoundingBoxArray.from_bounding_boxes(bounding_boxes)
+    return float(boxes.area.max()) / (frame_height * frame_width)
+
+
+def read_jpeg_size(path: Path) -> Tuple[int, int]:
+    """
+    Returns the `(height, width)` of a JPEG image by reading the headers of the file up to its start of frame segment,
+    without decoding the image.
+
+    Raises:
+        ValueError: If the file is not a JPEG image or its size could not be found.
+    """
+    with open(path, "rb") as f:
+        if f.read(2) != b"\xff\xd8":
+            raise ValueError(f"'{path}' is not a JPEG image.")
+        while True:
+            marker = f.read(2)
+            # markers may be preceded by any number of 0xff fill bytes
+            while len(marker) == 2 and marker[0] == 0xFF and marker[1] == 0xFF:
+                marker = marker[1:] + f.read(1)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                raise ValueError(f"Could not find the size of the JPEG image '{path}'.")
+            header = f.read(2)
+            if len(header) < 2:
+                raise ValueError(f"Could not find the size of the JPEG image '{path}'.")
+            (length,) = struct.unpack(">H", header)
+            if marker[1] in _SOF_MARKERS:
+                segment = f.read(5)
+                if len(segment) < 5:
+                    raise ValueError(f"Could not find the size of the JPEG image '{path}'.")
+                _, height, width = struct.unpack(">BHH", segment)
+                return height, width
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+class EventIndex:
+    """
+    Reads and writes the SQLite catalogue of the stored frames. Every write is committed right away, so that no write
+    transaction is left open between two frames; the database is in write-ahead logging mode, which keeps the commits
+    cheap and lets the index be queried, or cleaned by the `RetentionManager`, while a `FrameFileDumperCallback` is
+    writing to it.
+
+    Example usage:
+
+    with EventIndex(Path("/tmp/frames/events.sqlite")) as index:
+        for frame in index.query(start=1711936800000, end=1711940400000, min_area_ratio=0.1):
+            print(frame.path)
+    """
+
+    def __init__(self, path: Path):
+        """
+
+        Args:
+            path: Path to the database file, created if it does not exist.
+        """
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+
+    def open(self) -> "EventIndex":
+        # the frames of `FrameFileDumperCallback` may be added from the worker thread of an `AsyncCallback`
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        return self
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def relative_path(self, path: Path) -> str:
+        """Returns `path` as it is stored in the index, relative to the directory of the index."""
+        return os.path.relpath(path, self.path.parent)
+
+    def add(self, timestamp: int, session: str, path: Path, n_boxes: int, area_ratio: float) -> None:
+        """
+        Adds a frame to the index, replacing the previous row of the same image file if there is one.
+
+        Args:
+            timestamp: Timestamp of the frame in milliseconds.
+            session: Id of the session that stored the frame.
+            path: Path to the image of the frame.
+            n_boxes: Number of bounding boxes of the frame.
+            area_ratio: Area of the largest bounding box divided by the area of the frame, see `max_area_ratio`.
+        """
+        self.add_many([(timestamp, session, path, n_boxes, area_ratio)])
+
+    def add_many(self, frames: List[Tuple[int, str, Path, int, float]]) -> None:
+        """
+        Adds frames to the index in a single transaction, see `add`.
+
+        Args:
+            frames: The `(timestamp, session, path, n_boxes, area_ratio)` of every frame.
+        """
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO frames (path, timestamp, session, n_boxes, max_area_ratio) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (self.relative_path(path), timestamp, session, n_boxes, area_ratio)
+                    for timestamp, session, path, n_boxes, area_ratio in frames
+                ],
+            )
+
+    def close(self) -> None:
+        if self._connection is None:
+            return
+        self._connection.close()
+        self._connection = None
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM frames").fetchone()[0]
+
+    def sessions(self) -> List[str]:
+        """Returns the ids of the sessions in the index, sorted by their first frame."""
+        rows = self._connection.execute("SELECT session FROM frames GROUP BY session ORDER BY MIN(timestamp)")
+        return [session for (session,) in rows]
+
+    def indexed_paths(self) -> set[str]:
+        """Returns the paths of the indexed images, relative to the directory of the index."""
+        return {path for (path,) in self._connection.execute("SELECT path FROM frames")}
+
+    def remove_under(self, directory: Path) -> int:
+        """
+        Removes the frames stored in `directory` and in its sub-directories, e.g. a shard deleted by the
+        `RetentionManager`.
+
+        Returns:
+            The number of removed frames.
+        """
+        prefix = self.relative_path(directory) + os.sep
+        # every path starting with the prefix sorts between it and the prefix with its last character incremented
+        with self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM frames WHERE path >= ? AND path < ?", (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+            )
+        return cursor.rowcount
+
+    def query(
+        self,
+        start: int | None = None,
+        end: int | None = None,
+        session: str | None = None,
+        min_boxes: int | None = None,
+        min_area_ratio: float | None = None,
+        limit: int | None = None,
+    ) -> List[IndexedFrame]:
+        """
+        Returns the frames matching all the given conditions, in timestamp order.
+
+        Args:
+            start: Only the frames with `timestamp >= start`, in milliseconds.
+            end: Only the frames with `timestamp < end`, in milliseconds.
+            session: Only the frames of this session.
+            min_boxes: Only the frames with at least this many bounding boxes.
+            min_area_ratio: Only the frames whose largest bounding box covers at least this fraction of the frame.
+            limit: Maximum number of frames returned.
+        """
+        conditions, parameters = [], []
+        for condition, value in (
+            ("timestamp >= ?", start),
+            ("timestamp < ?", end),
+            ("session = ?", session),
+            ("n_boxes >= ?", min_boxes),
+            ("max_area_ratio >= ?", min_area_ratio),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        sql = "SELECT timestamp, session, n_boxes, max_area_ratio, path FROM frames"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        return [
+            IndexedFrame(timestamp, session, n_boxes, area_ratio, self.path.parent / path)
+            for timestamp, session, n_boxes, area_ratio, path in self._connection.execute(sql, parameters)
+        ]
+
+
+def _frame_size(image_path: Path) -> Tuple[int, int] | None:
+    try:
+        return read_jpeg_size(image_path)
+    except ValueError:
+        img = cv2.imread(str(image_path))
+        return img.shape[:2] if img is not None else None
+
+
+def _reindex_frames(index: EventIndex, directory: Path, session: str, img_ending: str, indexed: set[str]) -> int:
+    log_path = directory / BOUNDING_BOX_LOG_FILE_NAME
+    log_reader = BoundingBoxLogReader(log_path) if log_path.is_file() else None
+
+    rows = []
+    for image_path in sorted(directory.glob(img_ending)):
+        if not image_path.stem.isdigit() or index.relative_path(image_path) in indexed:
+            continue
+        timestamp = int(image_path.stem)
+        if log_reader is not None:
+            bounding_boxes = log_reader.bounding_boxes_at(timestamp)
+        else:
+            try:
+                with open(image_path.with_suffix(".json")) as f:
+                    bounding_boxes = BoundingBoxArray.from_dicts(json.load(f))
+            except FileNotFoundError:
+                bounding_boxes = BoundingBoxArray()
+        frame_size = _frame_size(image_path)
+        if frame_size is None:
+            logger.warning(f"Could not read the image '{image_path}', skipping...")
+            continue
+        rows.append((timestamp, session, image_path, len(bounding_boxes), max_area_ratio(bounding_boxes, *frame_size)))
+    # the frames of a directory are added at once, the images are not read while the write transaction is open
+    index.add_many(rows)
+    return len(rows)
+
+
+def reindex_directory(index: EventIndex, directory: Path, session: str | None = None, img_ending: str = "*.jpg") -> int:
+    """
+    Adds the frames of a directory written by `FrameFileDumperCallback` that are not in the index yet. The bounding
+    boxes are read from the binary log of the directory if there is one, otherwise from the JSON files, and the size of
+    the frames from the headers of their JPEG files. The frames of a session stored with the hour-sharded layout are
+    read from all of its shards.
+
+    Args:
+        index: An open index.
+        directory: The directory of a session, the images need to be named after their timestamp in milliseconds.
+        session: Id of the session. Defaults to the name of the directory.
+        img_ending: Glob pattern of the image files.
+
+    Returns:
+        The number of frames added to the index.
+    """
+    session = session if session is not None else directory.name
+    indexed = index.indexed_paths()
+    added = sum(
+        _reindex_frames(index, frames_directory, session, img_ending, indexed)
+        for frames_directory in [directory, *iter_shards(directory)]
+    )
+    logger.info(f"Added {added} frames of '{directory}' to the event index '{index.path}'.")
+    return added
+
+
+def reindex_tree(index: EventIndex, root: Path, img_ending: str = "*.jpg") -> int:
+    """
+    Calls `reindex_directory` on `root` and on each of its sub-directories, e.g. on every session stored by the
+    `py_motion_detector` CLI. The name of every directory is used as its session id.
+
+    Returns:
+        The number of frames added to the index.
+    """
+    directories = [root] + sorted(p for p in root.iterdir() if p.is_dir())
+    return sum(reindex_directory(index, directory, img_ending=img_ending) for directory in directories)
@@ -0,0 +1,169 @@
+import datetime
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import structlog
+
+from py_motion_detector.instrumentation.metrics import MetricsRegistry, get_registry
+from py_motion_detector.storage.event_index import EventIndex
+from py_motion_detector.storage.shards import SHARD_DURATION, directory_size, is_sharded, iter_shards, shard_start
+
+logger = structlog.get_logger()
+
+
+class RetentionManager:
+    """
+    Deletes the oldest shards of the frames stored with the hour-sharded layout (see
+    `py_motion_detector.storage.shards`) when they are older than `max_age` or when all the shards take more than
+    `max_bytes` bytes, from a background thread that checks the quota every `interval_sec` seconds.
+
+    The shards of `root` and of each of its sub-directories are managed together, e.g. all the sessions stored in the
+    directory given to the `py_motion_detector` CLI, and the oldest shard of any session is deleted first. The shard of
+    the current hour is never deleted, since frames are still written to it. Sessions stored with the flat layout are
+    ignored.
+
+    Example usage:
+
+    with RetentionManager(Path("/tmp/frames"), max_bytes=50 * 1024**3, max_age=datetime.timedelta(days=30)):
+        motion_app.run()
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int | None = None,
+        max_age: datetime.timedelta | None = None,
+        interval_sec: float = 60.0,
+        event_index_path: Path | None = None,
+        metrics_registry: MetricsRegistry | None = None,
+        clock: Callable[[], datetime.datetime] = datetime.datetime.now,
+    ):
+        """
+
+        Args:
+            root: The directory holding the sharded sessions.
+            max_bytes: Maximum total size of the shards. `None` does not limit the size.
+            max_age: Shards whose hour ended longer than this ago are deleted. `None` does not limit the age.
+            interval_sec: Number of seconds between two checks of the quota.
+            event_index_path: If set, the frames of the deleted shards are also removed from this event index (see
+                `py_motion_detector.storage.event_index`).
+            metrics_registry: Where the number of deleted shards and bytes, and the size of the shards, are recorded.
+                Defaults to the registry shared by the application.
+            clock: Function returning the current local time, used by the tests.
+        """
+        if max_bytes is None and max_age is None:
+            raise ValueError("At least one of the maximum size and the maximum age needs to be set.")
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.interval_sec = interval_sec
+        self.event_index_path = event_index_path
+        self._clock = clock
+        # the size of the shards whose hour ended is not recomputed on every check
+        self._closed_shard_sizes: dict[Path, int] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self.stored_bytes = 0
+        registry = metrics_registry if metrics_registry is not None else get_registry()
+        self._evicted_shards = registry.counter("retention_evicted_shards_total", root=str(root))
+        self._evicted_bytes = registry.counter("retention_evicted_bytes_total", root=str(root))
+        registry.gauge("retention_stored_bytes", lambda: self.stored_bytes, root=str(root))
+
+    def _sessions(self) -> List[Path]:
+        directories = [self.root] + sorted(p for p in self.root.iterdir() if p.is_dir())
+        return [directory for directory in directories if is_sharded(directory)]
+
+    def _shards(self) -> List[Tuple[datetime.datetime, Path]]:
+        """Returns the start time and the path of all the shards, oldest first."""
+        return sorted((shard_start(shard), shard) for session in self._sessions() for shard in iter_shards(session))
+
+    def _size(self, shard: Path, start: datetime.datetime, now: datetime.datetime) -> int:
+        size = self._closed_shard_sizes.get(shard)
+        if size is None:
+            size = directory_size(shard)
+            # frames queued by background writers may land shortly after the end of the hour
+            if start + 2 * SHARD_DURATION <= now:
+                self._closed_shard_sizes[shard] = size
+        return size
+
+    def enforce(self) -> int:
+        """
+        Deletes the oldest shards until the quota is met. The frames of a shard are removed from the event index
+        before the shard is deleted, so that the index never points to deleted files: if they cannot be removed, the
+        shard and the newer ones are kept until the next check.
+
+        Returns:
+            The number of deleted shards.
+        """
+        now = self._clock()
+        shards = [(start, shard, self._size(shard, start, now)) for start, shard in self._shards()]
+        self.stored_bytes = sum(size for _, _, size in shards)
+        index = EventIndex(self.event_index_path).open() if self.event_index_path is not None else None
+        evicted, removed = 0, 0
+        try:
+            for start, shard, size in shards:
+                if start + SHARD_DURATION > now:
+                    break
+                too_old = self.max_age is not None and start + SHARD_DURATION <= now - self.max_age
+                too_large = self.max_bytes is not None and self.stored_bytes > self.max_bytes
+                if not too_old and not too_large:
+                    break
+                if index is not None:
+                    removed += index.remove_under(shard)
+                self._evict(shard)
+                evicted += 1
+                self.stored_bytes -= size
+                self._evicted_shards.inc()
+                self._evicted_bytes.inc(size)
+        finally:
+            if index is not None:
+                index.close()
+            if evicted:
+                if index is not None:
+                    logger.info(f"Removed {removed} frames of the deleted shards from the event index.")
+                logger.info(f"Deleted {evicted} shards, {self.stored_bytes} bytes are stored in '{self.root}'.")
+        return evicted
+
+    def _evict(self, shard: Path) -> None:
+        logger.info(f"Deleting the shard '{shard}'.")
+        shutil.rmtree(shard, ignore_errors=True)
+        self._closed_shard_sizes.pop(shard, None)
+        try:
+            os.rmdir(shard.parent)  # only succeeds once all the hours of the day have been deleted
+        except OSError:
+            pass
+
+    def _loop(self):
+        while True:
+            try:
+                self.enforce()
+            except Exception as e:  # a failed check is retried at the next interval
+                logger.exception(f"Could not enforce the retention quota of '{self.root}': {e!r}")
+            if self._stop.wait(self.interval_sec):
+                return
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="retention-manager", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Enforcing a retention quota of max_bytes={self.max_bytes} and max_age={self.max_age} on '{self.root}'."
+        )
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
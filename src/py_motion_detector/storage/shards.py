@@ -0,0 +1,81 @@
+"""
+The hour-sharded layout of the frames stored by `FrameFileDumperCallback`: the frames of a session are stored in one
+directory per day and per hour of local time, `<session>/YYYY-MM-DD/HH/<timestamp>.jpg`, along with their JSON files or
+the binary log of bounding boxes of the shard. Every directory then holds at most one hour of frames, listing the
+frames from a given time only lists the shards from that time, and old frames are deleted one shard at a time.
+"""
+
+import datetime
+import os
+import re
+from pathlib import Path
+from typing import Iterator
+
+DAY_FORMAT = "%Y-%m-%d"
+HOUR_FORMAT = "%H"
+SHARD_DURATION = datetime.timedelta(hours=1)
+
+_DAY_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_HOUR_PATTERN = re.compile(r"^\d{2}$")
+
+
+def shard_path(root: Path, timestamp: int) -> Path:
+    """Returns the shard of `root` holding the frames of `timestamp`, in milliseconds since the epoch."""
+    time = datetime.datetime.fromtimestamp(timestamp / 1000)
+    return root / time.strftime(DAY_FORMAT) / time.strftime(HOUR_FORMAT)
+
+
+def shard_start(shard: Path) -> datetime.datetime:
+    """Returns the local time at which the hour of `shard` starts."""
+    return datetime.datetime.strptime(f"{shard.parent.name} {shard.name}", f"{DAY_FORMAT} {HOUR_FORMAT}")
+
+
+def _sorted_subdirectories(directory: Path, pattern: re.Pattern) -> list[str]:
+    try:
+        with os.scandir(directory) as entries:
+            return sorted(entry.name for entry in entries if entry.is_dir() and pattern.match(entry.name))
+    except FileNotFoundError:  # deleted by the retention manager while being listed
+        return []
+
+
+def is_sharded(directory: Path) -> bool:
+    """Whether `directory` holds day directories of the hour-sharded layout."""
+    return len(_sorted_subdirectories(directory, _DAY_PATTERN)) > 0
+
+
+def iter_shards(root: Path, start_timestamp: int | None = None) -> Iterator[Path]:
+    """
+    Lazily yields the shards of `root` in chronological order. Only the directories of one day are listed at a time,
+    so that the first frames can be read before the whole tree has been listed.
+
+    Args:
+        root: The directory of a session stored with the hour-sharded layout.
+        start_timestamp: If set, the shards ending before this timestamp, in milliseconds, are skipped.
+    """
+    first_shard = shard_path(root, start_timestamp) if start_timestamp is not None else None
+    for day in _sorted_subdirectories(root, _DAY_PATTERN):
+        if first_shard is not None and day < first_shard.parent.name:
+            continue
+        for hour in _sorted_subdirectories(root / day, _HOUR_PATTERN):
+            shard = root / day / hour
+            if first_shard is not None and (day, hour) < (first_shard.parent.name, first_shard.name):
+                continue
+            yield shard
+
+
+def directory_size(directory: Path) -> int:
+    """Returns the total size, in bytes, of the files of `directory` and of its sub-directories."""
+    size = 0
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    size += directory_size(Path(entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    try:
+                        size += entry.stat(follow_symlinks=False).st_size
+                    except FileNotFoundError:
+                        continue
+    except FileNotFoundError:
+        pass
+    return size
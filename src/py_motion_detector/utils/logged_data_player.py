@@ -1,49 +1,329 @@
+import bisect
+import collections
+import concurrent.futures
 import json
 import sys
-from itertools import cycle
+import threading
+import time
 from pathlib import Path
+from typing import Iterator, List, Tuple
 
 import cv2
+import numpy as np
 
 from py_motion_detector.common.plotting import plot_bounding_boxes
-from py_motion_detector.models.bounding_box import BoundingBox
+from py_motion_detector.models.bounding_box import BoundingBox, BoundingBoxes
+from py_motion_detector.storage.bounding_box_log import BOUNDING_BOX_LOG_FILE_NAME, BoundingBoxLogReader
+from py_motion_detector.storage.shards import is_sharded, iter_shards
 
+LoggedFrame = Tuple[np.array, BoundingBoxes]
 
-def logged_data_gen(directory: Path, img_ending="*.jpg", loop_forever: bool = False):
-    """Helper function that yields an image with its bounding boxes. Used by the data player."""
-    image_paths = directory.glob(img_ending)
-    images_sorted = sorted(image_paths)
-    images = cycle(images_sorted) if loop_forever else images_sorted
-    for img_p in images:
+
+class LoggedFrameCache:
+    """
+    A thread-safe LRU cache of decoded logged frames of at most `max_bytes` bytes, keyed by the path of their image.
+    One cache can be shared by several `LoggedDataReader`s, e.g. the ones reading the shards of a session, so that the
+    limit applies to the whole playback.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024**2):
+        """
+
+        Args:
+            max_bytes: Maximum size of the decoded frames kept in memory. 0 disables the cache.
+        """
+        self.max_bytes = max_bytes
+        self._frames: collections.OrderedDict[Path, LoggedFrame] = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def get(self, path: Path) -> LoggedFrame | None:
+        """Returns the cached frame of the image `path`, or `None` if it is not cached. Counts the hits and misses."""
+        with self._lock:
+            logged_frame = self._frames.get(path)
+            if logged_frame is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(path)
+            self.hits += 1
+            return logged_frame
+
+    def put(self, path: Path, logged_frame: LoggedFrame) -> None:
+        size = logged_frame[0].nbytes if logged_frame[0] is not None else 0
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if path in self._frames:
+                return
+            self._frames[path] = logged_frame
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (img, _) = self._frames.popitem(last=False)
+                self._bytes -= img.nbytes if img is not None else 0
+
+
+class LoggedDataReader:
+    """
+    Reads the frames and bounding boxes logged in a directory ahead of playback. A pool of threads decodes the next
+    `prefetch_size` frames while the current one is shown, and the decoded frames are kept in an LRU cache of at most
+    `cache_bytes` bytes, so that looped playback of a session that fits in the cache does not read the disk again.
+
+    Frames are sorted by name. Frames named after their timestamp in milliseconds, as stored by the
+    `FrameFileDumperCallback`, can be looked up by timestamp with `seek`.
+
+    Example usage:
+
+    reader = LoggedDataReader(Path("/tmp/motion_detector/session"))
+    for index, img, bounding_boxes in reader.frames(start_index=reader.seek(1711992000000)):
+        ...
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        img_ending: str = "*.jpg",
+        workers: int = 2,
+        prefetch_size: int = 8,
+        cache_bytes: int = 256 * 1024**2,
+        cache: LoggedFrameCache | None = None,
+    ):
+        """
+
+        Args:
+            directory: Path to the directory where the data are stored.
+            img_ending: Glob pattern of the image files.
+            workers: Number of threads decoding the images.
+            prefetch_size: Maximum number of frames decoded ahead of the one being played.
+            cache_bytes: Maximum size of the decoded frames kept in memory. 0 disables the cache.
+            cache: If set, the decoded frames are kept in this cache, e.g. shared with the readers of other shards,
+                and `cache_bytes` is ignored.
+        """
+        if prefetch_size < 1:
+            raise ValueError(f"The prefetch size needs to be a positive integer, not {prefetch_size}.")
+        self.directory = directory
+        self.image_paths: List[Path] = sorted(directory.glob(img_ending))
+        self.timestamps: List[int | None] = [int(p.stem) if p.stem.isdigit() else None for p in self.image_paths]
+        self.workers = workers
+        self.prefetch_size = prefetch_size
+
+        log_path = directory / BOUNDING_BOX_LOG_FILE_NAME
+        self._log_reader = BoundingBoxLogReader(log_path) if log_path.is_file() else None
+        self._cache = cache if cache is not None else LoggedFrameCache(cache_bytes)
+
+    @property
+    def cache_hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def cache_misses(self) -> int:
+        return self._cache.misses
+
+    def __len__(self) -> int:
+        return len(self.image_paths)
+
+    def seek(self, timestamp: int) -> int:
+        """Returns the index of the first frame logged at or after `timestamp` (in milliseconds)."""
+        if any(t is None for t in self.timestamps):
+            raise ValueError(f"The frames of '{self.directory}' are not named after their timestamp.")
+        return bisect.bisect_left(self.timestamps, timestamp)
+
+    def load(self, index: int) -> LoggedFrame:
+        """Reads and decodes the frame `index` and its bounding boxes."""
+        img_p = self.image_paths[index]
         img = cv2.imread(f"{img_p}")
+        if self._log_reader is not None:
+            return img, self._log_reader.bounding_boxes_at(int(img_p.stem))
         json_data = []
-        json_file_name = Path(img_p).name.split(".")[0]
-        json_p = directory / f"{json_file_name}.json"
+        json_file_name = img_p.name.split(".")[0]
+        json_p = self.directory / f"{json_file_name}.json"
         try:
             with open(json_p) as f:
                 json_data = json.load(f)
         except FileNotFoundError:
             print(f"Bounding boxes for '{json_file_name}' were not found, skipping...")
-        bounding_boxes = [BoundingBox.from_dict(j) for j in json_data]
+        return img, [BoundingBox.from_dict(j) for j in json_data]
+
+    def _cached(self, index: int) -> LoggedFrame | None:
+        return self._cache.get(self.image_paths[index])
+
+    def _load_and_cache(self, index: int) -> LoggedFrame:
+        logged_frame = self.load(index)
+        self._cache.put(self.image_paths[index], logged_frame)
+        return logged_frame
+
+    def _indices(self, start_index: int, loop_forever: bool) -> Iterator[int]:
+        if not self.image_paths:
+            return
+        yield from range(start_index, len(self.image_paths))
+        while loop_forever:
+            yield from range(len(self.image_paths))
+
+    def frames(self, start_index: int = 0, loop_forever: bool = False) -> Iterator[Tuple[int, np.array, BoundingBoxes]]:
+        """
+        Yields the `(index, image, bounding_boxes)` of the frames, in order, starting from `start_index`.
+
+        Args:
+            start_index: Index of the first frame, e.g. returned by `seek`.
+            loop_forever: If set to `True` restarts from the first frame after the last one.
+        """
+        frames = ((self, index) for index in self._indices(start_index, loop_forever))
+        for _, index, img, bounding_boxes in _prefetched(frames, self.workers, self.prefetch_size):
+            yield index, img, bounding_boxes
+
+
+def _prefetched(
+    frames: Iterator[Tuple[LoggedDataReader, int]], workers: int, prefetch_size: int
+) -> Iterator[Tuple[LoggedDataReader, int, np.array, BoundingBoxes]]:
+    """
+    Yields the `(reader, index, image, bounding_boxes)` of the `(reader, index)` frames, in order, decoding the next
+    `prefetch_size` frames in a pool of `workers` threads. The frames can come from several readers, which share the
+    pool, so that the prefetch does not stall when the playback moves from one reader to the next.
+    """
+    pending: collections.deque = collections.deque()
+    with concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="logged-data") as executor:
+
+        def schedule():
+            # OpenCV releases the GIL while decoding, so the frames are decoded in parallel with the playback
+            while len(pending) < prefetch_size:
+                reader, index = next(frames, (None, None))
+                if reader is None:
+                    return
+                logged_frame = reader._cached(index)
+                if logged_frame is None:
+                    logged_frame = executor.submit(reader._load_and_cache, index)
+                pending.append((reader, index, logged_frame))
+
+        schedule()
+        try:
+            while pending:
+                reader, index, logged_frame = pending.popleft()
+                schedule()
+                if isinstance(logged_frame, concurrent.futures.Future):
+                    logged_frame = logged_frame.result()
+                yield reader, index, *logged_frame
+        finally:
+            for _, _, logged_frame in pending:
+                if isinstance(logged_frame, concurrent.futures.Future):
+                    logged_frame.cancel()
+
+
+def logged_frames(
+    directory: Path,
+    start_timestamp: int | None = None,
+    loop_forever: bool = False,
+    img_ending: str = "*.jpg",
+    workers: int = 2,
+    prefetch_size: int = 8,
+    cache_bytes: int = 256 * 1024**2,
+    cache: LoggedFrameCache | None = None,
+) -> Iterator[Tuple[int | None, np.array, BoundingBoxes]]:
+    """
+    Yields the `(timestamp, image, bounding_boxes)` of the frames logged in a directory, in order. The timestamp is
+    `None` for the frames that are not named after their timestamp.
+
+    The shards of a directory stored with the hour-sharded layout (see `py_motion_detector.storage.shards`) are listed
+    lazily and read by one `LoggedDataReader` each, so that the playback starts without listing every stored frame and
+    shards added while playing are played too. The readers of all the shards share one pool of decoding threads and
+    one frame cache for the whole playback.
+
+    Args:
+        directory: Path to the directory where the data are stored.
+        start_timestamp: If set, the frames logged before this timestamp, in milliseconds, are skipped.
+        loop_forever: If set to `True` restarts from the first frame after the last one.
+        img_ending: Glob pattern of the image files.
+        workers: Number of threads decoding the images.
+        prefetch_size: Maximum number of frames decoded ahead of the one being played.
+        cache_bytes: Maximum size of the decoded frames kept in memory. 0 disables the cache.
+        cache: If set, the decoded frames are kept in this cache and `cache_bytes` is ignored.
+    """
+    cache = cache if cache is not None else LoggedFrameCache(cache_bytes)
+    if not is_sharded(directory):
+        reader = LoggedDataReader(
+            directory, img_ending=img_ending, workers=workers, prefetch_size=prefetch_size, cache=cache
+        )
+        start_index = reader.seek(start_timestamp) if start_timestamp is not None else 0
+        for index, img, bounding_boxes in reader.frames(start_index=start_index, loop_forever=loop_forever):
+            yield reader.timestamps[index], img, bounding_boxes
+        return
+
+    def shard_frames(start: int | None) -> Iterator[Tuple[LoggedDataReader, int]]:
+        while True:
+            played = False
+            for shard in iter_shards(directory, start):
+                # the frames of the shard are listed again on every pass, the decoded ones are found in the cache
+                reader = LoggedDataReader(shard, img_ending=img_ending, cache=cache)
+                for index in range(reader.seek(start) if start is not None else 0, len(reader)):
+                    played = True
+                    yield reader, index
+            if not loop_forever or not played:
+                return
+            start = None
+
+    for reader, index, img, bounding_boxes in _prefetched(shard_frames(start_timestamp), workers, prefetch_size):
+        yield reader.timestamps[index], img, bounding_boxes
+
+
+def logged_data_gen(directory: Path, img_ending="*.jpg", loop_forever: bool = False):
+    """
+    Helper function that yields an image with its bounding boxes. Used by the data player.
+    The bounding boxes are read from the binary log of the directory if there is one, otherwise from the JSON files.
+    """
+    for _, img, bounding_boxes in logged_frames(directory, loop_forever=loop_forever, img_ending=img_ending):
         yield img, bounding_boxes
 
 
-def play_logged_data(directory: Path, wait_ms: int = 0, loop_forever: bool = False) -> None:
+def play_logged_data(
+    directory: Path,
+    wait_ms: int = 0,
+    loop_forever: bool = False,
+    start_timestamp: int | None = None,
+    speed: float | None = None,
+    prefetch_size: int = 8,
+    cache_mb: int = 256,
+) -> None:
     """
     Utility function used to playback logged data.
 
     Args:
-        directory: Path to the directory where the data are stored.
+        directory: Path to the directory where the data are stored, with the flat or the hour-sharded layout.
         wait_ms: How many milliseconds to wait between each consecutive frames?
         loop_forever: If set to `True` will restart the playback of data.
+        start_timestamp: If set, the playback starts from the first frame logged at or after this timestamp, in
+            milliseconds since the epoch.
+        speed: If set, frames are shown at the pace they were logged at, multiplied by `speed` (e.g. 2 plays twice as
+            fast), instead of every `wait_ms` milliseconds. The frames need to be named after their timestamp.
+        prefetch_size: Maximum number of frames decoded ahead of the one being shown.
+        cache_mb: Maximum size, in MiB, of the decoded frames kept in memory for looped playback.
     """
-    for img, bbs in logged_data_gen(directory, loop_forever=loop_forever):
+    if speed is not None and speed <= 0:
+        raise ValueError(f"The playback speed needs to be positive, not {speed}.")
+
+    previous_timestamp, previous_shown = None, None
+    for timestamp, img, bbs in logged_frames(
+        directory,
+        start_timestamp=start_timestamp,
+        loop_forever=loop_forever,
+        prefetch_size=prefetch_size,
+        cache_bytes=cache_mb * 1024**2,
+    ):
         img = plot_bounding_boxes(img, bbs)
+        delay_ms = wait_ms
+        if speed is not None and timestamp is not None and previous_timestamp is not None:
+            # the time spent decoding and drawing the frame is deducted from the delay
+            delay_ms = (timestamp - previous_timestamp) / speed - 1000 * (time.monotonic() - previous_shown)
+            delay_ms = max(int(delay_ms), 1)  # a 0 delay would wait for a key press; loops restart after 1ms
+        previous_timestamp = timestamp
         try:
             cv2.imshow(str(directory), img)
-            if cv2.waitKey(wait_ms) != -1:
+            if cv2.waitKey(delay_ms) != -1:
                 print("Detected a keypress, exiting...")
                 raise KeyboardInterrupt
+            previous_shown = time.monotonic()
         except KeyboardInterrupt:
             cv2.destroyAllWindows()
             sys.exit(0)
@@ -0,0 +1,118 @@
+import datetime
+import threading
+import unittest
+
+import numpy as np
+from py_motion_detector.callbacks.async_dispatch import AsyncCallback, BackpressurePolicy
+from py_motion_detector.callbacks.base import MotionDetectionCallbackABC
+from py_motion_detector.input_sources.dummy import DummyFrameProvider
+from py_motion_detector.motion_detection_app import MotionDetectionApplication
+
+
+class RecordingCallback(MotionDetectionCallbackABC):
+    def __init__(self, release: threading.Event | None = None, fail: bool = False):
+        self.release = release
+        self.fail = fail
+        self.timestamps = []
+        self.exited = False
+
+    def on_start(self):
+        pass
+
+    def execute(self, frame, timestamp, bounding_boxes):
+        if self.release is not None:
+            self.release.wait()
+        if self.fail:
+            raise KeyboardInterrupt("escape")
+        self.timestamps.append(timestamp)
+
+    def on_exit(self):
+        self.exited = True
+
+
+class TestAsyncCallback(unittest.TestCase):
+    def setUp(self):
+        self.frame = np.zeros((10, 10, 3), dtype=np.uint8)
+        self.timestamps = [datetime.datetime(2024, 1, 1, 0, 0, i) for i in range(10)]
+
+    def _execute_all(self, callback: AsyncCallback):
+        for ts in self.timestamps:
+            callback.execute(frame=self.frame, timestamp=ts, bounding_boxes=[])
+
+    def test_block_drains_in_order(self):
+        recording = RecordingCallback()
+        callback = AsyncCallback(recording, queue_size=2)
+        callback.on_start()
+        self._execute_all(callback)
+        callback.on_exit()
+
+        self.assertEqual(recording.timestamps, self.timestamps)
+        self.assertTrue(recording.exited)
+
+    def test_drop_discards_new_frames(self):
+        release = threading.Event()
+        recording = RecordingCallback(release)
+        callback = AsyncCallback(recording, queue_size=2, backpressure=BackpressurePolicy.DROP)
+        callback.on_start()
+        self._execute_all(callback)
+        release.set()
+        callback.on_exit()
+
+        self.assertGreaterEqual(callback.dropped_frames, 7)
+        self.assertEqual(recording.timestamps, sorted(recording.timestamps))
+        self.assertEqual(len(recording.timestamps) + callback.dropped_frames, len(self.timestamps))
+
+    def test_coalesce_keeps_newest_frames(self):
+        release = threading.Event()
+        recording = RecordingCallback(release)
+        callback = AsyncCallback(recording, queue_size=2, backpressure="coalesce")
+        callback.on_start()
+        self._execute_all(callback)
+        release.set()
+        callback.on_exit()
+
+        self.assertEqual(recording.timestamps[-2:], self.timestamps[-2:])
+
+    def test_errors_are_raised_on_execute(self):
+        callback = AsyncCallback(RecordingCallback(fail=True))
+        callback.on_start()
+        callback.execute(frame=self.frame, timestamp=self.timestamps[0], bounding_boxes=[])
+        callback._thread.join()
+        self.assertRaises(KeyboardInterrupt, callback.execute, self.frame, self.timestamps[1], [])
+        callback.on_exit()
+
+    def test_frames_without_motion_are_skipped_if_not_needed(self):
+        recording = RecordingCallback()
+        recording.needs_frames_without_motion = False
+        callback = AsyncCallback(recording)
+        callback.on_start()
+        self._execute_all(callback)
+        callback.execute(frame=self.frame, timestamp=self.timestamps[0], bounding_boxes=[[0, 0, 5, 5]])
+        callback.on_exit()
+
+        self.assertEqual(recording.timestamps, self.timestamps[:1])
+        self.assertFalse(callback.needs_frames_without_motion)
+
+    def test_exit_does_not_shut_down_a_busy_callback(self):
+        release = threading.Event()
+        recording = RecordingCallback(release)
+        callback = AsyncCallback(recording, drain_timeout_sec=0.01)
+        callback.on_start()
+        callback.execute(frame=self.frame, timestamp=self.timestamps[0], bounding_boxes=[])
+        callback.on_exit()
+        self.assertFalse(recording.exited)
+
+        release.set()
+        callback._thread.join()
+        self.assertEqual(recording.timestamps, self.timestamps[:1])
+
+    def test_application_wraps_callbacks(self):
+        recording = RecordingCallback()
+        app = MotionDetectionApplication(
+            frame_provider=DummyFrameProvider(self.frame, 5), callbacks=[recording], async_callbacks=True
+        )
+        self.assertIsInstance(app.callbacks[0], AsyncCallback)
+        app._setup_callbacks()
+        app._run()
+        app._shutdown_callbacks()
+        self.assertEqual(len(recording.timestamps), 5)
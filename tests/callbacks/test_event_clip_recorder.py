@@ -0,0 +1,63 @@
+import datetime
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+from py_motion_detector.callbacks.event_clip_recorder import EventClipRecorderCallback
+from py_motion_detector.models.bounding_box import BoundingBox
+
+
+class TestEventClipRecorderCallback(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+        self.frame = np.random.randint(0, 255, (64, 96, 3), dtype=np.uint8)
+        self.bounding_boxes = [BoundingBox(top=1, left=2, bottom=30, right=40)]
+        self.callback = EventClipRecorderCallback(
+            self.directory, pre_roll_frames=2, post_roll_frames=3, fourcc="MJPG", clip_extension="avi"
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _run(self, motion: list):
+        start = datetime.datetime(2024, 1, 1, 12, 0, 0)
+        self.callback.on_start()
+        for i, has_motion in enumerate(motion):
+            timestamp = start + datetime.timedelta(seconds=i)
+            self.callback.execute(self.frame, timestamp, self.bounding_boxes if has_motion else [])
+        self.callback.on_exit()
+
+    def _read_indices(self):
+        indices = []
+        for index_path in sorted(self.directory.glob("*.jsonl")):
+            with open(index_path) as f:
+                indices.append([json.loads(line) for line in f])
+        return indices
+
+    def test_single_event_with_pre_and_post_roll(self):
+        self._run([False] * 5 + [True, False, True] + [False] * 10)
+
+        clips = sorted(self.directory.glob("*.avi"))
+        self.assertEqual(len(clips), 1)
+        indices = self._read_indices()
+        # 2 pre-roll frames, 3 motion frames and 3 post-roll frames
+        self.assertEqual(len(indices[0]), 8)
+        self.assertEqual([len(r["bounding_boxes"]) for r in indices[0]], [0, 0, 1, 0, 1, 0, 0, 0])
+        self.assertEqual(clips[0].stem, str(indices[0][0]["timestamp"]))
+
+        capture = cv2.VideoCapture(str(clips[0]))
+        self.assertEqual(int(capture.get(cv2.CAP_PROP_FRAME_COUNT)), 8)
+        capture.release()
+
+    def test_separate_events(self):
+        self._run([True] + [False] * 5 + [True])
+        self.assertEqual(len(list(self.directory.glob("*.avi"))), 2)
+        self.assertEqual([len(i) for i in self._read_indices()], [4, 3])
+
+    def test_no_motion_no_clips(self):
+        self._run([False] * 10)
+        self.assertEqual(list(self.directory.iterdir()), [])
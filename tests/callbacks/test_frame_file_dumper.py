@@ -0,0 +1,136 @@
+import datetime
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+from py_motion_detector.callbacks.frame_file_dumper import FrameFileDumperCallback
+from py_motion_detector.models.bounding_box import BoundingBox
+from py_motion_detector.storage.bounding_box_log import BOUNDING_BOX_LOG_FILE_NAME, BoundingBoxLogReader
+from py_motion_detector.storage.event_index import EVENT_INDEX_FILE_NAME, EventIndex
+from py_motion_detector.utils.logged_data_player import logged_data_gen
+
+
+class TestFrameFileDumperCallback(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name) / "session"
+        self.frame = np.random.randint(0, 255, (60, 80, 3), dtype=np.uint8)
+        self.bounding_boxes = [BoundingBox(top=1, left=2, bottom=30, right=40)]
+        self.timestamps = [datetime.datetime(2024, 1, 1, 12, 0, i) for i in range(5)]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _run_callback(self, callback: FrameFileDumperCallback):
+        callback.on_start()
+        for ts in self.timestamps:
+            callback.execute(self.frame, ts, self.bounding_boxes)
+        callback.execute(self.frame, self.timestamps[-1] + datetime.timedelta(seconds=1), [])
+        callback.on_exit()
+
+    def _assert_stored(self):
+        images = sorted(self.directory.glob("*.jpg"))
+        self.assertEqual(len(images), len(self.timestamps))
+        self.assertEqual(cv2.imread(str(images[0])).shape, self.frame.shape)
+        with open(images[0].with_suffix(".json")) as f:
+            self.assertEqual([BoundingBox.from_dict(d) for d in json.load(f)], self.bounding_boxes)
+
+    def test_execute_stores_frames(self):
+        self._run_callback(FrameFileDumperCallback(self.directory))
+        self._assert_stored()
+
+    def test_background_writer_stores_frames(self):
+        callback = FrameFileDumperCallback(self.directory, background_writer=True, queue_depth=2, fsync_every=2)
+        self._run_callback(callback)
+        self._assert_stored()
+        self.assertEqual(callback._writer.written_frames, len(self.timestamps))
+
+    def test_background_writer_survives_errors(self):
+        callback = FrameFileDumperCallback(self.directory, background_writer=True, queue_depth=1, fsync_every=1)
+        with mock.patch("os.fsync", side_effect=OSError("disk failure")):
+            self._run_callback(callback)
+        self._assert_stored()
+
+        callback = FrameFileDumperCallback(self.directory / "missing", background_writer=True, queue_depth=1)
+        callback.on_start()
+        (self.directory / "missing").rmdir()
+        for ts in self.timestamps:
+            callback.execute(self.frame, ts, self.bounding_boxes)
+        callback.on_exit()
+        self.assertEqual(callback._writer.failed_frames, len(self.timestamps))
+
+    def test_background_writer_closes_files_that_failed(self):
+        callback = FrameFileDumperCallback(self.directory, background_writer=True, queue_depth=1)
+        callback.on_start()
+        files = []
+
+        def open_full_disk(*args, **kwargs):
+            files.append(mock.MagicMock())
+            files[-1].write.side_effect = OSError(28, "No space left on device")
+            return files[-1]
+
+        with mock.patch("py_motion_detector.callbacks.background_writer.open", open_full_disk, create=True):
+            for ts in self.timestamps:
+                callback.execute(self.frame, ts, self.bounding_boxes)
+            callback.on_exit()
+
+        self.assertEqual(callback._writer.failed_frames, len(self.timestamps))
+        self.assertEqual(len(files), len(self.timestamps))
+        self.assertTrue(all(f.close.called for f in files))
+        self.assertEqual(callback._writer._unsynced_files, [])
+
+    def test_binary_bounding_boxes_format(self):
+        self._run_callback(FrameFileDumperCallback(self.directory, bounding_boxes_format="binary"))
+
+        self.assertEqual(len(list(self.directory.glob("*.jpg"))), len(self.timestamps))
+        self.assertEqual(list(self.directory.glob("*.json")), [])
+        reader = BoundingBoxLogReader(self.directory / BOUNDING_BOX_LOG_FILE_NAME)
+        self.assertEqual(len(reader), len(self.timestamps))
+        self.assertEqual([bbs for _, bbs in logged_data_gen(self.directory)], [self.bounding_boxes] * 5)
+
+    def test_unknown_bounding_boxes_format(self):
+        self.assertRaises(ValueError, FrameFileDumperCallback, self.directory, bounding_boxes_format="xml")
+
+    def test_event_index(self):
+        index_path = Path(self.tmp_dir.name) / EVENT_INDEX_FILE_NAME
+        self._run_callback(FrameFileDumperCallback(self.directory, event_index_path=index_path))
+
+        with EventIndex(index_path) as index:
+            frames = index.query()
+        self.assertEqual([f.path for f in frames], sorted(self.directory.glob("*.jpg")))
+        self.assertEqual({f.session for f in frames}, {"session"})
+        self.assertEqual(frames[0].n_boxes, 1)
+        self.assertAlmostEqual(frames[0].max_area_ratio, 29 * 38 / (60 * 80))
+
+    def test_event_index_only_holds_stored_frames(self):
+        index_path = Path(self.tmp_dir.name) / EVENT_INDEX_FILE_NAME
+        callback = FrameFileDumperCallback(self.directory, background_writer=True, event_index_path=index_path)
+        self._run_callback(callback)
+        with EventIndex(index_path) as index:
+            self.assertEqual(len(index), len(self.timestamps))
+
+        callback = FrameFileDumperCallback(
+            self.directory / "missing", background_writer=True, event_index_path=index_path
+        )
+        callback.on_start()
+        (self.directory / "missing").rmdir()
+        callback.execute(self.frame, self.timestamps[0], self.bounding_boxes)
+        callback.on_exit()
+        self.assertEqual(callback._writer.failed_frames, 1)
+        with EventIndex(index_path) as index:
+            self.assertEqual(len(index), len(self.timestamps))
+
+    def test_shard_by_hour(self):
+        self.timestamps = [datetime.datetime(2024, 1, 1, 12, 59, 58), datetime.datetime(2024, 1, 1, 13, 0, 1)]
+        self._run_callback(FrameFileDumperCallback(self.directory, shard_by_hour=True, bounding_boxes_format="binary"))
+
+        self.assertEqual(list(self.directory.glob("*.jpg")), [])
+        for hour in ("12", "13"):
+            shard = self.directory / "2024-01-01" / hour
+            self.assertEqual(len(list(shard.glob("*.jpg"))), 1)
+            self.assertEqual(len(BoundingBoxLogReader(shard / BOUNDING_BOX_LOG_FILE_NAME)), 1)
+        self.assertEqual([bbs for _, bbs in logged_data_gen(self.directory)], [self.bounding_boxes] * 2)
@@ -0,0 +1,68 @@
+import datetime
+import unittest
+from unittest import mock
+
+import numpy as np
+from py_motion_detector.callbacks.track_change_filter import TrackChangeFilterCallback
+from py_motion_detector.models.bounding_box import BoundingBox, TrackedBoundingBoxArray
+
+
+def tracked(*boxes: tuple[int, list]) -> TrackedBoundingBoxArray:
+    """Boxes of side 20 at the given `(track id, [top, left])`."""
+    data = np.array([[top, left, top + 20, left + 20] for _, (top, left) in boxes]).reshape(-1, 4)
+    return TrackedBoundingBoxArray(data, track_ids=[track_id for track_id, _ in boxes])
+
+
+class TestTrackChangeFilterCallback(unittest.TestCase):
+    def setUp(self):
+        self.frame = np.zeros((200, 200), dtype=np.uint8)
+        self.callback = mock.Mock()
+        self.callback.name.return_value = "MockCallback"
+        self.filter = TrackChangeFilterCallback(
+            self.callback, min_displacement=10, keyframe_interval=None, end_after_frames=2
+        )
+
+    def _execute(self, bounding_boxes) -> bool:
+        calls = self.callback.execute.call_count
+        self.filter.execute(self.frame, datetime.datetime.now(), bounding_boxes)
+        return self.callback.execute.call_count > calls
+
+    def test_passes_changes_only(self):
+        self.assertTrue(self._execute(tracked((0, [0, 0]))))
+        self.assertFalse(self._execute(tracked((0, [5, 5]))))
+        self.assertFalse(self._execute(tracked((0, [7, 7]))))
+        # 11.3 pixels from the center of the last passed frame
+        self.assertTrue(self._execute(tracked((0, [8, 8]))))
+        self.assertTrue(self._execute(tracked((0, [8, 8]), (1, [100, 100]))))
+        self.assertFalse(self._execute(tracked((1, [100, 100]), (0, [8, 8]))))
+        self.assertEqual(self.filter.passed_frames, 3)
+        self.assertEqual(self.filter.suppressed_frames, 3)
+
+    def test_briefly_missed_track_does_not_end(self):
+        self.assertTrue(self._execute(tracked((0, [0, 0]), (1, [100, 100]))))
+        self.assertFalse(self._execute(tracked((0, [0, 0]))))
+        self.assertFalse(self._execute(tracked((0, [0, 0]), (1, [100, 100]))))
+        self.assertFalse(self._execute(tracked((0, [0, 0]))))
+        # track 1 has no box for 2 frames: it ended
+        self.assertTrue(self._execute(tracked((0, [0, 0]))))
+        self.assertTrue(self._execute(tracked((0, [0, 0]), (1, [100, 100]))))
+
+    def test_keyframes(self):
+        self.filter.keyframe_interval = 3
+        passed = [self._execute(tracked((0, [0, 0]))) for _ in range(7)]
+        self.assertEqual(passed, [True, False, False, True, False, False, True])
+
+    def test_untracked_boxes_are_passed(self):
+        self.assertTrue(self._execute([BoundingBox(0, 0, 10, 10)]))
+        self.assertTrue(self._execute([BoundingBox(0, 0, 10, 10)]))
+
+    def test_wraps_the_callback(self):
+        self.filter.on_start()
+        self.filter.on_exit()
+        self.callback.on_start.assert_called_once()
+        self.callback.on_exit.assert_called_once()
+        self.assertEqual(self.filter.name(), "TrackChangeFilterCallback(MockCallback)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import datetime
+
+
+class FakeClock:
+    """
+    A clock for the tests, passed as the `clock` of the classes that read the current time. Returns `now`, a
+    `datetime.datetime` or a number of seconds, which only changes when the tests move it forward.
+
+    Example usage:
+
+    clock = FakeClock(datetime.datetime(2024, 3, 1, 12))
+    app = MotionDetectionApplication(frame_provider, clock=clock)
+    with mock.patch("py_motion_detector.motion_detection_app.time.sleep", side_effect=clock.sleep):
+        app.run()
+    """
+
+    def __init__(self, now: datetime.datetime | float = 0.0):
+        self.now = now
+        self.calls = 0
+
+    def __call__(self) -> datetime.datetime | float:
+        self.calls += 1
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Moves the clock forward instead of sleeping, e.g. as the `side_effect` of a mocked `time.sleep`."""
+        if isinstance(self.now, datetime.datetime):
+            self.now += datetime.timedelta(seconds=seconds)
+        else:
+            self.now += seconds
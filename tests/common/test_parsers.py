@@ -1,7 +1,7 @@
 import datetime
 import unittest
 
-from py_motion_detector.common.parsers import str2time_duration
+from py_motion_detector.common.parsers import str2time_duration, str2time_window, str2timestamp_ms
 
 
 class TestParsers(unittest.TestCase):
@@ -38,3 +38,16 @@ class TestParsers(unittest.TestCase):
 
     def test_str2time_duration_incorrect(self):
         self.assertRaises(ValueError, str2time_duration, self.duration_str)
+
+    def test_str2timestamp_ms(self):
+        self.assertIsNone(str2timestamp_ms(None))
+        self.assertEqual(str2timestamp_ms("1711992000123"), 1711992000123)
+        self.assertEqual(str2timestamp_ms("2024-04-01T17:20:00+00:00"), 1711992000000)
+        with self.assertRaises(ValueError):
+            str2timestamp_ms("yesterday")
+
+    def test_str2time_window(self):
+        window = str2time_window("22:00-06:00")
+        self.assertEqual(window.start, datetime.time(22))
+        self.assertEqual(window.duration, datetime.timedelta(hours=8))
+        self.assertRaises(ValueError, str2time_window, "22:00")
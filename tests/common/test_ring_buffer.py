@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+from py_motion_detector.common.ring_buffer import FrameRingBuffer
+
+
+class TestFrameRingBuffer(unittest.TestCase):
+    def setUp(self):
+        self.frames = [np.full((4, 4, 3), i, dtype=np.uint8) for i in range(5)]
+        self.ring_buffer = FrameRingBuffer(capacity=3)
+
+    def test_push_pop_order(self):
+        for i, frame in enumerate(self.frames[:3]):
+            self.assertFalse(self.ring_buffer.push(frame, metadata=i))
+        self.assertTrue(self.ring_buffer.full)
+
+        frame, metadata = self.ring_buffer.pop()
+        self.assertEqual(metadata, 0)
+        np.testing.assert_array_equal(frame, self.frames[0])
+        self.assertEqual(len(self.ring_buffer), 2)
+
+    def test_push_overwrites_oldest(self):
+        overwritten = [self.ring_buffer.push(frame, metadata=i) for i, frame in enumerate(self.frames)]
+        self.assertEqual(overwritten, [False, False, False, True, True])
+        self.assertEqual([metadata for _, metadata in self.ring_buffer], [2, 3, 4])
+
+    def test_pop_returns_copy(self):
+        self.ring_buffer.push(self.frames[1])
+        frame, _ = self.ring_buffer.pop()
+        for f in self.frames[2:]:
+            self.ring_buffer.push(f)
+        np.testing.assert_array_equal(frame, self.frames[1])
+
+    def test_pop_newest(self):
+        for i, frame in enumerate(self.frames):
+            self.ring_buffer.push(frame, metadata=i)
+        frame, metadata = self.ring_buffer.pop_newest()
+        np.testing.assert_array_equal(frame, self.frames[4])
+        self.assertEqual(metadata, 4)
+        self.assertEqual([metadata for _, metadata in self.ring_buffer], [2, 3])
+
+    def test_pop_empty(self):
+        self.assertRaises(IndexError, self.ring_buffer.pop)
+        self.assertRaises(IndexError, self.ring_buffer.pop_newest)
+
+    def test_reallocates_on_shape_change(self):
+        self.ring_buffer.push(self.frames[0])
+        self.ring_buffer.push(np.zeros((2, 2), dtype=np.uint8))
+        self.assertEqual(len(self.ring_buffer), 1)
+        self.assertEqual(self.ring_buffer.frame_shape, (2, 2))
+
+    def test_invalid_capacity(self):
+        self.assertRaises(ValueError, FrameRingBuffer, 0)
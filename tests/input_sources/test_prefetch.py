@@ -0,0 +1,75 @@
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+from py_motion_detector.input_sources.dummy import DummyFrameProvider
+from py_motion_detector.input_sources.prefetch import OverflowPolicy, PrefetchFrameProvider
+
+
+class TestPrefetchFrameProvider(unittest.TestCase):
+    def setUp(self):
+        self.frame = np.random.randint(0, 255, (20, 20, 3), dtype=np.uint8)
+
+    def test_block_policy_yields_every_frame(self):
+        prefetch = PrefetchFrameProvider(
+            DummyFrameProvider(self.frame, 50), buffer_size=2, overflow_policy=OverflowPolicy.BLOCK
+        )
+        with prefetch as pfp:
+            frames = list(pfp.frames())
+
+        self.assertEqual(len(frames), 50)
+        self.assertEqual(prefetch.captured_frames, 50)
+        self.assertEqual(prefetch.dropped_frames, 0)
+        np.testing.assert_array_equal(frames[-1], self.frame)
+
+    def test_drop_oldest_policy_counts_dropped_frames(self):
+        prefetch = PrefetchFrameProvider(DummyFrameProvider(self.frame, 50), buffer_size=1)
+        with prefetch as pfp:
+            prefetch._thread.join()
+            frames = list(pfp.frames())
+
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(prefetch.captured_frames, 50)
+        self.assertEqual(prefetch.dropped_frames, 49)
+
+    def test_drop_oldest_policy_yields_newest_frame(self):
+        frames = [np.full((4, 4, 3), i, dtype=np.uint8) for i in range(10)]
+        prefetch = PrefetchFrameProvider(DummyFrameProvider(frames[0]), buffer_size=5)
+        prefetch.frame_provider.dummy_frames = frames
+        with prefetch as pfp:
+            prefetch._thread.join()
+            yielded = list(pfp.frames())
+
+        self.assertEqual(len(yielded), 1)
+        np.testing.assert_array_equal(yielded[0], frames[-1])
+        self.assertEqual(prefetch.dropped_frames, 9)
+
+    def test_provider_released_after_capture_thread_stops(self):
+        unblock = threading.Event()
+
+        def slow_frames():
+            yield self.frame
+            unblock.wait()
+
+        prefetch = PrefetchFrameProvider(DummyFrameProvider(self.frame), join_timeout_sec=0.01)
+        prefetch.frame_provider.frames = slow_frames
+        with mock.patch.object(prefetch.frame_provider, "__exit__") as provider_exit:
+            thread = prefetch.__enter__()._thread
+            prefetch.__exit__(None, None, None)
+            provider_exit.assert_not_called()
+
+            unblock.set()
+            thread.join()
+            provider_exit.assert_called_once()
+
+    def test_capture_errors_are_raised_by_frames(self):
+        def broken_frames():
+            yield self.frame
+            raise RuntimeError("camera disconnected")
+
+        prefetch = PrefetchFrameProvider(DummyFrameProvider(self.frame, 1), overflow_policy=OverflowPolicy.BLOCK)
+        prefetch.frame_provider.frames = broken_frames
+        with self.assertRaises(RuntimeError):
+            with prefetch as pfp:
+                list(pfp.frames())
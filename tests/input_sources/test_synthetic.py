@@ -0,0 +1,33 @@
+import unittest
+
+import numpy as np
+from py_motion_detector.input_sources.synthetic import SyntheticFrameProvider
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+
+
+class TestSyntheticFrameProvider(unittest.TestCase):
+    def test_frames_are_deterministic(self):
+        with SyntheticFrameProvider(60, 80, n_frames=5, n_objects=3, seed=7) as sfp:
+            first = list(sfp.frames())
+        with SyntheticFrameProvider(60, 80, n_frames=5, n_objects=3, seed=7) as sfp:
+            second = list(sfp.frames())
+
+        self.assertEqual(len(first), 5)
+        self.assertEqual(first[0].shape, (60, 80, 3))
+        for a, b in zip(first, second, strict=True):
+            np.testing.assert_array_equal(a, b)
+
+    def test_objects_stay_inside_the_frame(self):
+        sfp = SyntheticFrameProvider(60, 80, n_objects=8, max_speed=30)
+        for i in range(200):
+            boxes = sfp.object_boxes(i)
+            self.assertTrue(np.all(boxes.top >= 0) and np.all(boxes.bottom <= 60))
+            self.assertTrue(np.all(boxes.left >= 0) and np.all(boxes.right <= 80))
+
+    def test_moving_objects_are_detected(self):
+        model = MotionDetectionWeightedAverage(min_area=100)
+        with SyntheticFrameProvider(240, 320, n_frames=10, n_objects=1, max_speed=10, seed=1) as sfp:
+            bounding_boxes = [model.next_frame(frame) for frame in sfp.frames()]
+
+        self.assertEqual(len(bounding_boxes[0]), 0)
+        self.assertTrue(all(len(bbs) > 0 for bbs in bounding_boxes[1:]))
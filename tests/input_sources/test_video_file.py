@@ -0,0 +1,44 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import cv2
+import numpy as np
+from py_motion_detector.input_sources.video_file import VideoFileFrameProvider
+
+
+class TestVideoFileFrameProvider(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = TemporaryDirectory()
+        cls.video = Path(cls.tmp_dir.name) / "video.avi"
+        # the brightness of every frame is its index, at 10 fps
+        writer = cv2.VideoWriter(str(cls.video), cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (32, 24))
+        for i in range(60):
+            writer.write(np.full((24, 32, 3), 4 * i, dtype=np.uint8))
+        writer.release()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def read_indices(self, **kwargs) -> list[int]:
+        with VideoFileFrameProvider(self.video, **kwargs) as vfp:
+            return [round(float(frame.mean()) / 4) for frame in vfp.frames()]
+
+    def test_every_frame(self):
+        self.assertEqual(self.read_indices(), list(range(60)))
+
+    def test_stride(self):
+        self.assertEqual(self.read_indices(stride=7), list(range(0, 60, 7)))
+        self.assertEqual(self.read_indices(stride=3, start_frame=10, end_frame=20), [10, 13, 16, 19])
+
+    def test_target_fps(self):
+        self.assertEqual(self.read_indices(target_fps=2.5), list(range(0, 60, 4)))
+
+    def test_start_and_end_timestamps(self):
+        self.assertEqual(self.read_indices(start_sec=1.5, end_sec=3.0), list(range(15, 30)))
+
+    def test_invalid_stride(self):
+        with self.assertRaises(ValueError):
+            VideoFileFrameProvider(self.video, stride=0)
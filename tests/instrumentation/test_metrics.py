@@ -0,0 +1,79 @@
+import unittest
+import urllib.request
+
+import numpy as np
+from py_motion_detector.input_sources.synthetic import SyntheticFrameProvider
+from py_motion_detector.instrumentation.metrics import MetricsRegistry, RollingHistogram, StageTimer
+from py_motion_detector.instrumentation.prometheus import PrometheusExporter
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+from py_motion_detector.motion_detection_app import MotionDetectionApplication
+
+
+class TestRollingHistogram(unittest.TestCase):
+    def test_quantiles_of_the_last_window(self):
+        histogram = RollingHistogram(window=100)
+        for value in range(1000):
+            histogram.observe(float(value))
+
+        self.assertEqual(histogram.count, 1000)
+        self.assertEqual(histogram.sum, sum(range(1000)))
+        quantiles = histogram.quantiles()
+        self.assertAlmostEqual(quantiles[0.5], 949.5)
+        self.assertGreaterEqual(quantiles[0.99], 990)
+
+    def test_empty_histogram(self):
+        self.assertTrue(np.isnan(RollingHistogram().quantiles()[0.5]))
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_metrics_are_created_once(self):
+        self.assertIs(self.registry.counter("frames", source="a"), self.registry.counter("frames", source="a"))
+        self.assertIsNot(self.registry.counter("frames", source="a"), self.registry.counter("frames", source="b"))
+
+    def test_stage_timer(self):
+        timer = StageTimer(self.registry, "stage_seconds", model="m")
+        timer.start()
+        timer.lap("first")
+        timer.lap("second")
+        timer.start()
+        timer.lap("first")
+
+        histograms = self.registry.snapshot()["histograms"]
+        self.assertEqual(histograms['stage_seconds{model="m",stage="first"}']["count"], 2)
+        self.assertEqual(histograms['stage_seconds{model="m",stage="second"}']["count"], 1)
+
+    def test_prometheus_text_format(self):
+        self.registry.counter("frames_total").inc(3)
+        self.registry.histogram("callback_seconds", callback="c").observe(0.5)
+        self.registry.gauge("frames_dropped", lambda: 2, source="s")
+
+        text = self.registry.to_prometheus()
+        self.assertIn("# TYPE py_motion_detector_frames_total counter\npy_motion_detector_frames_total 3\n", text)
+        self.assertIn('py_motion_detector_callback_seconds{callback="c",quantile="0.5"} 0.5\n', text)
+        self.assertIn('py_motion_detector_callback_seconds_count{callback="c"} 1\n', text)
+        self.assertIn('py_motion_detector_frames_dropped{source="s"} 2.0\n', text)
+
+    def test_application_metrics(self):
+        MotionDetectionApplication(
+            frame_provider=SyntheticFrameProvider(120, 160, n_frames=10),
+            motion_detection_model=MotionDetectionWeightedAverage(min_area=100, metrics_registry=self.registry),
+            metrics_registry=self.registry,
+        ).run()
+
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot["counters"]["frames_captured_total"], 10)
+        self.assertEqual(snapshot["counters"]["frames_processed_total"], 10)
+        self.assertEqual(snapshot["counters"]["frames_with_motion_total"], 9)
+        self.assertEqual(snapshot["histograms"]["capture_seconds"]["count"], 10)
+        stage = 'model_stage_seconds{model="MotionDetectionWeightedAverage",stage="contours"}'
+        self.assertEqual(snapshot["histograms"][stage]["count"], 9)
+
+    def test_prometheus_exporter(self):
+        self.registry.counter("frames_total").inc()
+        with PrometheusExporter(self.registry, port=0) as exporter:
+            with urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics") as response:
+                body = response.read().decode()
+        self.assertIn("py_motion_detector_frames_total 1", body)
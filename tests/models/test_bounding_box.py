@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+from py_motion_detector.models.bounding_box import BoundingBox, BoundingBoxArray
+
+
+class TestBoundingBoxArray(unittest.TestCase):
+    def setUp(self):
+        self.bounding_boxes = [
+            BoundingBox(top=0, left=0, bottom=10, right=10),
+            BoundingBox(top=5, left=5, bottom=15, right=25),
+            BoundingBox(top=100, left=100, bottom=101, right=102),
+        ]
+        self.bba = BoundingBoxArray.from_bounding_boxes(self.bounding_boxes)
+
+    def test_backward_compatibility(self):
+        self.assertEqual(len(self.bba), 3)
+        self.assertEqual(list(self.bba), self.bounding_boxes)
+        self.assertEqual(self.bba, self.bounding_boxes)
+        self.assertEqual(self.bba[1], self.bounding_boxes[1])
+        self.assertEqual(BoundingBoxArray(), [])
+        self.assertFalse(BoundingBoxArray())
+        self.assertTrue(self.bba)
+
+    def test_vectorized_properties(self):
+        np.testing.assert_array_equal(self.bba.width, [bb.width for bb in self.bounding_boxes])
+        np.testing.assert_array_equal(self.bba.height, [bb.height for bb in self.bounding_boxes])
+        np.testing.assert_array_equal(self.bba.area, [bb.area for bb in self.bounding_boxes])
+        np.testing.assert_array_equal(self.bba.centers[0], [5, 5])
+
+    def test_filter(self):
+        self.assertEqual(self.bba.filter(self.bba.area >= 100), self.bounding_boxes[:2])
+        self.assertEqual(self.bba[self.bba.area < 100], self.bounding_boxes[2:])
+
+    def test_from_xywh(self):
+        bba = BoundingBoxArray.from_xywh(np.array([[5, 5, 20, 10]]))
+        self.assertEqual(bba, [self.bounding_boxes[1]])
+        self.assertEqual(len(BoundingBoxArray.from_xywh(np.array([]))), 0)
+
+    def test_iou(self):
+        iou = self.bba.iou(self.bba)
+        self.assertEqual(iou.shape, (3, 3))
+        np.testing.assert_allclose(np.diag(iou), 1.0)
+        self.assertAlmostEqual(iou[0, 1], 25 / (100 + 200 - 25))
+        self.assertEqual(iou[0, 2], 0.0)
+
+    def test_serialization(self):
+        dicts = self.bba.to_dicts()
+        self.assertEqual(dicts, [bb.to_dict() for bb in self.bounding_boxes])
+        self.assertEqual(BoundingBoxArray.from_dicts(dicts), self.bba)
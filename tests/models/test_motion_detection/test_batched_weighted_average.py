@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+from py_motion_detector.models.motion_detection.batched_weighted_average import BatchedMotionDetectionWeightedAverage
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+
+
+class TestBatchedMotionDetectionWeightedAverage(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.n_streams = 3
+        background = rng.integers(0, 60, (self.n_streams, 120, 160, 3), dtype=np.uint8)
+        self.batches = []
+        for i in range(6):
+            frames = background.copy()
+            # squares moving at different speeds, touching the top and bottom borders of the streams
+            frames[0, 0:40, 10 * i : 10 * i + 40] = 220
+            frames[1, 80:120, 20 * i : 20 * i + 30] = 200
+            frames[2, 50:70, 100:110] = 50 * i
+            self.batches.append(list(frames))
+
+    def test_same_bounding_boxes_as_one_model_per_stream(self):
+        kwargs = {"min_area": 50, "delta_threshold": 5, "g_kernel": (11, 11), "dil_iters": 4}
+        batched = BatchedMotionDetectionWeightedAverage(self.n_streams, **kwargs)
+        models = [MotionDetectionWeightedAverage(**kwargs) for _ in range(self.n_streams)]
+
+        n_boxes = 0
+        for frames in self.batches:
+            batched_bbs = batched.next_frames(frames)
+            self.assertEqual(len(batched_bbs), self.n_streams)
+            for model, frame, bbs in zip(models, frames, batched_bbs, strict=True):
+                expected = model.next_frame(frame)
+                self.assertEqual(sorted(bbs.to_list(), key=str), sorted(expected.to_list(), key=str))
+                n_boxes += len(expected)
+        self.assertGreater(n_boxes, 0)
+
+    def test_stream_views_are_not_copied(self):
+        batched = BatchedMotionDetectionWeightedAverage(self.n_streams, min_area=50)
+        for frames in self.batches:
+            views = batched.stream_views(frames[0].shape)
+            for view, frame in zip(views, frames, strict=True):
+                view[:] = frame
+            batched.next_frames(views)
+        np.testing.assert_array_equal(batched.stream_views(self.batches[0][0].shape)[1], self.batches[-1][1])
+
+    def test_wrong_number_of_frames(self):
+        with self.assertRaises(ValueError):
+            BatchedMotionDetectionWeightedAverage(self.n_streams).next_frames(self.batches[0][:2])
+
+    def test_frames_too_small_for_the_padding(self):
+        with self.assertRaises(ValueError):
+            BatchedMotionDetectionWeightedAverage(1).next_frames([np.zeros((8, 8, 3), dtype=np.uint8)])
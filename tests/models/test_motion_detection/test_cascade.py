@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+from py_motion_detector.input_sources.synthetic import SyntheticFrameProvider
+from py_motion_detector.instrumentation.metrics import MetricsRegistry
+from py_motion_detector.models.motion_detection.cascade import CascadeMotionDetection
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+
+
+class CountingModel(MotionDetectionWeightedAverage):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def next_frame(self, frame: np.array):
+        self.calls += 1
+        return super().next_frame(frame)
+
+
+class TestCascadeMotionDetection(unittest.TestCase):
+    def setUp(self):
+        still = SyntheticFrameProvider(120, 160, n_objects=0)
+        moving = SyntheticFrameProvider(120, 160, n_objects=2)
+        # motion in the frames 40 to 59 only
+        self.frames = [moving.frame(i) if 40 <= i < 60 else still.frame(i) for i in range(100)]
+        self.kwargs = {"min_area": 50, "g_kernel": (11, 11), "dil_iters": 4}
+
+    def test_full_model_only_runs_on_motion(self):
+        model = CountingModel(**self.kwargs)
+        cascade = CascadeMotionDetection(model, thumbnail_size=32, hold_frames=2, metrics_registry=MetricsRegistry())
+        reference = MotionDetectionWeightedAverage(**self.kwargs)
+
+        for i, frame in enumerate(self.frames):
+            bbs, expected = cascade.next_frame(frame), reference.next_frame(frame)
+            if 40 <= i < 60:
+                # the full model sees every frame with motion, with the same background as the reference
+                self.assertEqual(bbs, expected, i)
+        self.assertLess(model.calls, 40)
+        self.assertEqual(model.calls, cascade.full_model_frames)
+
+        report = cascade.report()
+        self.assertEqual(report["frames"], 100)
+        self.assertLess(report["gate_hit_rate"], 0.4)
+        self.assertGreater(report["estimated_saving"], 0)
+
+    def test_max_skipped_frames(self):
+        model = CountingModel(**self.kwargs)
+        cascade = CascadeMotionDetection(model, hold_frames=0, max_skipped_frames=9, metrics_registry=MetricsRegistry())
+        for frame in self.frames[:40]:
+            cascade.next_frame(frame)
+        # the first frame, then one frame out of 10
+        self.assertEqual(model.calls, 4)
+        self.assertEqual(cascade.gate_hits, 1)
+
+    def test_metrics(self):
+        registry = MetricsRegistry()
+        cascade = CascadeMotionDetection(MotionDetectionWeightedAverage(**self.kwargs), metrics_registry=registry)
+        for frame in self.frames:
+            cascade.next_frame(frame)
+        counters = registry.snapshot()["counters"]
+        skipped = counters['cascade_skipped_frames_total{model="CascadeMotionDetection"}']
+        full = counters['cascade_full_model_frames_total{model="CascadeMotionDetection"}']
+        self.assertEqual(skipped + full, 100)
+        self.assertEqual(full, cascade.full_model_frames)
+        gauges = registry.snapshot()["gauges"]
+        self.assertEqual(gauges['cascade_gate_hit_rate{model="CascadeMotionDetection"}'], cascade.gate_hit_rate)
+        saving = gauges['cascade_estimated_saving{model="CascadeMotionDetection"}']
+        self.assertAlmostEqual(saving, cascade.report()["estimated_saving"], delta=0.05)
+        self.assertGreater(saving, 0)
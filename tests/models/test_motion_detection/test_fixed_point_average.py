@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+from py_motion_detector.input_sources.synthetic import SyntheticFrameProvider
+from py_motion_detector.models.motion_detection.fixed_point_average import MotionDetectionFixedPointAverage
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+
+
+class TestMotionDetectionFixedPointAverage(unittest.TestCase):
+    def setUp(self):
+        self.frames = list(SyntheticFrameProvider(240, 320, n_frames=60, n_objects=4, seed=1).frames())
+        self.kwargs = {"min_area": 200, "g_kernel": (11, 11), "dil_iters": 4}
+
+    def test_equivalent_to_the_float_model(self):
+        fixed_point = MotionDetectionFixedPointAverage(acc_shift=2, **self.kwargs)
+        floating_point = MotionDetectionWeightedAverage(acc_weight=0.25, **self.kwargs)
+
+        same_count = 0
+        for i, frame in enumerate(self.frames):
+            bbs, expected = fixed_point.next_frame(frame), floating_point.next_frame(frame)
+            if i == 0:
+                continue
+            # the rounded backgrounds differ by at most one grey level
+            delta = np.abs(fixed_point._background.astype(np.int16) - floating_point._background.astype(np.int16))
+            self.assertLessEqual(delta.max(), 1)
+            if len(bbs) != len(expected):
+                continue
+            same_count += 1
+            if len(bbs) > 0:
+                self.assertTrue(np.all(bbs.iou(expected).max(axis=1) >= 0.9))
+        self.assertGreaterEqual(same_count, 0.95 * (len(self.frames) - 1))
+
+    def test_last_frame_only_is_exact(self):
+        fixed_point = MotionDetectionFixedPointAverage(acc_shift=0, **self.kwargs)
+        floating_point = MotionDetectionWeightedAverage(acc_weight=1.0, **self.kwargs)
+        for frame in self.frames:
+            self.assertEqual(fixed_point.next_frame(frame), floating_point.next_frame(frame))
+
+    def test_background_is_uint16(self):
+        model = MotionDetectionFixedPointAverage(**self.kwargs)
+        for frame in self.frames[:3]:
+            model.next_frame(frame)
+        self.assertEqual(model._weighted_average_image.dtype, np.uint16)
+
+    def test_invalid_shift(self):
+        self.assertRaises(ValueError, MotionDetectionFixedPointAverage, acc_shift=8)
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+from py_motion_detector.models.bounding_box import BoundingBox
+from py_motion_detector.models.motion_detection.roi import RegionOfInterest
+from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
+
+
+class TestRegionOfInterest(unittest.TestCase):
+    def setUp(self):
+        self.frame_shape = (400, 600, 3)
+        self.frame_zeros = np.zeros(self.frame_shape, dtype=np.uint8)
+        self.frame_motion = self.frame_zeros.copy()
+        self.frame_motion[50:100, 50:100] = 255  # outside of the region of interest
+        self.frame_motion[250:300, 350:400] = 255  # inside of the region of interest
+        self.frame_motion[200:230, 500:530] = 255  # inside of the excluded region
+        self.roi = RegionOfInterest(
+            include=[[(300, 200), (599, 200), (599, 399), (300, 399)]],
+            exclude=[[(480, 180), (560, 180), (560, 250), (480, 250)]],
+        )
+
+    def test_crop_rect(self):
+        self.assertEqual(self.roi.crop_rect(self.frame_shape), (200, 300, 400, 600))
+        self.assertEqual(RegionOfInterest().crop_rect(self.frame_shape), (0, 0, 400, 600))
+
+    def test_normalized_polygons(self):
+        roi = RegionOfInterest(include=[[(0.5, 0.5), (1.0, 0.5), (1.0, 1.0), (0.5, 1.0)]], normalized=True)
+        self.assertEqual(roi.crop_rect(self.frame_shape), (200, 300, 400, 600))
+
+    def test_mask(self):
+        mask = self.roi.mask(self.frame_shape, (200, 300))
+        self.assertEqual(mask.shape, (200, 300))
+        self.assertEqual(mask[100, 100], 255)
+        self.assertEqual(mask[20, 220], 0)
+        self.assertEqual(mask.dtype, np.uint8)
+        self.assertEqual(self.roi.mask(self.frame_shape, (100, 150)).shape, (100, 150))
+        self.assertIsNone(RegionOfInterest().mask(self.frame_shape, (200, 300)))
+
+    def test_model_with_roi(self):
+        for detection_size in (None, 150):
+            model = MotionDetectionWeightedAverage(
+                min_area=100, g_kernel=(1, 1), dil_iters=0, roi=self.roi, detection_size=detection_size
+            )
+            model.next_frame(self.frame_zeros)
+            bbs = model.next_frame(self.frame_motion)
+            self.assertEqual(bbs, [BoundingBox(top=250, left=350, bottom=300, right=400)])
+
+    def test_roi_outside_of_the_frame(self):
+        roi = RegionOfInterest(include=[[(700, 500), (800, 500), (800, 600)]])
+        self.assertTrue(roi.is_empty(self.frame_shape))
+        self.assertFalse(self.roi.is_empty(self.frame_shape))
+
+        model = MotionDetectionWeightedAverage(roi=roi)
+        model.next_frame(self.frame_zeros)
+        self.assertEqual(model.next_frame(self.frame_motion), [])
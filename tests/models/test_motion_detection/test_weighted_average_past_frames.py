@@ -1,6 +1,8 @@
 import unittest
 
+import cv2
 import numpy as np
+from py_motion_detector.models.bounding_box import BoundingBox
 from py_motion_detector.models.motion_detection.weighted_average_past_frames import MotionDetectionWeightedAverage
 
 
@@ -47,3 +49,74 @@ class TestMotionDetectionWeightedAverage(unittest.TestCase):
         for frame in frames:
             bbs = motion_detection_model.next_frame(frame)
             self.assertEqual(bbs, [])
+
+    def test_next_frame_reuses_buffers(self):
+        self.motion_detection_model.next_frame(self.frame_zeros)
+        thresh = self.motion_detection_model._thresh
+        self.motion_detection_model.next_frame(self.frame_ones)
+        self.assertIs(self.motion_detection_model._thresh, thresh)
+        self.assertEqual(self.motion_detection_model._weighted_average_image.dtype, np.float32)
+
+    def test_next_frame_shape_change_restarts_background(self):
+        frames = [self.frame_zeros, self.frame_zeros, self.frame_ones[:400]]
+        for frame in frames:
+            bbs = self.motion_detection_model.next_frame(frame)
+            self.assertEqual(bbs, [])
+
+    def test_next_frame_detection_size(self):
+        frame_shape = (600, 800, 3)
+        frame_zeros = np.zeros(frame_shape, dtype=np.uint8)
+        frame_square = frame_zeros.copy()
+        frame_square[200:400, 300:500] = 255
+
+        models = [MotionDetectionWeightedAverage(dil_iters=0, g_kernel=(1, 1))]
+        models.append(MotionDetectionWeightedAverage(dil_iters=0, g_kernel=(1, 1), detection_size=200))
+        for model in models:
+            model.next_frame(frame_zeros)
+            bbs = model.next_frame(frame_square)
+            self.assertEqual(bbs, [BoundingBox(top=200, left=300, bottom=400, right=500)])
+
+    def test_next_frame_detection_size_min_area_in_input_pixels(self):
+        frame_zeros = np.zeros((600, 800, 3), dtype=np.uint8)
+        frame_square = frame_zeros.copy()
+        frame_square[200:300, 300:400] = 255
+        for min_area, n_bbs in [(90 * 90, 1), (110 * 110, 0)]:
+            model = MotionDetectionWeightedAverage(min_area=min_area, g_kernel=(1, 1), dil_iters=0, detection_size=200)
+            model.next_frame(frame_zeros)
+            self.assertEqual(len(model.next_frame(frame_square)), n_bbs)
+
+    def test_components_blob_extraction(self):
+        frame_zeros = np.zeros((200, 300, 3), dtype=np.uint8)
+        frame_squares = frame_zeros.copy()
+        frame_squares[10:60, 20:90] = 255
+        frame_squares[100:190, 150:160] = 255
+        frame_squares[150:155, 20:25] = 255  # smaller than min_area
+
+        expected = [
+            BoundingBox(top=10, left=20, bottom=60, right=90),
+            BoundingBox(top=100, left=150, bottom=190, right=160),
+        ]
+        for blob_extraction in ("contours", "components"):
+            model = MotionDetectionWeightedAverage(
+                min_area=100, g_kernel=(1, 1), dil_iters=0, blob_extraction=blob_extraction
+            )
+            model.next_frame(frame_zeros)
+            bbs = model.next_frame(frame_squares)
+            self.assertEqual(sorted(bbs.to_list(), key=str), sorted(expected, key=str), blob_extraction)
+
+    def test_components_same_boxes_as_contours_on_noise(self):
+        rng = np.random.default_rng(0)
+        mask = np.where(rng.random((240, 320)) > 0.995, 255, 0).astype(np.uint8)
+        mask = cv2.dilate(mask, None, iterations=2)
+        # the areas are not compared: contour areas are smaller than pixel counts by about half the perimeter
+        model = MotionDetectionWeightedAverage(min_area=0)
+        model.next_frame(np.zeros((240, 320), dtype=np.uint8))  # allocates the buffers
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        expected = model.bounding_boxes_from_contours(contours)
+        bbs = model.bounding_boxes_from_components(mask)
+        self.assertGreater(len(expected), 50)
+        self.assertEqual(sorted(bbs.to_list(), key=str), sorted(expected.to_list(), key=str))
+
+    def test_unknown_blob_extraction(self):
+        self.assertRaises(ValueError, MotionDetectionWeightedAverage, blob_extraction="watershed")
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+from py_motion_detector.input_sources.shared_memory import SharedMemoryFrameProvider
+from py_motion_detector.multi_source.shared_memory_ring import SharedMemoryFrameRing
+
+
+class TestSharedMemoryFrameRing(unittest.TestCase):
+    def setUp(self):
+        self.ring = SharedMemoryFrameRing.create((8, 10, 3), n_slots=3)
+        self.reader = SharedMemoryFrameRing.attach(self.ring.name, (8, 10, 3), n_slots=3)
+
+    def tearDown(self):
+        self.reader.close()
+        self.ring.close()
+        self.ring.unlink()
+
+    def test_empty_ring_has_no_frame(self):
+        self.assertEqual(self.reader.read_latest(0), (0, None))
+
+    def test_reader_sees_the_most_recent_frame(self):
+        for i in range(5):
+            self.ring.write(np.full((8, 10, 3), i, dtype=np.uint8))
+
+        seq, frame = self.reader.read_latest(last_seq=1)
+        self.assertEqual(seq, 5)
+        np.testing.assert_array_equal(frame, 4)
+        self.assertEqual(self.reader.read_latest(last_seq=seq), (5, None))
+
+    def test_at_least_two_slots(self):
+        self.assertRaises(ValueError, SharedMemoryFrameRing.create, (8, 10, 3), n_slots=1)
+
+    def test_unreadable_slot_does_not_block_the_reader(self):
+        seq = self.ring.write(np.zeros((8, 10, 3), dtype=np.uint8))
+        self.ring._slot_seqs[seq % self.ring.n_slots] = -1  # a writer killed while overwriting the slot
+
+        self.assertEqual(self.reader.read_latest(last_seq=0), (0, None))
+        self.assertEqual(self.reader.wait_latest(last_seq=0, timeout_sec=0.01), (0, None))
+
+    def test_frames_are_copied_out_of_the_ring(self):
+        self.ring.write(np.zeros((8, 10, 3), dtype=np.uint8))
+        _, frame = self.reader.read_latest()
+        self.ring.write(np.ones((8, 10, 3), dtype=np.uint8))
+        self.ring.write(np.ones((8, 10, 3), dtype=np.uint8))
+        self.ring.write(np.ones((8, 10, 3), dtype=np.uint8))
+
+        np.testing.assert_array_equal(frame, 0)
+
+    def test_closed_flag_is_shared(self):
+        self.assertFalse(self.reader.closed)
+        self.ring.closed = True
+        self.assertTrue(self.reader.closed)
+        self.assertEqual(self.reader.wait_latest(0, timeout_sec=10), (0, None))
+
+
+class TestSharedMemoryFrameProvider(unittest.TestCase):
+    def test_yields_frames_until_the_ring_is_closed(self):
+        ring = SharedMemoryFrameRing.create((8, 10, 3), n_slots=2)
+        try:
+            for i in range(4):
+                ring.write(np.full((8, 10, 3), i, dtype=np.uint8))
+            ring.closed = True
+
+            provider = SharedMemoryFrameProvider(ring.name, (8, 10, 3), n_slots=2)
+            with provider as smfp:
+                frames = list(smfp.frames())
+        finally:
+            ring.close()
+            ring.unlink()
+
+        self.assertEqual(len(frames), 1)
+        np.testing.assert_array_equal(frames[0], 3)
+        self.assertEqual(provider.read_frames, 1)
@@ -0,0 +1,70 @@
+import functools
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Iterator
+
+import numpy as np
+from py_motion_detector.input_sources.base import FrameProviderABC
+from py_motion_detector.multi_source.supervisor import MultiSourceSupervisor, PipelineSpec
+
+
+class SlowFrameProvider(FrameProviderABC):
+    """Yields random frames at about 100 fps. Fails once if `fail_marker` does not exist."""
+
+    def __init__(self, n_frames: int, fail_marker: Path | None = None):
+        self.n_frames = n_frames
+        self.fail_marker = fail_marker
+
+    @property
+    def resize_to(self) -> int | None:
+        return None
+
+    def __enter__(self):
+        if self.fail_marker is not None and not self.fail_marker.exists():
+            self.fail_marker.touch()
+            raise RuntimeError("camera not ready")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def frames(self) -> Iterator[np.array]:
+        rng = np.random.default_rng(0)
+        for _ in range(self.n_frames):
+            time.sleep(0.01)
+            yield rng.integers(0, 255, (24, 32, 3), dtype=np.uint8)
+
+
+class TestMultiSourceSupervisor(unittest.TestCase):
+    def test_runs_every_source_and_restarts_failed_workers(self):
+        with TemporaryDirectory() as tmp_dir:
+            supervisor = MultiSourceSupervisor(
+                [
+                    PipelineSpec("a", functools.partial(SlowFrameProvider, 100), frame_shape=(24, 32, 3)),
+                    PipelineSpec(
+                        "b",
+                        functools.partial(SlowFrameProvider, 100, Path(tmp_dir) / "failed"),
+                        frame_shape=(12, 16, 3),
+                    ),
+                ],
+                restart_backoff_sec=0.1,
+                report_interval_sec=0.1,
+            )
+            supervisor.run()
+
+        metrics = supervisor.metrics()
+        self.assertGreater(metrics["sources"]["a"]["processed_frames"], 0)
+        self.assertGreater(metrics["sources"]["b"]["processed_frames"], 0)
+        self.assertEqual(
+            metrics["total"]["processed_frames"],
+            metrics["sources"]["a"]["processed_frames"] + metrics["sources"]["b"]["processed_frames"],
+        )
+        self.assertEqual(metrics["restarts"], {"a/pipeline": 0, "a/capture": 0, "b/pipeline": 0, "b/capture": 1})
+        self.assertFalse(supervisor.is_running)
+
+    def test_source_names_need_to_be_unique(self):
+        spec = PipelineSpec("a", functools.partial(SlowFrameProvider, 1), frame_shape=(24, 32, 3))
+        with self.assertRaises(ValueError):
+            MultiSourceSupervisor([spec, spec])
@@ -0,0 +1,68 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import cv2
+import numpy as np
+from py_motion_detector.offline.analysis import OfflineVideoAnalyzer, merge_events, split_into_chunks
+from py_motion_detector.storage.bounding_box_log import BoundingBoxLogReader
+
+
+def write_video(path: Path, n_frames: int, moving: list[range]) -> None:
+    """A static background with a square moving during the `moving` frame ranges."""
+    background = np.random.default_rng(0).integers(0, 80, (96, 128, 3), dtype=np.uint8)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (128, 96))
+    for i in range(n_frames):
+        frame = background.copy()
+        if any(i in frames for frames in moving):
+            frame[30:60, (i * 3) % 90 : (i * 3) % 90 + 30] = 255
+        writer.write(frame)
+    writer.release()
+
+
+class TestOfflineVideoAnalyzer(unittest.TestCase):
+    def test_parallel_analysis_matches_a_single_chunk(self):
+        with TemporaryDirectory() as tmp_dir:
+            video = Path(tmp_dir) / "video.avi"
+            write_video(video, 200, [range(45, 70), range(140, 160)])
+
+            sequential = OfflineVideoAnalyzer(video, workers=1, chunk_sec=1000, max_gap_sec=0.5)
+            parallel = OfflineVideoAnalyzer(video, workers=2, chunk_sec=5, warmup_sec=3, max_gap_sec=0.5)
+            sequential_events = sequential.run()
+            parallel_events = parallel.run(bounding_box_log_path=Path(tmp_dir) / "boxes.bbl")
+
+            self.assertEqual(len(parallel_events), 2)
+            self.assertEqual([e.to_dict() for e in parallel_events], [e.to_dict() for e in sequential_events])
+            self.assertEqual(parallel_events[0].start_frame, 45)
+            self.assertEqual(parallel_events[1].start_sec, 14.0)
+
+            reader = BoundingBoxLogReader(Path(tmp_dir) / "boxes.bbl")
+            self.assertEqual(len(reader), len(parallel.detections))
+            self.assertEqual(reader.frame(0)[:2], (4500, 45))
+
+    def test_parallel_analysis_with_a_stride(self):
+        with TemporaryDirectory() as tmp_dir:
+            video = Path(tmp_dir) / "video.avi"
+            write_video(video, 200, [range(45, 70), range(140, 160)])
+
+            sequential = OfflineVideoAnalyzer(video, workers=1, chunk_sec=1000, stride=3).run()
+            parallel = OfflineVideoAnalyzer(video, workers=2, chunk_sec=5, warmup_sec=3, stride=3).run()
+
+        self.assertEqual(len(parallel), 2)
+        self.assertEqual([e.to_dict() for e in parallel], [e.to_dict() for e in sequential])
+        self.assertEqual(parallel[0].start_frame % 3, 0)
+
+
+class TestChunks(unittest.TestCase):
+    def test_split_into_chunks(self):
+        chunks = split_into_chunks(250, 100, 10)
+        self.assertEqual(
+            [(c.start_frame, c.end_frame, c.warmup_frames) for c in chunks],
+            [(0, 100, 0), (100, 200, 10), (200, None, 10)],
+        )
+
+    def test_merge_events(self):
+        box = np.array([[0, 0, 10, 10]])
+        events = merge_events([(1, box), (3, box + 5), (10, box)], fps=10.0, max_gap_frames=1)
+        self.assertEqual([(e.start_frame, e.end_frame, e.n_frames) for e in events], [(1, 3, 2), (10, 10, 1)])
+        self.assertEqual(events[0].bounding_box, (0, 0, 15, 15))
@@ -0,0 +1,93 @@
+import unittest
+
+import numpy as np
+from py_motion_detector.models.bounding_box import BoundingBox, BoundingBoxArray
+from py_motion_detector.post_processing.box_merger import BoundingBoxMerger, box_gaps, connected_groups
+
+
+class TestConnectedGroups(unittest.TestCase):
+    def test_chain_is_a_single_group(self):
+        # 0 - 3 - 1 - 4 and 2 alone: the smallest label needs to travel along the chain
+        adjacency = np.eye(5, dtype=bool)
+        for i, j in [(0, 3), (3, 1), (1, 4)]:
+            adjacency[i, j] = adjacency[j, i] = True
+        np.testing.assert_array_equal(connected_groups(adjacency), [0, 0, 1, 0, 0])
+
+    def test_no_edges(self):
+        np.testing.assert_array_equal(connected_groups(np.zeros((3, 3), dtype=bool)), [0, 1, 2])
+
+
+class TestBoxGaps(unittest.TestCase):
+    def test_gaps(self):
+        bbs = BoundingBoxArray(np.array([[0, 0, 10, 10], [5, 5, 15, 15], [0, 13, 10, 20], [30, 40, 40, 50]]))
+        gaps = box_gaps(bbs)
+        self.assertEqual(gaps[0, 1], 0)
+        self.assertEqual(gaps[0, 2], 3)
+        self.assertEqual(gaps[2, 0], 3)
+        # the largest of the vertical (20) and horizontal (30) gaps
+        self.assertEqual(gaps[0, 3], 30)
+        np.testing.assert_array_equal(np.diag(gaps), 0)
+
+
+class TestBoundingBoxMerger(unittest.TestCase):
+    def setUp(self):
+        self.frame = np.zeros((100, 100), dtype=np.uint8)
+        self.bbs = BoundingBoxArray(
+            np.array([[0, 0, 10, 10], [5, 5, 15, 15], [0, 12, 4, 20], [50, 50, 60, 60], [80, 80, 90, 90]])
+        )
+
+    def test_merge_overlapping(self):
+        merged = BoundingBoxMerger().process(self.frame, self.bbs[[0, 1, 3]])
+        self.assertEqual(merged.to_list(), [BoundingBox(0, 0, 15, 15), BoundingBox(50, 50, 60, 60)])
+
+    def test_merge_is_repeated_on_the_merged_boxes(self):
+        # the union of the first two boxes overlaps the third one, which none of them overlaps
+        merged = BoundingBoxMerger().process(self.frame, self.bbs)
+        self.assertEqual(
+            merged.to_list(), [BoundingBox(0, 0, 15, 20), BoundingBox(50, 50, 60, 60), BoundingBox(80, 80, 90, 90)]
+        )
+
+    def test_merge_close_boxes(self):
+        merged = BoundingBoxMerger(max_gap=20).process(self.frame, self.bbs)
+        self.assertEqual(merged.to_list(), [BoundingBox(0, 0, 15, 20), BoundingBox(50, 50, 90, 90)])
+
+    def test_iou_threshold(self):
+        # the IoU of the first two boxes is 25 / 175
+        self.assertEqual(len(BoundingBoxMerger(iou_threshold=0.15).process(self.frame, self.bbs)), 5)
+        self.assertEqual(len(BoundingBoxMerger(iou_threshold=0.14).process(self.frame, self.bbs)), 4)
+
+    def test_suppress_keeps_the_largest_box(self):
+        bbs = BoundingBoxArray(np.array([[0, 0, 10, 10], [2, 2, 20, 20], [50, 50, 60, 60]]))
+        suppressed = BoundingBoxMerger(mode="suppress").process(self.frame, bbs)
+        self.assertEqual(suppressed.to_list(), [BoundingBox(2, 2, 20, 20), BoundingBox(50, 50, 60, 60)])
+
+    def test_list_and_empty_input(self):
+        merged = BoundingBoxMerger().process(self.frame, self.bbs.to_list()[:2])
+        self.assertEqual(merged, [BoundingBox(0, 0, 15, 15)])
+        self.assertEqual(len(BoundingBoxMerger().process(self.frame, [])), 0)
+
+    def test_many_boxes(self):
+        rng = np.random.default_rng(0)
+        top_left = rng.integers(0, 1000, (500, 2))
+        bbs = BoundingBoxArray(np.concatenate([top_left, top_left + rng.integers(1, 30, (500, 2))], axis=1))
+        merged = BoundingBoxMerger().process(self.frame, bbs)
+        self.assertLess(len(merged), len(bbs))
+        # no two merged boxes overlap and every input box is inside a merged box
+        iou = merged.iou(merged)
+        np.fill_diagonal(iou, 0)
+        self.assertEqual(iou.max(), 0)
+        a, b = bbs.data[:, None, :], merged.data[None, :, :]
+        inside = (
+            (a[..., 0] >= b[..., 0]) & (a[..., 1] >= b[..., 1]) & (a[..., 2] <= b[..., 2]) & (a[..., 3] <= b[..., 3])
+        )
+        self.assertTrue(inside.any(axis=1).all())
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            BoundingBoxMerger(iou_threshold=None, max_gap=None)
+        with self.assertRaises(ValueError):
+            BoundingBoxMerger(mode="average")
+
+
+if __name__ == '__main__':
+    unittest.main()
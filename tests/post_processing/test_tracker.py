@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+from py_motion_detector.models.bounding_box import BoundingBoxArray, TrackedBoundingBoxArray
+from py_motion_detector.post_processing.tracker import BoundingBoxTracker, greedy_matches
+
+
+def boxes(*rows) -> BoundingBoxArray:
+    return BoundingBoxArray(np.array(rows).reshape(-1, 4))
+
+
+class TestGreedyMatches(unittest.TestCase):
+    def test_matches_by_increasing_cost(self):
+        costs = np.array([[1.0, 2.0], [0.5, np.inf], [np.inf, np.inf]])
+        rows, cols = greedy_matches(costs)
+        self.assertEqual(sorted(zip(rows.tolist(), cols.tolist())), [(0, 1), (1, 0)])
+
+    def test_empty(self):
+        rows, cols = greedy_matches(np.zeros((0, 3)))
+        self.assertEqual(len(rows), 0)
+        self.assertEqual(len(cols), 0)
+
+
+class TestBoundingBoxTracker(unittest.TestCase):
+    def setUp(self):
+        self.frame = np.zeros((200, 200), dtype=np.uint8)
+        self.tracker = BoundingBoxTracker(iou_threshold=0.2, max_distance=30, max_missed_frames=2)
+
+    def test_ids_follow_moving_boxes(self):
+        first = self.tracker.process(self.frame, boxes([0, 0, 20, 20], [100, 100, 120, 120]))
+        self.assertIsInstance(first, TrackedBoundingBoxArray)
+        np.testing.assert_array_equal(first.track_ids, [0, 1])
+        # the boxes are returned in a different order, the second one moved too far to overlap its last position
+        second = self.tracker.process(self.frame, boxes([100, 125, 120, 145], [2, 2, 22, 22]))
+        np.testing.assert_array_equal(second.track_ids, [1, 0])
+        self.assertEqual(second, boxes([100, 125, 120, 145], [2, 2, 22, 22]))
+
+    def test_new_and_ended_tracks(self):
+        self.tracker.process(self.frame, boxes([0, 0, 20, 20]))
+        np.testing.assert_array_equal(self.tracker.process(self.frame, boxes([150, 150, 170, 170])).track_ids, [1])
+        # the first track is kept while it is missed for at most 2 frames
+        np.testing.assert_array_equal(self.tracker.active_track_ids, [1, 0])
+        np.testing.assert_array_equal(self.tracker.process(self.frame, boxes([0, 0, 20, 20])).track_ids, [0])
+        for _ in range(3):
+            self.tracker.process(self.frame, [])
+        self.assertEqual(len(self.tracker.active_track_ids), 0)
+        np.testing.assert_array_equal(self.tracker.process(self.frame, boxes([0, 0, 20, 20])).track_ids, [2])
+
+    def test_overlap_preferred_over_distance(self):
+        self.tracker.process(self.frame, boxes([0, 0, 20, 20]))
+        # both boxes are close enough, only the second one overlaps the track
+        tracked = self.tracker.process(self.frame, boxes([0, 22, 20, 42], [5, 5, 25, 25]))
+        np.testing.assert_array_equal(tracked.track_ids, [1, 0])
+
+
+class TestTrackedBoundingBoxArray(unittest.TestCase):
+    def test_ids_are_kept(self):
+        tracked = TrackedBoundingBoxArray(np.array([[0, 0, 10, 10], [0, 0, 30, 30]]), track_ids=[3, 7])
+        np.testing.assert_array_equal(tracked.filter(tracked.area > 100).track_ids, [7])
+        np.testing.assert_array_equal(tracked[::-1].track_ids, [7, 3])
+        np.testing.assert_array_equal(tracked.copy().track_ids, [3, 7])
+        np.testing.assert_array_equal(tracked.translate(5, 5).track_ids, [3, 7])
+        self.assertEqual(tracked.translate(5, 5).data[0].tolist(), [5, 5, 15, 15])
+        np.testing.assert_array_equal(TrackedBoundingBoxArray(np.zeros((2, 4))).track_ids, [-1, -1])
+        with self.assertRaises(ValueError):
+            TrackedBoundingBoxArray(np.zeros((2, 4)), track_ids=[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
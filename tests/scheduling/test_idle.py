@@ -0,0 +1,40 @@
+import unittest
+
+from py_motion_detector.scheduling.idle import AdaptiveIdleScheduler
+
+from tests.common.fake_clock import FakeClock
+
+
+class TestAdaptiveIdleScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = AdaptiveIdleScheduler(quiet_period_sec=10, idle_fps=1, clock=self.clock)
+
+    def _run(self, seconds: float, fps: float, motion: bool = False) -> int:
+        processed = 0
+        for _ in range(int(seconds * fps)):
+            if self.scheduler.should_process():
+                processed += 1
+                self.scheduler.update(motion_detected=motion)
+            self.clock.now += 1 / fps
+        return processed
+
+    def test_processes_every_frame_while_active(self):
+        self.assertEqual(self._run(5, fps=8), 40)
+        self.assertFalse(self.scheduler.is_idle)
+        self.assertIsNone(self.scheduler.current_fps)
+
+    def test_idle_after_quiet_period(self):
+        self._run(10.25, fps=8)
+        self.assertTrue(self.scheduler.is_idle)
+        self.assertEqual(self.scheduler.current_fps, 1)
+        self.assertEqual(self._run(10, fps=8), 10)
+        self.assertEqual(self.scheduler.transitions, 1)
+
+    def test_back_to_full_rate_on_motion(self):
+        self._run(11, fps=8)
+        self.assertTrue(self.scheduler.is_idle)
+        self._run(1, fps=8, motion=True)
+        self.assertFalse(self.scheduler.is_idle)
+        self.assertEqual(self.scheduler.metrics()["transitions"], 2)
+        self.assertEqual(self._run(1, fps=8), 8)
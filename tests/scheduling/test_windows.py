@@ -0,0 +1,68 @@
+import datetime
+import unittest
+
+from py_motion_detector.scheduling.windows import ActiveWindowSchedule, TimeWindow
+
+from tests.common.fake_clock import FakeClock
+
+
+def at(hour: int, minute: int = 0, day: int = 1) -> datetime.datetime:
+    return datetime.datetime(2024, 3, day, hour, minute)
+
+
+class TestTimeWindow(unittest.TestCase):
+    def test_from_string(self):
+        self.assertEqual(
+            TimeWindow.from_string("06:00-09:30"), TimeWindow(datetime.time(6), datetime.timedelta(hours=3.5))
+        )
+        self.assertEqual(TimeWindow.from_string("22:00-06:00").duration, datetime.timedelta(hours=8))
+        self.assertRaises(ValueError, TimeWindow.from_string, "22:00")
+        self.assertRaises(ValueError, TimeWindow.from_string, "22h-6h")
+
+    def test_from_time_and_duration(self):
+        window = TimeWindow.from_time_and_duration(datetime.time(23, 30), datetime.time(1, 15))
+        self.assertEqual(window.interval(datetime.date(2024, 3, 1)), (at(23, 30), at(0, 45, day=2)))
+
+
+class TestActiveWindowSchedule(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(at(12))
+        self.schedule = ActiveWindowSchedule(
+            [TimeWindow.from_string("06:00-09:00"), TimeWindow.from_string("22:00-02:00")], clock=self.clock
+        )
+
+    def test_multiple_windows_crossing_midnight(self):
+        expected = {
+            at(1): (True, at(2)),
+            at(2): (False, at(6)),
+            at(7): (True, at(9)),
+            at(12): (False, at(22)),
+            at(23): (True, at(2, day=2)),
+        }
+        for now, (active, boundary) in expected.items():
+            self.assertEqual(self.schedule.is_active(now), active, now)
+            self.assertEqual(self.schedule.next_boundary(now), boundary, now)
+        self.assertEqual(self.schedule.seconds_until_boundary(at(21, 30)), 1800)
+
+    def test_boundary_is_computed_once(self):
+        self.assertFalse(self.schedule.is_active())
+        self.schedule._merged_intervals = None  # would fail if the boundary were computed again
+        for minute in range(60):
+            self.clock.now = at(21, minute)
+            self.assertFalse(self.schedule.is_active())
+
+    def test_clock_set_back(self):
+        self.assertTrue(self.schedule.is_active(at(8)))
+        self.assertFalse(self.schedule.is_active(at(5)))
+
+    def test_overlapping_and_full_day_windows(self):
+        schedule = ActiveWindowSchedule([TimeWindow.from_string("06:00-12:00"), TimeWindow.from_string("10:00-14:00")])
+        self.assertEqual(schedule.next_boundary(at(7)), at(14))
+        schedule = ActiveWindowSchedule([TimeWindow(datetime.time(6), datetime.timedelta(hours=24))])
+        self.assertTrue(schedule.is_active(at(3)))
+        self.assertIsNone(schedule.next_boundary(at(3)))
+
+    def test_empty_window_is_never_active(self):
+        schedule = ActiveWindowSchedule([TimeWindow(datetime.time(6), datetime.timedelta(0))])
+        self.assertFalse(schedule.is_active(at(6)))
+        self.assertIsNone(schedule.next_boundary(at(6)))
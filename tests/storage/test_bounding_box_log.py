@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from py_motion_detector.models.bounding_box import BoundingBox
+from py_motion_detector.storage.bounding_box_log import BoundingBoxLogReader, BoundingBoxLogWriter
+
+
+class TestBoundingBoxLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "bounding_boxes.bbl"
+        self.frames = [
+            (1000, 1, [BoundingBox(top=1, left=2, bottom=3, right=4)]),
+            (2000, 2, []),
+            (3000, 3, [BoundingBox(top=5, left=6, bottom=7, right=8), BoundingBox(top=0, left=0, bottom=9, right=9)]),
+        ]
+        with BoundingBoxLogWriter(self.path) as writer:
+            for timestamp, frame_ref, bbs in self.frames:
+                writer.append(timestamp, frame_ref, bbs)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read_frames(self):
+        reader = BoundingBoxLogReader(self.path)
+        self.assertEqual(len(reader), 3)
+        self.assertEqual(list(reader), self.frames)
+
+    def test_append_to_existing_log(self):
+        with BoundingBoxLogWriter(self.path) as writer:
+            writer.append(4000, 4, [BoundingBox(top=1, left=1, bottom=2, right=2)])
+        reader = BoundingBoxLogReader(self.path)
+        self.assertEqual(reader.frame(3), (4000, 4, [BoundingBox(top=1, left=1, bottom=2, right=2)]))
+        self.assertEqual(reader.frame(2), self.frames[2])
+
+    def test_append_after_partial_record(self):
+        with open(self.path, "ab") as f:
+            f.write(b"\x01\x02\x03")
+        with BoundingBoxLogWriter(self.path) as writer:
+            writer.append(4000, 4, [BoundingBox(top=1, left=1, bottom=2, right=2)])
+        reader = BoundingBoxLogReader(self.path)
+        self.assertEqual(list(reader), [*self.frames, (4000, 4, [BoundingBox(top=1, left=1, bottom=2, right=2)])])
+
+    def test_append_flushes_frames(self):
+        with BoundingBoxLogWriter(self.path) as writer:
+            writer.append(4000, 4, [BoundingBox(top=1, left=1, bottom=2, right=2)])
+            self.assertEqual(len(BoundingBoxLogReader(self.path)), 4)
+
+    def test_seek_by_timestamp(self):
+        reader = BoundingBoxLogReader(self.path)
+        self.assertEqual(reader.seek(1500), 1)
+        self.assertEqual(list(reader.between(1500, 3000)), [self.frames[1]])
+        self.assertEqual(reader.bounding_boxes_at(3000), self.frames[2][2])
+        self.assertEqual(reader.bounding_boxes_at(3001), [])
+
+    def test_rebuild_missing_index(self):
+        self.path.with_name(self.path.name + ".idx").unlink()
+        reader = BoundingBoxLogReader(self.path)
+        self.assertEqual(list(reader), [self.frames[0], self.frames[2]])
+
+    def test_empty_log(self):
+        empty_path = self.path.with_name("empty.bbl")
+        BoundingBoxLogWriter(empty_path).open().close()
+        reader = BoundingBoxLogReader(empty_path)
+        self.assertEqual(len(reader), 0)
+        self.assertEqual(reader.bounding_boxes_at(1000), [])
+
+        empty_path.with_name(empty_path.name + ".idx").unlink()
+        reader = BoundingBoxLogReader(empty_path)
+        self.assertEqual(list(reader), [])
+
+    def test_log_without_bounding_boxes(self):
+        with BoundingBoxLogWriter(self.path.with_name("no_boxes.bbl")) as writer:
+            writer.append(1000, 1, [])
+        reader = BoundingBoxLogReader(self.path.with_name("no_boxes.bbl"))
+        self.assertEqual(list(reader), [(1000, 1, [])])
+
+    def test_not_a_log_file(self):
+        self.path.write_bytes(b"not a log")
+        self.assertRaises(ValueError, BoundingBoxLogReader, self.path)
@@ -0,0 +1,129 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+from py_motion_detector.models.bounding_box import BoundingBox
+from py_motion_detector.storage.bounding_box_log import BOUNDING_BOX_LOG_FILE_NAME, BoundingBoxLogWriter
+from py_motion_detector.storage.event_index import (
+    EventIndex,
+    max_area_ratio,
+    read_jpeg_size,
+    reindex_directory,
+    reindex_tree,
+)
+
+
+class TestEventIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.index = EventIndex(self.root / "events.sqlite").open()
+        for i in range(5):
+            self.index.add(1000 * i, "a" if i < 3 else "b", self.root / f"{i}.jpg", n_boxes=i, area_ratio=i / 10)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def test_query(self):
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(self.index.sessions(), ["a", "b"])
+        self.assertEqual([f.timestamp for f in self.index.query()], [0, 1000, 2000, 3000, 4000])
+        self.assertEqual([f.timestamp for f in self.index.query(start=1000, end=3000)], [1000, 2000])
+        self.assertEqual([f.timestamp for f in self.index.query(session="b")], [3000, 4000])
+        self.assertEqual([f.timestamp for f in self.index.query(min_area_ratio=0.2, min_boxes=3)], [3000, 4000])
+        self.assertEqual([f.timestamp for f in self.index.query(limit=2)], [0, 1000])
+        self.assertEqual(self.index.query(start=4000)[0].path, self.root / "4.jpg")
+
+    def test_add_replaces_the_same_image(self):
+        self.index.add(1000, "a", self.root / "1.jpg", n_boxes=7, area_ratio=0.7)
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(self.index.query(start=1000, end=1001)[0].n_boxes, 7)
+
+    def test_rows_are_committed_by_add(self):
+        with EventIndex(self.index.path) as other:
+            self.assertEqual(len(other), 5)
+            other.add(5000, "b", self.root / "5.jpg", n_boxes=1, area_ratio=0.1)
+        self.assertFalse(self.index._connection.in_transaction)
+        self.assertEqual(len(self.index), 6)
+
+    def test_remove_under(self):
+        self.index.add(5000, "c", self.root / "c" / "5.jpg", n_boxes=1, area_ratio=0.1)
+        self.index.add(6000, "c", self.root / "cd" / "6.jpg", n_boxes=1, area_ratio=0.1)
+        self.assertEqual(self.index.remove_under(self.root / "c"), 1)
+        self.assertEqual([f.timestamp for f in self.index.query(start=5000)], [6000])
+
+
+class TestReindex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.frame = np.zeros((60, 80, 3), dtype=np.uint8)
+        self.bounding_boxes = [BoundingBox(top=0, left=0, bottom=30, right=40)]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _store_json_session(self, session: str, timestamps: list[int]) -> Path:
+        directory = self.root / session
+        directory.mkdir()
+        for timestamp in timestamps:
+            cv2.imwrite(str(directory / f"{timestamp}.jpg"), self.frame)
+            with open(directory / f"{timestamp}.json", "w") as f:
+                json.dump([bb.to_dict() for bb in self.bounding_boxes], f)
+        return directory
+
+    def test_read_jpeg_size(self):
+        cv2.imwrite(str(self.root / "progressive.jpg"), self.frame, [cv2.IMWRITE_JPEG_PROGRESSIVE, 1])
+        cv2.imwrite(str(self.root / "baseline.jpg"), self.frame)
+        self.assertEqual(read_jpeg_size(self.root / "baseline.jpg"), (60, 80))
+        self.assertEqual(read_jpeg_size(self.root / "progressive.jpg"), (60, 80))
+        (self.root / "not_a.jpg").write_bytes(b"not a jpeg")
+        self.assertRaises(ValueError, read_jpeg_size, self.root / "not_a.jpg")
+
+    def test_max_area_ratio(self):
+        self.assertEqual(max_area_ratio(self.bounding_boxes, 60, 80), 0.25)
+        self.assertEqual(max_area_ratio([], 60, 80), 0.0)
+
+    def test_reindex_is_incremental(self):
+        directory = self._store_json_session("session", [1000, 2000])
+        with EventIndex(self.root / "events.sqlite") as index:
+            self.assertEqual(reindex_directory(index, directory), 2)
+            self.assertEqual(reindex_directory(index, directory), 0)
+            cv2.imwrite(str(directory / "3000.jpg"), self.frame)
+            self.assertEqual(reindex_directory(index, directory), 1)
+
+            frames = index.query()
+            self.assertEqual([f.timestamp for f in frames], [1000, 2000, 3000])
+            self.assertEqual([f.n_boxes for f in frames], [1, 1, 0])
+            self.assertEqual(frames[0].max_area_ratio, 0.25)
+            self.assertEqual(frames[0].session, "session")
+
+    def test_reindex_tree_with_binary_log(self):
+        self._store_json_session("a", [1000])
+        directory = self.root / "b"
+        directory.mkdir()
+        cv2.imwrite(str(directory / "2000.jpg"), self.frame)
+        with BoundingBoxLogWriter(directory / BOUNDING_BOX_LOG_FILE_NAME) as writer:
+            writer.append(2000, 2000, self.bounding_boxes * 2)
+        # a session without motion only has an empty log
+        (self.root / "c").mkdir()
+        BoundingBoxLogWriter(self.root / "c" / BOUNDING_BOX_LOG_FILE_NAME).open().close()
+
+        with EventIndex(self.root / "events.sqlite") as index:
+            self.assertEqual(reindex_tree(index, self.root), 2)
+            self.assertEqual(index.sessions(), ["a", "b"])
+            self.assertEqual(index.query(session="b")[0].n_boxes, 2)
+            self.assertEqual(index.query(session="b")[0].path, directory / "2000.jpg")
+
+    def test_reindex_sharded_session(self):
+        directory = self.root / "session"
+        (directory / "2024-03-01").mkdir(parents=True)
+        for hour, timestamp in (("12", 1000), ("13", 2000)):
+            self._store_json_session(f"session/2024-03-01/{hour}", [timestamp])
+        with EventIndex(self.root / "events.sqlite") as index:
+            self.assertEqual(reindex_directory(index, directory), 2)
+            self.assertEqual([f.session for f in index.query()], ["session", "session"])
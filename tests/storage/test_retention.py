@@ -0,0 +1,101 @@
+import datetime
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from py_motion_detector.instrumentation.metrics import MetricsRegistry
+from py_motion_detector.storage.event_index import EventIndex
+from py_motion_detector.storage.retention import RetentionManager
+
+from tests.common.fake_clock import FakeClock
+
+
+class TestRetentionManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.clock = FakeClock(datetime.datetime(2024, 3, 2, 1, 30))
+        # 100 bytes per hour, from 2024-03-01 22:00 to 2024-03-02 01:00, in two sessions
+        self.shards = []
+        for session, day, hour in [
+            ("a", "2024-03-01", "22"),
+            ("b", "2024-03-01", "23"),
+            ("a", "2024-03-02", "00"),
+            ("b", "2024-03-02", "01"),
+        ]:
+            shard = self.root / session / day / hour
+            shard.mkdir(parents=True)
+            (shard / "1.jpg").write_bytes(bytes(100))
+            self.shards.append(shard)
+        (self.root / "flat").mkdir()
+        (self.root / "flat" / "1.jpg").write_bytes(bytes(1000))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _manager(self, **kwargs) -> RetentionManager:
+        return RetentionManager(self.root, clock=self.clock, metrics_registry=MetricsRegistry(), **kwargs)
+
+    def test_oldest_shards_are_evicted_first(self):
+        manager = self._manager(max_bytes=250)
+        self.assertEqual(manager.enforce(), 2)
+        self.assertEqual([shard.exists() for shard in self.shards], [False, False, True, True])
+        self.assertEqual(manager.stored_bytes, 200)
+        # the days without any hour left are deleted, the flat session is ignored
+        self.assertFalse((self.root / "a" / "2024-03-01").exists())
+        self.assertTrue((self.root / "flat" / "1.jpg").exists())
+        self.assertEqual(manager._evicted_bytes.value, 200)
+        self.assertEqual(manager.enforce(), 0)
+
+    def test_the_current_hour_is_never_evicted(self):
+        manager = self._manager(max_bytes=0)
+        self.assertEqual(manager.enforce(), 3)
+        self.assertTrue(self.shards[-1].exists())
+
+    def test_max_age(self):
+        manager = self._manager(max_age=datetime.timedelta(hours=1))
+        self.assertEqual(manager.enforce(), 2)
+        self.assertEqual([shard.exists() for shard in self.shards], [False, False, True, True])
+        self.clock.now += datetime.timedelta(hours=1)
+        self.assertEqual(manager.enforce(), 1)
+
+    def test_evicted_frames_are_removed_from_the_event_index(self):
+        index_path = self.root / "events.sqlite"
+        with EventIndex(index_path) as index:
+            for i, shard in enumerate(self.shards):
+                index.add(i, shard.parent.parent.name, shard / "1.jpg", 1, 0.1)
+            index.add(10, "flat", self.root / "flat" / "1.jpg", 1, 0.1)
+        self._manager(max_bytes=250, event_index_path=index_path).enforce()
+        with EventIndex(index_path) as index:
+            self.assertEqual([frame.timestamp for frame in index.query()], [2, 3, 10])
+
+    def test_shards_are_kept_if_the_event_index_cannot_be_updated(self):
+        index_path = self.root / "events.sqlite"
+        with EventIndex(index_path) as index:
+            for i, shard in enumerate(self.shards):
+                index.add(i, shard.parent.parent.name, shard / "1.jpg", 1, 0.1)
+        manager = self._manager(max_bytes=250, event_index_path=index_path)
+        with mock.patch.object(EventIndex, "remove_under", side_effect=sqlite3.OperationalError("database is locked")):
+            with self.assertRaises(sqlite3.OperationalError):
+                manager.enforce()
+        self.assertTrue(all(shard.exists() for shard in self.shards))
+
+        self.assertEqual(manager.enforce(), 2)
+        with EventIndex(index_path) as index:
+            self.assertEqual([frame.timestamp for frame in index.query()], [2, 3])
+
+    def test_background_thread(self):
+        with self._manager(max_bytes=250, interval_sec=60) as manager:
+            pass
+        self.assertIsNone(manager._thread)
+        self.assertFalse(self.shards[0].exists())
+
+    def test_a_quota_is_required(self):
+        with self.assertRaises(ValueError):
+            RetentionManager(self.root)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import datetime
+import tempfile
+import unittest
+from pathlib import Path
+
+from py_motion_detector.storage.shards import directory_size, is_sharded, iter_shards, shard_path, shard_start
+
+
+def timestamp_ms(*args) -> int:
+    return int(datetime.datetime(*args).timestamp() * 1000)
+
+
+class TestShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_shard_path_and_start(self):
+        shard = shard_path(self.root, timestamp_ms(2024, 3, 1, 9, 59, 59))
+        self.assertEqual(shard, self.root / "2024-03-01" / "09")
+        self.assertEqual(shard_start(shard), datetime.datetime(2024, 3, 1, 9))
+
+    def test_iter_shards(self):
+        self.assertFalse(is_sharded(self.root))
+        for day, hour in [("2024-03-02", "00"), ("2024-03-01", "23"), ("2024-03-01", "09")]:
+            (self.root / day / hour).mkdir(parents=True)
+        (self.root / "not-a-day").mkdir()
+        (self.root / "2024-03-01" / "not-an-hour").mkdir()
+        self.assertTrue(is_sharded(self.root))
+
+        shards = [f"{s.parent.name}/{s.name}" for s in iter_shards(self.root)]
+        self.assertEqual(shards, ["2024-03-01/09", "2024-03-01/23", "2024-03-02/00"])
+        shards = iter_shards(self.root, start_timestamp=timestamp_ms(2024, 3, 1, 23, 30))
+        self.assertEqual([f"{s.parent.name}/{s.name}" for s in shards], ["2024-03-01/23", "2024-03-02/00"])
+        self.assertEqual(list(iter_shards(self.root / "missing")), [])
+
+    def test_directory_size(self):
+        (self.root / "a" / "b").mkdir(parents=True)
+        (self.root / "a" / "1.jpg").write_bytes(bytes(10))
+        (self.root / "a" / "b" / "2.jpg").write_bytes(bytes(5))
+        self.assertEqual(directory_size(self.root), 15)
+        self.assertEqual(directory_size(self.root / "missing"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,49 @@
 import datetime
 import unittest
+from unittest import mock
 
 import numpy as np
 from py_motion_detector.common.parsers import str2time_duration
 from py_motion_detector.input_sources.dummy import DummyFrameProvider
+from py_motion_detector.instrumentation.metrics import MetricsRegistry
+from py_motion_detector.models.bounding_box import BoundingBox
 from py_motion_detector.motion_detection_app import MotionDetectionApplication
+from py_motion_detector.post_processing.box_merger import BoundingBoxMerger
+from py_motion_detector.scheduling.idle import AdaptiveIdleScheduler
+from py_motion_detector.scheduling.windows import TimeWindow
+
+from tests.common.fake_clock import FakeClock
+
+
+class ClockedFrameProvider(DummyFrameProvider):
+    """Yields `repeat` frames in total over all the times it is opened, one every second of the fake clock."""
+
+    def __init__(self, dummy_frame: np.array, repeat: int, clock: FakeClock):
+        super().__init__(dummy_frame, repeat)
+        self.clock = clock
+        self.opened = 0
+        self.closed = 0
+
+    def __enter__(self):
+        self.opened += 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.closed += 1
+
+    def frames(self):
+        while self.dummy_frames:
+            yield self.dummy_frames.pop()
+            self.clock.now += datetime.timedelta(seconds=1)
+
+
+class CountingModel:
+    def __init__(self):
+        self.frames = 0
+
+    def next_frame(self, frame):
+        self.frames += 1
+        return []
 
 
 class TestMotionDetectionApplication(unittest.TestCase):
@@ -30,6 +69,94 @@ class TestMotionDetectionApplication(unittest.TestCase):
     def test_should_process_based_on_time_always_process(self):
         self.assertTrue(self.motion_detection_app._should_process_based_on_time())
 
+    def test_should_process_based_on_time_crossing_midnight(self):
+        clock = FakeClock(datetime.datetime(2024, 3, 1, 23, 30))
+        app = MotionDetectionApplication(
+            frame_provider=self.dummy_frame_provider,
+            from_time=datetime.time(23),
+            duration=str2time_duration("2h"),
+            clock=clock,
+        )
+        self.assertTrue(app._should_process_based_on_time())
+        clock.now = datetime.datetime(2024, 3, 2, 0, 59)
+        self.assertTrue(app._should_process_based_on_time())
+        clock.now = datetime.datetime(2024, 3, 2, 1, 0)
+        self.assertFalse(app._should_process_based_on_time())
+
+    def test_frame_provider_closed_outside_of_the_active_windows(self):
+        clock = FakeClock(datetime.datetime(2024, 3, 1, 11))
+        frame_provider = ClockedFrameProvider(self.frame, 12, clock)
+        model = CountingModel()
+        callback = mock.Mock()
+        callback.name.return_value = "MockCallback"
+        app = MotionDetectionApplication(
+            frame_provider=frame_provider,
+            motion_detection_model=model,
+            callbacks=[callback],
+            active_windows=[TimeWindow.from_string("12:00:00-12:00:05")],
+            warmup_frames=2,
+            clock=clock,
+        )
+        with mock.patch("py_motion_detector.motion_detection_app.time.sleep", side_effect=clock.sleep) as sleep:
+            app._run()
+
+        # 6 frames are read every day, from 12:00:00 to 12:00:05, the last one is outside of the window
+        self.assertEqual(frame_provider.opened, 3)
+        self.assertEqual(frame_provider.closed, 3)
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [3600, 86395, 86395])
+        self.assertEqual(model.frames, 10)
+        self.assertEqual(app._frames_warmup.value, 4)
+        # the callbacks get the time of the clock, within the window that was checked
+        timestamps = [c.kwargs["timestamp"] for c in callback.execute.call_args_list]
+        self.assertEqual(len(timestamps), 6)
+        self.assertTrue(all(datetime.time(12) <= t.time() <= datetime.time(12, 0, 5) for t in timestamps))
+
+    def test_sleep_sec_is_deprecated(self):
+        with self.assertWarns(DeprecationWarning):
+            MotionDetectionApplication(frame_provider=self.dummy_frame_provider, sleep_sec=10)
+
+    def test_frame_provider_not_opened_if_never_active(self):
+        frame_provider = ClockedFrameProvider(self.frame, 1, FakeClock(datetime.datetime(2024, 3, 1, 11)))
+        app = MotionDetectionApplication(
+            frame_provider=frame_provider, from_time=datetime.time(12), duration=str2time_duration("0s")
+        )
+        app._run()
+        self.assertEqual(frame_provider.opened, 0)
+
+    def test_post_processors_run_before_the_callbacks(self):
+        model = mock.Mock()
+        model.next_frame.return_value = [BoundingBox(0, 0, 10, 10), BoundingBox(5, 5, 20, 20)]
+        callback = mock.Mock()
+        callback.name.return_value = "MockCallback"
+        registry = MetricsRegistry()
+        app = MotionDetectionApplication(
+            frame_provider=DummyFrameProvider(self.frame, 3),
+            motion_detection_model=model,
+            post_processors=[BoundingBoxMerger()],
+            callbacks=[callback],
+            metrics_registry=registry,
+        )
+        app._run_active_window(app.frame_provider)
+
+        self.assertEqual(callback.execute.call_count, 3)
+        self.assertEqual(callback.execute.call_args.kwargs["bounding_boxes"], [BoundingBox(0, 0, 20, 20)])
+        self.assertEqual(app._bounding_boxes_detected.value, 3)
+        self.assertEqual(registry.histogram("post_processor_seconds", post_processor="BoundingBoxMerger").count, 3)
+
+    def test_idle_scheduler_metrics(self):
+        registry = MetricsRegistry()
+        app = MotionDetectionApplication(
+            frame_provider=DummyFrameProvider(self.frame, 3),
+            idle_scheduler=AdaptiveIdleScheduler(quiet_period_sec=0, idle_fps=2),
+            metrics_registry=registry,
+        )
+        app._run_active_window(app.frame_provider)
+
+        gauges = registry.snapshot()["gauges"]
+        self.assertEqual(gauges["idle_scheduler_fps"], 2.0)
+        self.assertEqual(gauges["idle_scheduler_idle"], 1.0)
+        self.assertEqual(gauges["idle_scheduler_transitions"], 1.0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,95 @@
+import itertools
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import cv2
+import numpy as np
+from py_motion_detector.storage.shards import shard_path
+from py_motion_detector.utils.logged_data_player import (
+    LoggedDataReader,
+    LoggedFrameCache,
+    logged_data_gen,
+    logged_frames,
+)
+
+
+class TestLoggedDataReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+        self.timestamps = [1000 + 40 * i for i in range(10)]
+        for i, timestamp in enumerate(self.timestamps):
+            cv2.imwrite(str(self.directory / f"{timestamp}.jpg"), np.full((16, 16, 3), 20 * i, dtype=np.uint8))
+            with open(self.directory / f"{timestamp}.json", "w") as f:
+                json.dump([{"top": i, "left": 0, "bottom": 8, "right": 8}], f)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_frames_are_yielded_in_order(self):
+        reader = LoggedDataReader(self.directory, prefetch_size=3)
+        frames = list(reader.frames())
+
+        self.assertEqual([index for index, _, _ in frames], list(range(10)))
+        self.assertEqual([bbs[0].top for _, _, bbs in frames], list(range(10)))
+        self.assertAlmostEqual(float(frames[5][1].mean()), 100, delta=2)
+
+    def test_seek(self):
+        reader = LoggedDataReader(self.directory)
+        self.assertEqual(reader.seek(1000), 0)
+        self.assertEqual(reader.seek(1041), 2)
+        self.assertEqual(reader.seek(5000), 10)
+        self.assertEqual([index for index, _, _ in reader.frames(start_index=reader.seek(1300))], [8, 9])
+
+    def test_looped_playback_uses_the_cache(self):
+        reader = LoggedDataReader(self.directory)
+        frames = list(itertools.islice(reader.frames(loop_forever=True), 30))
+
+        self.assertEqual([index for index, _, _ in frames], list(range(10)) * 3)
+        self.assertEqual(reader.cache_misses, 10)
+        self.assertGreaterEqual(reader.cache_hits, 20)  # frames prefetched beyond the last one are counted too
+
+    def test_cache_is_capped(self):
+        reader = LoggedDataReader(self.directory, cache_bytes=3 * 16 * 16 * 3)
+        list(itertools.islice(reader.frames(loop_forever=True), 20))
+
+        self.assertLessEqual(len(reader._cache), 3)
+        self.assertGreaterEqual(reader.cache_misses, 20)
+
+    def test_logged_data_gen(self):
+        frames = list(logged_data_gen(self.directory))
+        self.assertEqual(len(frames), 10)
+        self.assertEqual(frames[0][1][0].top, 0)
+
+    def _store_sharded_session(self) -> list[int]:
+        # two frames per hour
+        timestamps = [1711929600000 + 1800000 * i for i in range(6)]
+        for i, timestamp in enumerate(timestamps):
+            shard = shard_path(self.directory / "sharded", timestamp)
+            shard.mkdir(parents=True, exist_ok=True)
+            cv2.imwrite(str(shard / f"{timestamp}.jpg"), np.zeros((16, 16, 3), dtype=np.uint8))
+            with open(shard / f"{timestamp}.json", "w") as f:
+                json.dump([{"top": i, "left": 0, "bottom": 8, "right": 8}], f)
+        return timestamps
+
+    def test_sharded_directory(self):
+        timestamps = self._store_sharded_session()
+        frames = list(logged_frames(self.directory / "sharded"))
+        self.assertEqual([timestamp for timestamp, _, _ in frames], timestamps)
+        self.assertEqual([bbs[0].top for _, _, bbs in frames], list(range(6)))
+        frames = logged_frames(self.directory / "sharded", start_timestamp=timestamps[3] - 1)
+        self.assertEqual([timestamp for timestamp, _, _ in frames], timestamps[3:])
+        frames = logged_frames(self.directory / "sharded", start_timestamp=timestamps[4], loop_forever=True)
+        self.assertEqual([t for t, _, _ in itertools.islice(frames, 4)], timestamps[4:] + timestamps[:2])
+
+    def test_looped_playback_of_a_sharded_directory_uses_the_cache(self):
+        timestamps = self._store_sharded_session()
+        cache = LoggedFrameCache()
+        frames = logged_frames(self.directory / "sharded", loop_forever=True, prefetch_size=2, cache=cache)
+        frames = list(itertools.islice(frames, 18))
+
+        self.assertEqual([timestamp for timestamp, _, _ in frames], timestamps * 3)
+        self.assertEqual(cache.misses, 6)
+        self.assertGreaterEqual(cache.hits, 12)